@@ -0,0 +1,99 @@
+import os
+import shutil
+import socket
+import StringIO
+from pytest import skip
+
+DATA = ''.join(chr(i % 251) for i in range(100000))
+
+def make_file(tmpdir):
+    path = str(tmpdir.join('data'))
+    with open(path, 'wb') as f:
+        f.write(DATA)
+    return path
+
+def make_socketpair():
+    a, b = socket.socketpair()
+    return socket.socket(_sock=a), socket.socket(_sock=b)
+
+def recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        assert chunk
+        chunks.append(chunk)
+        size -= len(chunk)
+    return ''.join(chunks)
+
+def test_socket_sendfile(tmpdir):
+    if not hasattr(socket.socket, 'sendfile'):
+        skip("no socket.sendfile()")
+    path = make_file(tmpdir)
+    a, b = make_socketpair()
+    with open(path, 'rb') as f:
+        assert a.sendfile(f, 1000, 50000) == 50000
+        assert f.tell() == 51000
+        assert recv_exactly(b, 50000) == DATA[1000:51000]
+        assert a.sendfile(f, 99990) == 10
+        assert recv_exactly(b, 10) == DATA[99990:]
+    a.close()
+    b.close()
+
+def test_socket_sendfile_not_a_real_file():
+    if not hasattr(socket.socket, 'sendfile'):
+        skip("no socket.sendfile()")
+    a, b = make_socketpair()
+    f = StringIO.StringIO('hello world')
+    assert a.sendfile(f, 6, 3) == 3
+    assert b.recv(100) == 'wor'
+    a.settimeout(5.0)
+    assert a.sendfile(f) == 2
+    assert b.recv(100) == 'ld'
+    a.close()
+    b.close()
+
+def test_copyfile_fastcopy(tmpdir):
+    if not getattr(shutil, '_USE_FASTCOPY', False):
+        skip("no kernel-side copy available")
+    path = make_file(tmpdir)
+    dst = str(tmpdir.join('copy'))
+    with open(path, 'rb') as fsrc:
+        with open(dst, 'wb') as fdst:
+            assert shutil._fastcopy(fsrc, fdst)
+    with open(dst, 'rb') as f:
+        assert f.read() == DATA
+    os.unlink(dst)
+    shutil.copyfile(path, dst)
+    with open(dst, 'rb') as f:
+        assert f.read() == DATA
+
+def test_fastcopy_not_a_real_file(tmpdir):
+    if not getattr(shutil, '_USE_FASTCOPY', False):
+        skip("no kernel-side copy available")
+    dst = str(tmpdir.join('copy'))
+    with open(dst, 'wb') as fdst:
+        assert not shutil._fastcopy(StringIO.StringIO(DATA), fdst)
+
+def test_copyfile_pseudo_file(tmpdir):
+    # files in /proc report a size of 0, and copy_file_range() copies
+    # nothing from them on some kernels
+    path = '/proc/version'
+    if not os.path.exists(path):
+        skip("no %s" % path)
+    with open(path, 'rb') as f:
+        expected = f.read()
+    assert expected
+    dst = str(tmpdir.join('copy'))
+    shutil.copyfile(path, dst)
+    with open(dst, 'rb') as f:
+        assert f.read() == expected
+
+def test_copyfile_empty(tmpdir):
+    path = str(tmpdir.join('empty'))
+    open(path, 'wb').close()
+    dst = str(tmpdir.join('copy'))
+    with open(dst, 'wb') as f:
+        f.write('old content')
+    shutil.copyfile(path, dst)
+    with open(dst, 'rb') as f:
+        assert f.read() == ''
@@ -136,7 +136,8 @@ class Pool(object):
     Process = Process
 
     def __init__(self, processes=None, initializer=None, initargs=(),
-                 maxtasksperchild=None):
+                 maxtasksperchild=None, shared_memory=False):
+        self._shared_memory = shared_memory
         self._setup_queues()
         self._taskqueue = Queue.Queue()
         self._cache = {}
@@ -233,8 +234,8 @@ class Pool(object):
 
     def _setup_queues(self):
         from .queues import SimpleQueue
-        self._inqueue = SimpleQueue()
-        self._outqueue = SimpleQueue()
+        self._inqueue = SimpleQueue(self._shared_memory)
+        self._outqueue = SimpleQueue(self._shared_memory)
         self._quick_put = self._inqueue._writer.send
         self._quick_get = self._outqueue._reader.recv
 
@@ -347,8 +347,12 @@ class JoinableQueue(Queue):
 
 class SimpleQueue(object):
 
-    def __init__(self):
-        self._reader, self._writer = Pipe(duplex=False)
+    def __init__(self, shared_memory=False):
+        if shared_memory and hasattr(_multiprocessing, 'shared_pipe'):
+            # PyPy: pass the messages through a ring in shared memory
+            self._reader, self._writer = _multiprocessing.shared_pipe()
+        else:
+            self._reader, self._writer = Pipe(duplex=False)
         self._rlock = Lock()
         if sys.platform == 'win32':
             self._wlock = None
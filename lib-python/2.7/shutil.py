@@ -65,6 +65,52 @@ def copyfileobj(fsrc, fdst, length=16*1024):
             break
         fdst.write(buf)
 
+# PyPy: copy regular files inside the kernel when possible
+_USE_FASTCOPY = (hasattr(os, 'copy_file_range') or
+                 (sys.platform.startswith('linux') and hasattr(os, 'sendfile')))
+_FASTCOPY_UNSUPPORTED = set(getattr(errno, name) for name in
+                            ('EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP',
+                             'ENOTSUP', 'EBADF')
+                            if hasattr(errno, name))
+
+def _fastcopy(fsrc, fdst):
+    """Copy the content of the real file fsrc to the real file fdst with
+    os.copy_file_range() or os.sendfile(), without reading it into
+    strings.  Return False, having copied nothing, if the kernel refuses
+    to do it for these files or copies nothing at all."""
+    try:
+        infd = fsrc.fileno()
+        outfd = fdst.fileno()
+        blocksize = max(os.fstat(infd).st_size, 2 ** 23)
+    except (AttributeError, ValueError, IOError, OSError):
+        return False
+    blocksize = min(blocksize, 2 ** 30)
+    use_copy_file_range = hasattr(os, 'copy_file_range')
+    copied = 0
+    while True:
+        try:
+            if use_copy_file_range:
+                n = os.copy_file_range(infd, outfd, blocksize)
+            else:
+                n = os.sendfile(outfd, infd, None, blocksize)
+        except OSError as e:
+            if e.errno == errno.EINTR:
+                continue
+            if copied == 0 and e.errno in _FASTCOPY_UNSUPPORTED:
+                if use_copy_file_range and hasattr(os, 'sendfile'):
+                    use_copy_file_range = False
+                    continue
+                return False
+            raise
+        if n == 0:
+            if copied == 0:
+                # either an empty file, or a file like the ones in /proc
+                # or /sys that reports a size of 0 and that some kernels
+                # don't copy at all: let copyfileobj() read it
+                return False
+            return True
+        copied += n
+
 def _samefile(src, dst):
     # Macintosh, Unix.
     if hasattr(os.path, 'samefile'):
@@ -95,6 +141,8 @@ def copyfile(src, dst):
 
     with open(src, 'rb') as fsrc:
         with open(dst, 'wb') as fdst:
+            if _USE_FASTCOPY and _fastcopy(fsrc, fdst):
+                return
             copyfileobj(fsrc, fdst)
 
 def copymode(src, dst):
@@ -240,6 +240,28 @@ class _socketobject(object):
         return self._sock.recvfrom_into(buffer, nbytes, flags)
     recvfrom_into.__doc__ = _realsocket.recvfrom_into.__doc__
 
+    if hasattr(_realsocket, 'sendmsg'):
+        def recvmsg(self, buffersize, ancbufsize=0, flags=0):
+            return self._sock.recvmsg(buffersize, ancbufsize, flags)
+        recvmsg.__doc__ = _realsocket.recvmsg.__doc__
+
+        def recvmsg_into(self, buffers, ancbufsize=0, flags=0):
+            return self._sock.recvmsg_into(buffers, ancbufsize, flags)
+        recvmsg_into.__doc__ = _realsocket.recvmsg_into.__doc__
+
+        def sendmsg(self, buffers, ancdata=None, flags=0, address=None):
+            return self._sock.sendmsg(buffers, ancdata, flags, address)
+        sendmsg.__doc__ = _realsocket.sendmsg.__doc__
+
+    if hasattr(_realsocket, 'sendmmsg'):
+        def recvmmsg_into(self, buffer, msgsize, count=0, flags=0):
+            return self._sock.recvmmsg_into(buffer, msgsize, count, flags)
+        recvmmsg_into.__doc__ = _realsocket.recvmmsg_into.__doc__
+
+        def sendmmsg(self, buffers, flags=0, address=None):
+            return self._sock.sendmmsg(buffers, flags, address)
+        sendmmsg.__doc__ = _realsocket.sendmmsg.__doc__
+
     def sendto(self, data, param2, param3=None):
         if param3 is None:
             return self._sock.sendto(data, param2)
@@ -273,6 +295,70 @@ class _socketobject(object):
         and bufsize arguments are as for the built-in open() function."""
         return _fileobject(self._sock, mode, bufsize)
 
+    def sendfile(self, file, offset=0, count=None):
+        """sendfile(file[, offset[, count]]) -> sent
+
+        Send a file until EOF is reached, or until count bytes have been
+        sent, starting at offset.  For regular files on a blocking socket,
+        os.sendfile() is used and the data never goes through user space;
+        otherwise send() is used.  The file position is left after the last
+        byte sent.  Return the total number of bytes sent."""
+        if hasattr(os, 'sendfile') and self.gettimeout() is None:
+            try:
+                fileno = file.fileno()
+                fsize = os.fstat(fileno).st_size
+            except (AttributeError, ValueError, IOError, OSError):
+                pass
+            else:
+                return self._sendfile_use_sendfile(file, fileno, fsize,
+                                                   offset, count)
+        return self._sendfile_use_send(file, offset, count)
+
+    def _sendfile_use_sendfile(self, file, fileno, fsize, offset, count):
+        blocksize = min(count or fsize, 2 ** 30)
+        sockno = self.fileno()
+        total_sent = 0
+        try:
+            while True:
+                if count:
+                    blocksize = min(count - total_sent, blocksize)
+                    if blocksize <= 0:
+                        break
+                try:
+                    sent = os.sendfile(sockno, fileno, offset, blocksize)
+                except OSError as e:
+                    if e.errno == EINTR:
+                        continue
+                    if total_sent == 0 and e.errno == errno.EINVAL:
+                        # not a file that sendfile() supports
+                        return self._sendfile_use_send(file, offset, count)
+                    raise error(e.errno, e.strerror)
+                if sent == 0:
+                    break   # EOF
+                offset += sent
+                total_sent += sent
+            return total_sent
+        finally:
+            if total_sent > 0 and hasattr(file, 'seek'):
+                file.seek(offset)
+
+    def _sendfile_use_send(self, file, offset, count):
+        if offset:
+            file.seek(offset)
+        blocksize = min(count, 8192) if count else 8192
+        total_sent = 0
+        while True:
+            if count:
+                blocksize = min(count - total_sent, blocksize)
+                if blocksize <= 0:
+                    break
+            data = file.read(blocksize)
+            if not data:
+                break
+            self._sock.sendall(data)
+            total_sent += len(data)
+        return total_sent
+
     family = property(lambda self: self._sock.family, doc="the socket family")
     type = property(lambda self: self._sock.type, doc="the socket type")
     proto = property(lambda self: self._sock.proto, doc="the socket protocol")
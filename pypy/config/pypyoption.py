@@ -45,6 +45,10 @@ if rpython.rlib.rvmprof.cintf.IS_SUPPORTED:
     working_modules.add('_vmprof')
     working_modules.add('faulthandler')
 
+import rpython.rlib.rio_uring
+if rpython.rlib.rio_uring.IS_SUPPORTED:
+    working_modules.add('_io_uring')
+
 translation_modules = default_modules.copy()
 translation_modules.update([
     "fcntl", "time", "select", "signal", "_rawffi", "zlib", "struct", "_md5",
@@ -76,6 +76,7 @@ class Block(object):
         # unconditional jumps)
         self.cant_add_instructions = False
         self.auto_inserted_return = False
+        self.reachable = False
 
     def _post_order_see(self, stack):
         if self.marked == 0:
@@ -116,6 +117,46 @@ class Block(object):
         resultblocks.reverse()
         return resultblocks
 
+    def mark_reachable(self):
+        """Set the 'reachable' flag on this block and all the blocks that
+        execution can continue into, by falling through or jumping."""
+        stack = [self]
+        self.reachable = True
+        while stack:
+            current = stack.pop()
+            for instr in current.instructions:
+                target = instr.jump
+                if target is not None and not target.reachable:
+                    target.reachable = True
+                    stack.append(target)
+            # after an unconditional exit, the next block is dead code
+            # unless it is also the target of a jump
+            nextblock = current.next_block
+            if (nextblock is not None and not nextblock.reachable and
+                    not current.cant_add_instructions):
+                nextblock.reachable = True
+                stack.append(nextblock)
+
+    def remove_useless_pairs(self):
+        """Peephole pass: remove LOAD_CONST instructions whose result is
+        immediately discarded by a POP_TOP.  The line number, if any, is
+        moved to the following instruction to keep tracing unchanged.
+        """
+        result = []
+        lineno = 0
+        for instr in self.instructions:
+            if (instr.opcode == ops.POP_TOP and result and
+                    result[-1].opcode == ops.LOAD_CONST):
+                removed = result.pop()
+                lineno = removed.lineno or instr.lineno or lineno
+                continue
+            if lineno and not instr.lineno:
+                instr.lineno = lineno
+            lineno = 0
+            result.append(instr)
+        if len(result) < len(self.instructions):
+            self.instructions = result
+
     def code_size(self):
         """Return the encoded size of all the instructions in this
         block.
@@ -144,6 +185,28 @@ class Block(object):
                 code.append(chr(opcode))
 
 
+def _skip_unconditional_jumps(target):
+    """Return the block where execution really continues when jumping to
+    'target', following blocks that start with an unconditional jump.
+    The number of steps is bounded, to stop on loops like 'while 1: pass'.
+    Backward jumps are not followed: the JUMP_ABSOLUTE that closes a loop
+    is where the interpreter checks if the loop is hot enough for the JIT
+    (see jump_absolute() in pypy/module/pypyjit/interp_jit.py), so it
+    must stay on the path of every iteration.
+    """
+    for i in range(10):
+        if not target.instructions:
+            break
+        first = target.instructions[0]
+        if ((first.opcode != ops.JUMP_ABSOLUTE and
+                first.opcode != ops.JUMP_FORWARD) or first.jump is None):
+            break
+        if first.jump.offset <= target.offset:
+            break
+        target = first.jump
+    return target
+
+
 def _make_index_dict_filter(syms, flag):
     names = syms.keys()
     string_sort(names)   # return cell vars in alphabetical order
@@ -207,7 +270,7 @@ class PythonCodeMaker(ast.ASTVisitor):
     def is_dead_code(self):
         """Return False if any code can be meaningfully added to the
         current block, or True if it would be dead code."""
-        # currently only True after a RETURN_VALUE.
+        # True after a return, raise, break, continue or jump.
         return self.current_block.cant_add_instructions
 
     def emit_instr(self, instr):
@@ -217,7 +280,9 @@ class PythonCodeMaker(ast.ASTVisitor):
                 op == ops.RETURN_VALUE or
                 op == ops.RAISE_VARARGS or
                 op == ops.JUMP_FORWARD or
-                op == ops.JUMP_ABSOLUTE
+                op == ops.JUMP_ABSOLUTE or
+                op == ops.BREAK_LOOP or
+                op == ops.CONTINUE_LOOP
         ):
             self.current_block.cant_add_instructions = True
 
@@ -290,6 +355,15 @@ class PythonCodeMaker(ast.ASTVisitor):
             self.lineno = lineno
             self.lineno_set = False
 
+    def _optimize_blocks(self, blocks):
+        """Drop the unreachable blocks and run the peephole pass on the
+        remaining ones."""
+        self.first_block.mark_reachable()
+        blocks = [block for block in blocks if block.reachable]
+        for block in blocks:
+            block.remove_useless_pairs()
+        return blocks
+
     def _resolve_block_targets(self, blocks):
         """Compute the arguments of jump instructions."""
         last_extended_arg_count = 0
@@ -332,6 +406,15 @@ class PythonCodeMaker(ast.ASTVisitor):
                                     # we have to trigger another pass
                                     force_redo = True
                                     continue
+                        elif (op == ops.POP_JUMP_IF_FALSE or
+                              op == ops.POP_JUMP_IF_TRUE or
+                              op == ops.JUMP_IF_FALSE_OR_POP or
+                              op == ops.JUMP_IF_TRUE_OR_POP):
+                            # Jump threading: a conditional jump going to
+                            # an unconditional jump can go directly to the
+                            # final target.
+                            target = _skip_unconditional_jumps(target)
+                            instr.jump = target
                         if is_absolute_jump(instr.opcode):
                             jump_arg = target.offset
                         else:
@@ -472,7 +555,7 @@ class PythonCodeMaker(ast.ASTVisitor):
                 self.first_lineno = self.first_block.instructions[0].lineno
             else:
                 self.first_lineno = 1
-        blocks = self.first_block.post_order()
+        blocks = self._optimize_blocks(self.first_block.post_order())
         size = self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
@@ -860,17 +860,18 @@ class ASTBuilder(object):
         # Fold '-' on constant numbers.
         if factor_node.get_child(0).type == tokens.MINUS and \
                 factor_node.num_children() == 2:
-            factor = factor_node.get_child(1)
-            if factor.type == syms.factor and factor.num_children() == 1:
-                power = factor.get_child(0)
-                if power.type == syms.power and power.num_children() == 1:
-                    atom = power.get_child(0)
-                    if atom.type == syms.atom and \
-                            atom.get_child(0).type == tokens.NUMBER:
-                        num = atom.get_child(0)
-                        assert isinstance(num, Terminal)
-                        num.value = "-" + num.get_value()
-                        return self.handle_atom(atom)
+            power = factor_node.get_child(1)
+            # in compact parse trees, the single-child factor node is absent
+            if power.type == syms.factor and power.num_children() == 1:
+                power = power.get_child(0)
+            if power.type == syms.power and power.num_children() == 1:
+                atom = power.get_child(0)
+                if atom.type == syms.atom and \
+                        atom.get_child(0).type == tokens.NUMBER:
+                    num = atom.get_child(0)
+                    assert isinstance(num, Terminal)
+                    num.value = "-" + num.get_value()
+                    return self.handle_atom(atom)
         expr = self.handle_expr(factor_node.get_child(1))
         op_type = factor_node.get_child(0).type
         if op_type == tokens.PLUS:
@@ -895,7 +896,9 @@ class ASTBuilder(object):
             tmp_atom_expr.lineno = atom_expr.lineno
             tmp_atom_expr.col_offset = atom_expr.col_offset
             atom_expr = tmp_atom_expr
-        if power_node.get_child(-1).type == syms.factor:
+        # power: atom trailer* ['**' factor]
+        # (the factor may be collapsed in compact parse trees)
+        if power_node.get_child(-2).type == tokens.DOUBLESTAR:
             right = self.handle_expr(power_node.get_child(-1))
             atom_expr = ast.BinOp(atom_expr, ast.Pow, right, power_node.get_lineno(),
                                   power_node.get_column())
@@ -493,7 +493,8 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         end = self.new_block()
         self.emit_jump(ops.SETUP_LOOP, end)
         self.push_frame_block(F_BLOCK_LOOP, start)
-        fr.iter.walkabout(self)
+        if not self._load_const_container(fr.iter):
+            fr.iter.walkabout(self)
         self.emit_op(ops.GET_ITER)
         self.use_next_block(start)
         # This adds another line, so each for iteration can be traced.
@@ -877,16 +878,25 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         returns False
         """
         if op in (ast.In, ast.NotIn):
-            is_list = isinstance(node, ast.List)
-            if is_list or isinstance(node, ast.Set):
-                w_const = self._tuple_of_consts(node.elts)
-                if w_const is not None:
-                    if not is_list:
-                        from pypy.objspace.std.setobject import (
-                            W_FrozensetObject)
-                        w_const = W_FrozensetObject(self.space, w_const)
-                    self.load_const(w_const)
-                    return True
+            return self._load_const_container(node)
+        return False
+
+    def _load_const_container(self, node):
+        """Load a list or set display made only of constants as a tuple
+        or frozenset constant.  Only valid where the container is never
+        mutated or leaked, e.g. for "in" tests and "for" loops.  Returns
+        False if node is not such a display.
+        """
+        is_list = isinstance(node, ast.List)
+        if is_list or isinstance(node, ast.Set):
+            w_const = self._tuple_of_consts(node.elts)
+            if w_const is not None:
+                if not is_list:
+                    from pypy.objspace.std.setobject import (
+                        W_FrozensetObject)
+                    w_const = W_FrozensetObject(self.space, w_const)
+                self.load_const(w_const)
+                return True
         return False
 
     def _tuple_of_consts(self, elts):
@@ -11,9 +11,10 @@ from pypy.interpreter.astcompiler import ast, consts
 
 
 class TestAstBuilder:
+    compact = False
 
     def setup_class(cls):
-        cls.parser = pyparse.PythonParser(cls.space)
+        cls.parser = pyparse.PythonParser(cls.space, compact=cls.compact)
 
     def get_ast(self, source, p_mode="exec"):
         info = pyparse.CompileInfo("<test>", p_mode,
@@ -1292,3 +1293,9 @@ class TestAstBuilder:
                            " bytes in position 0-1: truncated \\xXX escape")
         assert exc.lineno == 2
         assert exc.offset == 6
+
+
+class TestAstBuilderCompactTree(TestAstBuilder):
+    # the parse trees given to the astbuilder by the real compiler
+    compact = True
+
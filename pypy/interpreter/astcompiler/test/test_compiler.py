@@ -23,7 +23,7 @@ def generate_function_code(expr, space):
     symbols = symtable.SymtableBuilder(space, ast, info)
     generator = codegen.FunctionCodeGenerator(
         space, 'function', function_ast, 1, symbols, info)
-    blocks = generator.first_block.post_order()
+    blocks = generator._optimize_blocks(generator.first_block.post_order())
     generator._resolve_block_targets(blocks)
     return generator, blocks
 
@@ -1207,6 +1207,85 @@ class TestOptimizations:
             assert ops.BUILD_SET not in counts
             assert ops.LOAD_CONST in counts
 
+    def test_folding_of_constant_for_loop_iterables(self):
+        for source in (
+            'for a in [1, 2, 3]: pass',
+            'for a in ["a", (1, 2)]: pass',
+            'for a in {1, 2, 3}: pass',
+            'for a in []: pass',
+            ):
+            source = 'def f():\n    %s' % source
+            counts = self.count_instructions(source)
+            assert ops.BUILD_LIST not in counts
+            assert ops.BUILD_SET not in counts
+            assert ops.LOAD_CONST in counts
+        source = 'def f():\n    for a in [b, 2]: pass'
+        counts = self.count_instructions(source)
+        assert ops.BUILD_LIST in counts
+
+    def test_remove_dead_implicit_return(self):
+        source = """def f(x, y, z):
+            if x:
+                return y
+            else:
+                return z
+            # the implicit 'return None' is unreachable
+        """
+        code, blocks = generate_function_code(source, self.space)
+        instrs = []
+        for block in blocks:
+            instrs.extend(block.instructions)
+        assert [instr.opcode for instr in instrs].count(ops.LOAD_CONST) == 0
+
+    def test_remove_dead_code_after_break_and_continue(self):
+        source = """def f(x):
+            while x:
+                if x > 2:
+                    break
+                    x += 1
+                try:
+                    continue
+                    x += 2
+                finally:
+                    pass
+        """
+        counts = self.count_instructions(source)
+        assert ops.INPLACE_ADD not in counts
+
+    def test_jump_threading(self):
+        source = """def f(x, y):
+            while x:
+                if y:
+                    x -= 1
+        """
+        code, blocks = generate_function_code(source, self.space)
+        for block in blocks:
+            for instr in block.instructions:
+                if instr.opcode == ops.POP_JUMP_IF_FALSE:
+                    target = instr.jump
+                    # never jumps backward: the JUMP_ABSOLUTE at the end
+                    # of the loop must run at every iteration, for the JIT
+                    assert target.offset > block.offset
+                    # never jumps to a block that only jumps forward
+                    assert target.instructions
+                    first = target.instructions[0]
+                    if first.opcode in (ops.JUMP_ABSOLUTE, ops.JUMP_FORWARD):
+                        assert first.opcode == ops.JUMP_ABSOLUTE
+                        assert first.jump.offset <= target.offset
+
+    def test_remove_load_const_pop_top(self):
+        from pypy.interpreter.astcompiler import assemble
+        block = assemble.Block()
+        instrs = [assemble.Instruction(ops.LOAD_FAST, 0),
+                  assemble.Instruction(ops.LOAD_CONST, 1),
+                  assemble.Instruction(ops.POP_TOP),
+                  assemble.Instruction(ops.RETURN_VALUE)]
+        instrs[1].lineno = 5
+        block.instructions = instrs[:]
+        block.remove_useless_pairs()
+        assert block.instructions == [instrs[0], instrs[3]]
+        assert instrs[3].lineno == 5
+
     def test_dont_fold_huge_powers(self):
         for source in (
             "2 ** 3000",         # not constant-folded: too big
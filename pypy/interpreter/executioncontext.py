@@ -4,6 +4,7 @@ from rpython.rlib.unroll import unrolling_iterable
 from rpython.rlib.objectmodel import specialize, not_rpython
 from rpython.rlib import jit, rgc, objectmodel
 from rpython.rlib.rarithmetic import r_uint
+from rpython.rtyper.lltypesystem import lltype, rffi
 
 TICK_COUNTER_STEP = 100
 
@@ -485,6 +486,11 @@ class AbstractActionFlag(object):
         self._rebuild_action_dispatcher()
         return len(self._nonperiodic_actions) - 1
 
+    def get_ticker_address(self):
+        """Return the address of the ticker as a raw pointer, for the C
+        code of the GIL, or NULL if the ticker is not in raw memory."""
+        return lltype.nullptr(rffi.SIGNEDP.TO)
+
     def getcheckinterval(self):
         return self.checkinterval_scaled // TICK_COUNTER_STEP
 
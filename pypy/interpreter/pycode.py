@@ -137,6 +137,7 @@ class PyCode(eval.Code):
 
         init_mapdict_cache(self)
         self._globals_caches = [None] * len(self.co_names_w)
+        self._moduleattr_caches = None
 
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
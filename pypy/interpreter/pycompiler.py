@@ -102,7 +102,9 @@ class PythonAstCompiler(PyCodeCompiler):
     def __init__(self, space, override_version=None):
         PyCodeCompiler.__init__(self, space)
         self.future_flags = future.futureFlags_2_7
-        self.parser = pyparse.PythonParser(space, self.future_flags)
+        # the parse tree is only given to astbuilder, so it can be compact
+        self.parser = pyparse.PythonParser(space, self.future_flags,
+                                           compact=True)
         self.additional_rules = {}
         self.compiler_flags = self.future_flags.allowed_flags
 
@@ -62,6 +62,9 @@ class DFA(object):
         self.symbol_id = symbol_id
         self.states = states
         self.first = self._first_to_string(first)
+        # True for symbols whose node can be replaced by its only child in
+        # a compact parse tree, see Parser.__init__()
+        self.collapsible = False
 
     def could_match_token(self, label_index):
         pos = label_index >> 3
@@ -298,6 +301,9 @@ class StackEntry(object):
         self.next = next
         self.dfa = dfa
         self.state = state
+        # the node is only built when the second child is added, or by
+        # finish_node(); until then the only child is stored here
+        self.first_child = None
         self.node = None
 
     def push(self, dfa, state):
@@ -309,13 +315,28 @@ class StackEntry(object):
     def node_append_child(self, child):
         node = self.node
         if node is None:
-            self.node = Nonterminal1(self.dfa.grammar, self.dfa.symbol_id, child)
-        elif isinstance(node, Nonterminal1):
-            newnode = self.node = Nonterminal(
-                    self.dfa.grammar, 
-                    self.dfa.symbol_id, [node._child, child])
+            if self.first_child is None:
+                self.first_child = child
+            else:
+                self.node = Nonterminal(
+                        self.dfa.grammar,
+                        self.dfa.symbol_id, [self.first_child, child])
+                self.first_child = None
         else:
-            self.node.append_child(child)
+            node.append_child(child)
+
+    def finish_node(self, compact):
+        """Return the node for this entry.  With 'compact', a collapsible
+        symbol with a single child is not built at all: the child is
+        returned instead."""
+        node = self.node
+        if node is not None:
+            return node
+        child = self.first_child
+        assert child is not None
+        if compact and self.dfa.collapsible:
+            return child
+        return Nonterminal1(self.dfa.grammar, self.dfa.symbol_id, child)
 
     def view(self):
         from dotviewer import graphclient
@@ -332,15 +353,21 @@ class StackEntry(object):
         if self.next:
             result.append('%s -> %s [label="next"]' % (id(self), id(self.next)))
             self.next._dot(result)
-        if self.node:
-            result.append('%s -> %s [label="node"]' % (id(self), id(self.node)))
-            self.node._dot(result)
+        node = self.node or self.first_child
+        if node:
+            result.append('%s -> %s [label="node"]' % (id(self), id(node)))
+            node._dot(result)
 
 
 class Parser(object):
 
-    def __init__(self, grammar):
+    def __init__(self, grammar, compact=False):
+        """If 'compact' is True, the parse tree doesn't contain the nodes
+        of collapsible symbols that have a single child (e.g. the long
+        chain of expression symbols above every plain name).  This saves a
+        lot of nodes, but only astbuilder.py knows how to handle it."""
         self.grammar = grammar
+        self.compact = compact
         self.root = None
 
     def prepare(self, start=-1):
@@ -419,8 +446,7 @@ class Parser(object):
         """Pop an entry off the stack and make its node a child of the last."""
         top = self.stack
         self.stack = top.pop()
-        node = top.node
-        assert node is not None
+        node = top.finish_node(self.compact)
         if self.stack:
             self.stack.node_append_child(node)
         else:
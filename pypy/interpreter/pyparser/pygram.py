@@ -34,6 +34,15 @@ metavar_token_id = pytoken.python_tokens['REVDBMETAVAR']
 # dict
 del python_grammar.token_ids[metavar_token_id]
 
+# Expression symbols that only wrap their single child when there is no
+# operator, like 'comparison' above a plain name.  They are left out of
+# compact parse trees (see parser.Parser), which astbuilder.py supports.
+for _sym_name in ['or_test', 'and_test', 'not_test', 'comparison', 'expr',
+                  'xor_expr', 'and_expr', 'shift_expr', 'arith_expr', 'term',
+                  'factor']:
+    _symbol_id = python_grammar.symbol_ids[_sym_name]
+    python_grammar.dfas[_symbol_id - 256].collapsible = True
+
 class _Tokens(object):
     pass
 for tok_name, idx in pytoken.python_tokens.iteritems():
@@ -50,6 +59,7 @@ syms = _Symbols()
 syms._rev_lookup = rev_lookup # for debugging
 
 del _get_python_grammar, _Tokens, tok_name, sym_name, idx
+del _sym_name, _symbol_id
 
 def choose_grammar(print_function, revdb):
     if print_function:
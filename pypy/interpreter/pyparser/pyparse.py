@@ -87,8 +87,8 @@ _targets = {
 class PythonParser(parser.Parser):
 
     def __init__(self, space, future_flags=future.futureFlags_2_7,
-                 grammar=pygram.python_grammar):
-        parser.Parser.__init__(self, grammar)
+                 grammar=pygram.python_grammar, compact=False):
+        parser.Parser.__init__(self, grammar, compact)
         self.space = space
         self.future_flags = future_flags
 
@@ -184,6 +184,34 @@ pass"""
         info = py.test.raises(SyntaxError, self.parse, "def f:\n print 1")
         assert "(expected '(')" in info.value.msg
 
+    def test_compact_tree(self):
+        def count_nodes(node):
+            return 1 + sum([count_nodes(node.get_child(i))
+                            for i in range(node.num_children())])
+        source = "x = a + b * c\nif not y and -z:\n    pass\n"
+        full = self.parse(source)
+        parser = pyparse.PythonParser(self.space, compact=True)
+        info = pyparse.CompileInfo("<test>", "exec")
+        compact = parser.parse_source(source, info)
+        assert count_nodes(compact) * 3 < count_nodes(full) * 2
+        # stmt -> simple_stmt -> small_stmt -> expr_stmt
+        expr_stmt = compact.get_child(0).get_child(0).get_child(0).get_child(0)
+        test = expr_stmt.get_child(2).get_child(0)
+        assert test.type == syms.test
+        arith_expr = test.get_child(0)
+        assert arith_expr.type == syms.arith_expr
+        assert arith_expr.get_child(0).type == syms.power
+        assert arith_expr.get_child(2).type == syms.term
+        # operators with a single operand are kept
+        # stmt -> compound_stmt -> if_stmt
+        if_stmt = compact.get_child(1).get_child(0).get_child(0)
+        if_test = if_stmt.get_child(1)
+        and_test = if_test.get_child(0)
+        assert and_test.type == syms.and_test
+        assert and_test.get_child(0).type == syms.not_test
+        assert and_test.get_child(2).type == syms.factor
+
+
 class TestPythonParserRevDB(TestPythonParser):
     spaceconfig = {"translation.reverse_debugger": True}
 
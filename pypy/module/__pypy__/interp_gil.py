@@ -0,0 +1,89 @@
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from rpython.rlib import rgil
+
+
+def get_sticky_gil_threshold(space):
+    """Return how long, in seconds, a thread waiting for the GIL lets the
+    holder take it back after a short external call."""
+    return space.newfloat(rgil.get_sticky_threshold() * 1e-6)
+
+@unwrap_spec(interval=float)
+def set_sticky_gil_threshold(space, interval):
+    """Set how long, in seconds, a thread waiting for the GIL lets the
+    holder take it back after a short external call (like a non-blocking
+    socket or file operation) instead of stealing it as soon as it is
+    released.  Threads that block for longer in the call still hand
+    over the GIL.  0 disables this."""
+    if not (0.0 <= interval <= 1000.0):
+        raise oefmt(space.w_ValueError,
+                    "sticky GIL threshold must be between 0 and 1000 seconds")
+    rgil.set_sticky_threshold(int(interval * 1e6))
+
+def get_switch_interval(space):
+    """Return how long, in seconds, a thread waits for the GIL before it
+    asks the running thread to give it up."""
+    return space.newfloat(rgil.get_switch_interval() * 1e-6)
+
+@unwrap_spec(interval=float)
+def set_switch_interval(space, interval):
+    """Set how long, in seconds, a thread waits for the GIL before it asks
+    the running thread to give it up, like sys.setswitchinterval() in
+    Python 3.  A thread coming back from an I/O operation asks after a
+    quarter of that time already."""
+    if not (0.0 < interval <= 1000.0):
+        raise oefmt(space.w_ValueError,
+                    "switch interval must be between 0 and 1000 seconds")
+    rgil.set_switch_interval(max(int(interval * 1e6), 1))
+
+def gil_wait_stats(space):
+    """Return a dict mapping the identifier of each running thread to a
+    tuple (seconds, count): how long in total and how many times it had
+    to wait for the GIL."""
+    w_result = space.newdict()
+    for ident, wait_us, waits, hold_us in rgil.enum_thread_stats():
+        space.setitem(w_result, space.newint(ident),
+                      space.newtuple2(space.newfloat(wait_us * 1e-6),
+                                      space.newint(waits)))
+    return w_result
+
+@unwrap_spec(enabled=bool)
+def set_gil_profiling(space, enabled):
+    """Enable or disable the GIL counters that have a cost even without
+    contention: how long each thread holds the GIL, and the handoffs per
+    kind of release site (see gil_stats())."""
+    rgil.set_profiling(enabled)
+
+def gil_stats(space):
+    """Return a dict with the GIL statistics:
+
+    'threads': {thread_ident: {'wait': seconds, 'waits': count,
+                               'hold': seconds}}
+    'sites':   {'external_call' or 'yield': {'handoffs': count,
+                                             'wait': seconds}}
+
+    'sites' counts how many times the GIL was handed over to a waiting
+    thread after the previous holder released it around an external call
+    or explicitly yielded it, and how long that thread waited.  The hold
+    times and the sites are only counted with set_gil_profiling(True).
+    A thread whose wait time is a large fraction of its hold time is
+    GIL-bound rather than CPU-bound."""
+    w_threads = space.newdict()
+    for ident, wait_us, waits, hold_us in rgil.enum_thread_stats():
+        w_stats = space.newdict()
+        space.setitem_str(w_stats, 'wait', space.newfloat(wait_us * 1e-6))
+        space.setitem_str(w_stats, 'waits', space.newint(waits))
+        space.setitem_str(w_stats, 'hold', space.newfloat(hold_us * 1e-6))
+        space.setitem(w_threads, space.newint(ident), w_stats)
+    w_sites = space.newdict()
+    site_stats = rgil.get_site_stats()
+    for i in range(len(rgil.SITE_NAMES)):
+        handoffs, wait_us = site_stats[i]
+        w_stats = space.newdict()
+        space.setitem_str(w_stats, 'handoffs', space.newint(handoffs))
+        space.setitem_str(w_stats, 'wait', space.newfloat(wait_us * 1e-6))
+        space.setitem_str(w_sites, rgil.SITE_NAMES[i], w_stats)
+    w_result = space.newdict()
+    space.setitem_str(w_result, 'threads', w_threads)
+    space.setitem_str(w_result, 'sites', w_sites)
+    return w_result
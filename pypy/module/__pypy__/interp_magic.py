@@ -180,6 +180,15 @@ def locals_to_fast(space, w_frame):
 def save_module_content_for_future_reload(space, w_module):
     w_module.save_module_content_for_future_reload()
 
+@unwrap_spec(name='text0')
+def lazy_import(space, name):
+    """Like 'import name', but if 'name' is a .py or .pyc module that
+    is not imported yet, return an empty module object whose code will
+    only run on the first attribute access.  Parent packages are always
+    imported eagerly."""
+    from pypy.module.imp.importing import lazy_import
+    return lazy_import(space, name)
+
 def specialized_zip_2_lists(space, w_list1, w_list2):
     from pypy.objspace.std.specialisedtupleobject import specialized_zip_2_lists
     return specialized_zip_2_lists(space, w_list1, w_list2)
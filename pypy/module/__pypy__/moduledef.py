@@ -33,6 +33,11 @@ class ThreadModule(MixedModule):
         '_signals_enter':  'interp_signal.signals_enter',
         '_signals_exit':   'interp_signal.signals_exit',
         '_raise_in_thread': 'interp_signal._raise_in_thread',
+        'get_sticky_gil_threshold': 'interp_gil.get_sticky_gil_threshold',
+        'set_sticky_gil_threshold': 'interp_gil.set_sticky_gil_threshold',
+        'get_switch_interval': 'interp_gil.get_switch_interval',
+        'set_switch_interval': 'interp_gil.set_switch_interval',
+        'gil_wait_stats':  'interp_gil.gil_wait_stats',
     }
 
 
@@ -112,6 +117,7 @@ class Module(MixedModule):
         'set_debug'                 : 'interp_magic.set_debug',
         'locals_to_fast'            : 'interp_magic.locals_to_fast',
         'set_code_callback'         : 'interp_magic.set_code_callback',
+        'lazy_import'               : 'interp_magic.lazy_import',
         'save_module_content_for_future_reload':
                           'interp_magic.save_module_content_for_future_reload',
         'decode_long'               : 'interp_magic.decode_long',
@@ -122,6 +128,8 @@ class Module(MixedModule):
         'newmemoryview'             : 'interp_buffer.newmemoryview',
         'utf8content'               : 'interp_magic.utf8content',
         'list_get_physical_size'    : 'interp_magic.list_get_physical_size',
+        'gil_stats'                 : 'interp_gil.gil_stats',
+        'set_gil_profiling'         : 'interp_gil.set_gil_profiling',
     }
     if sys.platform == 'win32':
         interpleveldefs['get_console_cp'] = 'interp_magic.get_console_cp'
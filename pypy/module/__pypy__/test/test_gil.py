@@ -0,0 +1,91 @@
+from pypy.module.thread.test.support import GenericTestThread
+
+
+class AppTestGIL(GenericTestThread):
+    spaceconfig = dict(usemodules=['__pypy__', 'thread', 'time'])
+
+    def test_sticky_gil_threshold(self):
+        from __pypy__ import thread
+        old = thread.get_sticky_gil_threshold()
+        assert old >= 0.0
+        try:
+            thread.set_sticky_gil_threshold(0.0005)
+            assert abs(thread.get_sticky_gil_threshold() - 0.0005) < 1e-9
+            thread.set_sticky_gil_threshold(0)
+            assert thread.get_sticky_gil_threshold() == 0.0
+            raises(ValueError, thread.set_sticky_gil_threshold, -1.0)
+            raises(ValueError, thread.set_sticky_gil_threshold, 1e300)
+        finally:
+            thread.set_sticky_gil_threshold(old)
+
+    def test_threads_make_progress(self):
+        import thread, time
+        from __pypy__ import thread as pypythread
+        pypythread.set_sticky_gil_threshold(0.001)
+        counts = [0, 0]
+        done = []
+        def f(i):
+            while counts[0] < 100 or counts[1] < 100:
+                time.sleep(0)
+                counts[i] += 1
+            done.append(i)
+        for i in range(2):
+            thread.start_new_thread(f, (i,))
+        self.waitfor(lambda: len(done) == 2)
+        assert sorted(done) == [0, 1]
+
+    def test_switch_interval(self):
+        from __pypy__ import thread
+        old = thread.get_switch_interval()
+        assert old > 0.0
+        try:
+            thread.set_switch_interval(0.002)
+            assert abs(thread.get_switch_interval() - 0.002) < 1e-9
+            raises(ValueError, thread.set_switch_interval, 0.0)
+            raises(ValueError, thread.set_switch_interval, -1.0)
+            raises(ValueError, thread.set_switch_interval, 1e300)
+        finally:
+            thread.set_switch_interval(old)
+
+    def test_gil_wait_stats(self):
+        import thread, time
+        from __pypy__ import thread as pypythread
+        done = []
+        def f():
+            for i in range(20):
+                time.sleep(0)
+            done.append(thread.get_ident())
+        for i in range(2):
+            thread.start_new_thread(f, ())
+        self.waitfor(lambda: len(done) == 2)
+        stats = pypythread.gil_wait_stats()
+        assert isinstance(stats, dict)
+        for ident, (seconds, count) in stats.items():
+            assert isinstance(ident, (int, long))
+            assert seconds >= 0.0
+            assert count >= 0
+
+    def test_gil_stats(self):
+        import thread, time, __pypy__
+        __pypy__.set_gil_profiling(True)
+        try:
+            done = []
+            def f():
+                for i in range(20):
+                    time.sleep(0)
+                done.append(thread.get_ident())
+            for i in range(2):
+                thread.start_new_thread(f, ())
+            self.waitfor(lambda: len(done) == 2)
+            stats = __pypy__.gil_stats()
+        finally:
+            __pypy__.set_gil_profiling(False)
+        assert sorted(stats) == ['sites', 'threads']
+        assert sorted(stats['sites']) == ['external_call', 'yield']
+        for site in stats['sites'].values():
+            assert sorted(site) == ['handoffs', 'wait']
+            assert site['handoffs'] >= 0
+            assert site['wait'] >= 0.0
+        for ident, info in stats['threads'].items():
+            assert sorted(info) == ['hold', 'wait', 'waits']
+            assert info['hold'] >= 0.0
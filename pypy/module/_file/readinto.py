@@ -50,8 +50,14 @@ def direct_readinto(self, w_rwbuffer):
         # with a valid raw address
         self.check_readable()
 
-        # first "read" the part that is already sitting in buffers, if any
+        # first "read" the part that is already sitting in buffers, if any;
+        # a stream reading out of an mmap copies it directly from there
         initial_size = min(size, stream.count_buffered_bytes())
+        if initial_size > 0:
+            got = stream.read_buffered_into_raw(target_address, initial_size)
+            target_pos += got
+            size -= got
+            initial_size -= got
         if initial_size > 0:
             data = stream.read(initial_size)
             output_slice(self.space, rwbuffer, target_pos, data)
@@ -12,7 +12,10 @@ from pypy.interpreter.buffer import SimpleView
 from rpython.rlib.buffer import ByteBuffer, RawByteBuffer, SubBuffer
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rarithmetic import r_longlong, intmask
-from rpython.rlib import rposix
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rlib import jit, rposix
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
 from rpython.tool.sourcetools import func_renamer
 from pypy.module._io.interp_iobase import (
     W_IOBase, DEFAULT_BUFFER_SIZE, convert_size, trap_eintr,
@@ -22,6 +25,12 @@ from rpython.rlib import rthread
 
 STATE_ZERO, STATE_OK, STATE_DETACHED = range(3)
 
+c_memchr = rffi.llexternal('memchr', [rffi.CCHARP, rffi.INT, rffi.SIZE_T],
+                           rffi.CCHARP,
+                           compilation_info=ExternalCompilationInfo(
+                               includes=['string.h']),
+                           sandboxsafe=True, _nowrapper=True)
+
 
 def make_write_blocking_error(space, written):
     # XXX CPython reads 'errno' here.  I *think* it doesn't make sense,
@@ -231,6 +240,21 @@ class BufferedMixin:
 
     # ______________________________________________
 
+    @jit.dont_look_inside
+    def _find_newline(self, start, end):
+        """Return the position of the first newline in the buffer between
+        'start' and 'end', or -1."""
+        if end <= start:
+            return -1
+        raw = rffi.ptradd(self.buffer.get_raw_address(), start)
+        p = c_memchr(raw, rffi.cast(rffi.INT, ord('\n')),
+                     rffi.cast(rffi.SIZE_T, end - start))
+        keepalive_until_here(self.buffer)
+        if not p:
+            return -1
+        return start + (rffi.cast(lltype.Signed, p) -
+                        rffi.cast(lltype.Signed, raw))
+
     @signature(types.any(), returns=types.int())
     def _readahead(self):
         if self.readable and self.read_end != -1:
@@ -640,11 +664,7 @@ class BufferedMixin:
         have = self._readahead()
         if limit >= 0 and have > limit:
             have = limit
-        for pos in range(self.pos, self.pos+have):
-            if self.buffer[pos] == '\n':
-                break
-        else:
-            pos = -1
+        pos = self._find_newline(self.pos, self.pos + have)
         if pos >= 0:
             w_res = space.newbytes(self.buffer[self.pos:pos+1])
             self.pos = pos + 1
@@ -674,15 +694,13 @@ class BufferedMixin:
                     break
                 if limit >= 0 and have > limit:
                     have = limit
-                pos = 0
-                found = False
-                while pos < have:
-                    c = self.buffer.getitem(pos)
+                pos = self._find_newline(0, have)
+                found = pos >= 0
+                if found:
                     pos += 1
-                    if c == '\n':
-                        self.pos = pos
-                        found = True
-                        break
+                    self.pos = pos
+                else:
+                    pos = have
                 chunks.append(self.buffer[0:pos])
                 if found:
                     break
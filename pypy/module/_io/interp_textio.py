@@ -13,7 +13,7 @@ from rpython.rlib.rbigint import rbigint
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rutf8 import (check_utf8, next_codepoint_pos,
                                 codepoints_in_utf8, codepoints_in_utf8,
-                                Utf8StringBuilder)
+                                Utf8StringBuilder, first_non_ascii_char)
 
 
 STATE_ZERO, STATE_OK, STATE_DETACHED = range(3)
@@ -25,6 +25,12 @@ SEEN_ALL  = SEEN_CR | SEEN_LF | SEEN_CRLF
 
 _WINDOWS = sys.platform == 'win32'
 
+# codecs (by their normalized name) that decode ASCII bytes to the same
+# characters; the value says whether the incremental decoder may keep
+# pending input between two calls
+_ASCII_COMPATIBLE_CODECS = {'ascii': False, 'iso8859-1': False,
+                            'utf-8': True}
+
 class W_IncrementalNewlineDecoder(W_Root):
     seennl = 0
     pendingcr = False
@@ -309,6 +315,12 @@ class DecodeBuffer(object):
         self.pos = 0
         self.upos = 0
 
+    def set_ascii(self, text):
+        self.text = text
+        self.ulen = len(text)
+        self.pos = 0
+        self.upos = 0
+
     def reset(self):
         self.text = None
         self.pos = 0
@@ -375,6 +387,8 @@ class DecodeBuffer(object):
     def find_newline_universal(self, limit):
         # Universal newline search. Find any of \r, \r\n, \n
         # The decoder ensures that \r\n are not split in two pieces
+        if self.ulen == len(self.text):
+            return self._find_newline_universal_ascii(limit)
         if limit < 0:
             limit = sys.maxint
         scanned = 0
@@ -399,6 +413,36 @@ class DecodeBuffer(object):
                     return True
         return False
 
+    def _find_newline_universal_ascii(self, limit):
+        # like find_newline_universal(), but searching with str.find()
+        start = self.pos
+        end = len(self.text)
+        if limit >= 0:
+            end = min(end, start + limit)
+        assert start >= 0
+        assert end >= 0
+        pos = self.text.find('\n', start, end)
+        if pos < 0:
+            cr_end = end
+        else:
+            cr_end = pos
+        crpos = self.text.find('\r', start, cr_end)
+        if crpos >= 0:
+            pos = crpos + 1
+            found = True
+            if limit >= 0 and pos - start >= limit:
+                found = False      # reached the limit
+            elif pos < end and self.text[pos] == '\n':
+                pos += 1
+        elif pos >= 0:
+            pos += 1
+            found = True
+        else:
+            pos = end
+            found = False
+        self.pos = self.upos = pos
+        return found
+
     def find_crlf(self, limit):
         if limit < 0:
             limit = sys.maxint
@@ -465,6 +509,12 @@ class DecodeBuffer(object):
         self.upos += 1
 
 
+def _codec_name(space, w_codec):
+    w_name = space.findattr(w_codec, space.newtext("name"))
+    if w_name is None or not space.isinstance_w(w_name, space.w_bytes):
+        return None
+    return space.bytes_w(w_name)
+
 def check_decoded(space, w_decoded):
     if not space.isinstance_w(w_decoded, space.w_unicode):
         msg = "decoder should return a string result, not '%T'"
@@ -488,6 +538,11 @@ class W_TextIOWrapper(W_TextIOBase):
         self.readtranslate = False
         self.readnl = None
 
+        # Whether ASCII input may bypass the decoder: see _read_ascii_chunk()
+        self.ascii_compatible = False
+        self.decoder_may_buffer = True
+        self.decoder_clean = False
+
         self.encodefunc = None # Specialized encoding func (see below)
         self.encoding_start_of_stream = False # Whether or not it's the start
                                               # of the stream
@@ -534,6 +589,12 @@ class W_TextIOWrapper(W_TextIOBase):
                                                  space.text_w(self.w_encoding))
             self.w_decoder = space.call_method(w_codec,
                                                "incrementaldecoder", w_errors)
+            codec_name = _codec_name(space, w_codec)
+            if (codec_name is not None and
+                    codec_name in _ASCII_COMPATIBLE_CODECS):
+                self.ascii_compatible = True
+                self.decoder_may_buffer = _ASCII_COMPATIBLE_CODECS[codec_name]
+            self.decoder_clean = True
             if self.readuniversal:
                 self.w_decoder = space.call_function(
                     space.gettypeobject(W_IncrementalNewlineDecoder.typedef),
@@ -683,8 +744,12 @@ class W_TextIOWrapper(W_TextIOBase):
             raise oefmt(space.w_TypeError, msg, w_input)
 
         eof = space.len_w(w_input) == 0
+        if not eof and self._read_ascii_chunk(space, space.bytes_w(w_input)):
+            return True
+        self.decoder_clean = False
         w_decoded = space.call_method(self.w_decoder, "decode",
                                       w_input, space.newbool(eof))
+        self._decoded_input(space.bytes_w(w_input), eof)
         self.decoded.set(space, w_decoded)
         if space.len_w(w_decoded) > 0:
             eof = False
@@ -697,6 +762,40 @@ class W_TextIOWrapper(W_TextIOBase):
 
         return not eof
 
+    def _read_ascii_chunk(self, space, input):
+        """Fast path of _read_chunk() for a chunk of pure ASCII.  With an
+        ASCII-compatible codec whose decoder holds no pending input, such a
+        chunk decodes to itself: use it as the decoded text directly,
+        without calling the decoder at all.  Returns False if the chunk
+        must go through the decoder."""
+        if not self.ascii_compatible or not self.decoder_clean:
+            return False
+        if first_non_ascii_char(input) >= 0:
+            return False
+        if self.readuniversal:
+            w_decoder = self.w_decoder
+            if not isinstance(w_decoder, W_IncrementalNewlineDecoder):
+                return False
+            # without any \r there is nothing to translate, and nothing
+            # to keep in 'pendingcr'
+            if w_decoder.pendingcr or input.find('\r') >= 0:
+                return False
+            if input.find('\n') >= 0:
+                w_decoder.seennl |= SEEN_LF
+        self.decoded.set_ascii(input)
+        if self.telling:
+            # the decoder state is (b'', 0) before and after this chunk
+            self.snapshot = PositionSnapshot(0, input)
+        return True
+
+    def _decoded_input(self, input, final):
+        # called after the decoder was fed 'input': record if it may now
+        # hold some incomplete character
+        if not self.decoder_may_buffer or final:
+            self.decoder_clean = True
+        else:
+            self.decoder_clean = input != '' and ord(input[-1]) < 0x80
+
     def _ensure_data(self, space):
         while not self.decoded.has_data():
             try:
@@ -732,7 +831,9 @@ class W_TextIOWrapper(W_TextIOBase):
         if size < 0:
             # Read everything
             w_bytes = space.call_method(self.w_buffer, "read")
+            self.decoder_clean = False
             w_decoded = space.call_method(self.w_decoder, "decode", w_bytes, space.w_True)
+            self.decoder_clean = True
             check_decoded(space, w_decoded)
             chars, lgt = self.decoded.get_chars(-1)
             w_result = space.newutf8(chars, lgt)
@@ -894,6 +995,7 @@ class W_TextIOWrapper(W_TextIOBase):
 
         if self.w_decoder:
             space.call_method(self.w_decoder, "reset")
+            self.decoder_clean = True
 
         return space.newint(textlen)
 
@@ -937,12 +1039,14 @@ class W_TextIOWrapper(W_TextIOBase):
         # This is for a few decoders such as utf-16 for which the state value
         # at start is not (b"", 0) but e.g. (b"", 2) (meaning, in the case of
         # utf-16, that we are expecting a BOM).
+        self.decoder_clean = False
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
             space.call_method(self.w_decoder, "reset")
         else:
             space.call_method(self.w_decoder, "setstate",
                               space.newtuple2(space.newbytes(""),
                                               space.newint(cookie.dec_flags)))
+        self.decoder_clean = True
 
     def _encoder_setstate(self, space, cookie):
         if cookie.start_pos == 0 and cookie.dec_flags == 0:
@@ -978,6 +1082,7 @@ class W_TextIOWrapper(W_TextIOBase):
             self.snapshot = None
             if self.w_decoder:
                 space.call_method(self.w_decoder, "reset")
+                self.decoder_clean = True
             return space.call_method(self.w_buffer, "seek",
                                      w_pos, space.newint(whence))
 
@@ -1018,8 +1123,11 @@ class W_TextIOWrapper(W_TextIOBase):
             self.snapshot = PositionSnapshot(cookie.dec_flags,
                                              space.bytes_w(w_chunk))
 
+            self.decoder_clean = False
             w_decoded = space.call_method(self.w_decoder, "decode",
                                           w_chunk, space.newbool(bool(cookie.need_eof)))
+            self._decoded_input(space.bytes_w(w_chunk),
+                                bool(cookie.need_eof))
             w_decoded = check_decoded(space, w_decoded)
 
             # Skip chars_to_skip of the decoded characters
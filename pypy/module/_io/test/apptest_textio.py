@@ -200,6 +200,30 @@ def test_readline():
     reads += txt.readline()
     assert reads == r
 
+def test_readline_ascii_and_non_ascii_chunks():
+    data = (u"abc\n" * 5 + u"\xe9t\xe9\r\n" + u"d\re\n" * 3).encode("utf-8")
+    for chunk_size in range(1, 12):
+        txt = _io.TextIOWrapper(_io.BytesIO(data), encoding="utf-8")
+        txt._CHUNK_SIZE = chunk_size
+        lines = list(txt)
+        assert lines == [u"abc\n"] * 5 + [u"\xe9t\xe9\n"] + [u"d\n", u"e\n"] * 3
+        assert txt.newlines == ("\r", "\n", "\r\n")
+
+def test_tell_after_ascii_readline():
+    data = "first\nsecond\nthird\n"
+    txt = _io.TextIOWrapper(_io.BufferedReader(_io.BytesIO(data)),
+                            encoding="latin-1")
+    txt._CHUNK_SIZE = 4
+    assert txt.readline() == u"first\n"
+    pos = txt.tell()
+    assert pos == 6
+    assert txt.readline() == u"second\n"
+    txt.seek(pos)
+    assert txt.readline() == u"second\n"
+    assert txt.readline(3) == u"thi"
+    assert txt.readline() == u"rd\n"
+    assert txt.newlines == "\n"
+
 def test_name():
     t = _io.TextIOWrapper(_io.BytesIO(""))
     # CPython raises an AttributeError, we raise a TypeError.
@@ -186,6 +186,19 @@ class AppTestBufferedReader:
         f = _io.BufferedReader(raw)
         assert f.readlines() == ['a\n', 'b\n', 'c']
 
+    def test_readline_across_refills(self):
+        import _io
+        data = 'x' * 10 + '\n' + 'y' * 25 + '\n' + 'zz'
+        raw = _io.BytesIO(data)
+        f = _io.BufferedReader(raw, 8)
+        assert f.readline() == 'x' * 10 + '\n'
+        assert f.readline(5) == 'yyyyy'
+        assert f.readline() == 'y' * 20 + '\n'
+        assert f.readline() == 'zz'
+        assert f.readline() == ''
+        f = _io.BufferedReader(_io.BytesIO(data), 8)
+        assert list(f) == data.splitlines(True)
+
     def test_detach(self):
         import _io
         raw = _io.FileIO(self.tmpfile)
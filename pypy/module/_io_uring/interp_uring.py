@@ -0,0 +1,253 @@
+from rpython.rlib import rgc, rio_uring
+from rpython.rlib.buffer import RawBuffer
+from rpython.rtyper.lltypesystem import lltype, rffi
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.buffer import SimpleView
+from pypy.interpreter.error import oefmt, wrap_oserror
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+
+
+class W_Buffer(W_Root):
+    """Fixed-size raw memory, which never moves.  This is what the kernel
+    reads from or writes into, possibly after the call that queued the
+    operation has returned."""
+
+    def __init__(self, size):
+        self.size = size
+        self.ll_buffer = lltype.malloc(rffi.CCHARP.TO, size, flavor='raw',
+                                       zero=True)
+        rgc.add_memory_pressure(size, self)
+
+    @rgc.must_be_light_finalizer
+    def __del__(self):
+        if self.ll_buffer:
+            lltype.free(self.ll_buffer, flavor='raw')
+            self.ll_buffer = lltype.nullptr(rffi.CCHARP.TO)
+
+    @unwrap_spec(size=int)
+    def descr__new__(space, w_subtype, size):
+        if size <= 0:
+            raise oefmt(space.w_ValueError, "buffer size must be positive")
+        return W_Buffer(size)
+
+    def buffer_w(self, space, flags):
+        return SimpleView(UringBuffer(self))
+
+    def readbuf_w(self, space):
+        return UringBuffer(self, readonly=True)
+
+    def writebuf_w(self, space):
+        return UringBuffer(self)
+
+    def descr_len(self, space):
+        return space.newint(self.size)
+
+    def get_raw_slice(self, space, start, length):
+        if length < 0:
+            length = self.size - start
+        if start < 0 or length < 0 or start + length > self.size:
+            raise oefmt(space.w_ValueError, "buffer slice out of bounds")
+        return rffi.ptradd(self.ll_buffer, start), length
+
+W_Buffer.typedef = TypeDef("_io_uring.Buffer",
+    __new__ = interp2app(W_Buffer.descr__new__.im_func),
+    __len__ = interp2app(W_Buffer.descr_len),
+)
+W_Buffer.typedef.acceptable_as_base_class = False
+
+
+class UringBuffer(RawBuffer):
+    _immutable_ = True
+
+    def __init__(self, w_buffer, readonly=False):
+        self.w_buffer = w_buffer
+        self.readonly = readonly
+
+    def getlength(self):
+        return self.w_buffer.size
+
+    def getitem(self, index):
+        return self.w_buffer.ll_buffer[index]
+
+    def setitem(self, index, char):
+        self.w_buffer.ll_buffer[index] = char
+
+    def getslice(self, start, step, size):
+        if step == 1:
+            return rffi.charpsize2str(
+                rffi.ptradd(self.w_buffer.ll_buffer, start), size)
+        return RawBuffer.getslice(self, start, step, size)
+
+    def get_raw_address(self):
+        return self.w_buffer.ll_buffer
+
+
+class Pending(object):
+    def __init__(self, w_user_data, w_buffer):
+        self.w_user_data = w_user_data
+        self.w_buffer = w_buffer
+
+# the buffers of operations still in flight when their ring is closed: the
+# kernel may still write into them, so they are never freed
+_orphan_buffers = []
+
+
+class W_Ring(W_Root):
+    def __init__(self, space, ring):
+        self.space = space
+        self.ring = ring
+        self.pending = {}
+        self.next_id = 0
+        self.register_finalizer(space)
+
+    @unwrap_spec(entries=int)
+    def descr__new__(space, w_subtype, entries=256):
+        if entries <= 0:
+            raise oefmt(space.w_ValueError,
+                        "entries must be greater than zero, got %d", entries)
+        try:
+            ring = rio_uring.IOUring(entries)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+        return W_Ring(space, ring)
+
+    def _finalize_(self):
+        self.close()
+
+    def get_closed(self):
+        return not self.ring.ll_ring
+
+    def check_closed(self, space):
+        if self.get_closed():
+            raise oefmt(space.w_ValueError, "I/O operation on closed ring")
+
+    def close(self):
+        if not self.get_closed():
+            for pending in self.pending.values():
+                if pending.w_buffer is not None:
+                    _orphan_buffers.append(pending.w_buffer)
+            self.pending.clear()
+            self.ring.close()
+            self.may_unregister_rpython_finalizer(self.space)
+
+    def _prep(self, space, opcode, fd, w_buffer, start, length, offset,
+              flags, w_user_data):
+        self.check_closed(space)
+        if w_buffer is None:
+            ll_buf = lltype.nullptr(rffi.CCHARP.TO)
+        else:
+            buf = space.interp_w(W_Buffer, w_buffer)
+            ll_buf, length = buf.get_raw_slice(space, start, length)
+        ident = self.next_id
+        if not self.ring.prep(opcode, fd, ll_buf, length, offset, flags,
+                              ident):
+            # the submission ring is full: flush it and try again
+            self._submit(space, 0)
+            if not self.ring.prep(opcode, fd, ll_buf, length, offset, flags,
+                                  ident):
+                raise oefmt(space.w_BufferError,
+                            "io_uring submission queue is full")
+        self.next_id = ident + 1
+        self.pending[ident] = Pending(w_user_data, w_buffer)
+
+    def _submit(self, space, wait_nr):
+        try:
+            return self.ring.submit(wait_nr)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+
+    def descr_get_closed(self, space):
+        return space.newbool(self.get_closed())
+
+    def descr_fileno(self, space):
+        self.check_closed(space)
+        return space.newint(self.ring.fileno())
+
+    def descr_close(self, space):
+        self.close()
+
+    def descr_len(self, space):
+        return space.newint(len(self.pending))
+
+    @unwrap_spec(start=int, length=int, offset=int)
+    def descr_prep_read(self, space, w_fd, w_buffer, start=0, length=-1,
+                        offset=-1, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_READ,
+                   space.c_filedescriptor_w(w_fd), w_buffer,
+                   start, length, offset, 0, w_user_data)
+
+    @unwrap_spec(start=int, length=int, offset=int)
+    def descr_prep_write(self, space, w_fd, w_buffer, start=0, length=-1,
+                         offset=-1, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_WRITE,
+                   space.c_filedescriptor_w(w_fd), w_buffer,
+                   start, length, offset, 0, w_user_data)
+
+    @unwrap_spec(start=int, length=int, flags=int)
+    def descr_prep_recv(self, space, w_fd, w_buffer, start=0, length=-1,
+                        flags=0, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_RECV,
+                   space.c_filedescriptor_w(w_fd), w_buffer,
+                   start, length, 0, flags, w_user_data)
+
+    @unwrap_spec(start=int, length=int, flags=int)
+    def descr_prep_send(self, space, w_fd, w_buffer, start=0, length=-1,
+                        flags=0, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_SEND,
+                   space.c_filedescriptor_w(w_fd), w_buffer,
+                   start, length, 0, flags, w_user_data)
+
+    @unwrap_spec(flags=int)
+    def descr_prep_accept(self, space, w_fd, flags=0, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_ACCEPT,
+                   space.c_filedescriptor_w(w_fd), None,
+                   0, 0, 0, flags, w_user_data)
+
+    def descr_prep_nop(self, space, w_user_data=None):
+        self._prep(space, rio_uring.IORING_OP_NOP, -1, None,
+                   0, 0, 0, 0, w_user_data)
+
+    @unwrap_spec(wait_nr=int)
+    def descr_submit(self, space, wait_nr=0):
+        self.check_closed(space)
+        if wait_nr < 0:
+            raise oefmt(space.w_ValueError, "wait_nr must not be negative")
+        return space.newint(self._submit(space, wait_nr))
+
+    def descr_completions(self, space):
+        self.check_closed(space)
+        result_w = []
+        while True:
+            reaped = self.ring.reap(64)
+            for ident, res in reaped:
+                pending = self.pending.pop(ident, None)
+                if pending is None:
+                    continue
+                w_user_data = pending.w_user_data
+                if w_user_data is None:
+                    w_user_data = space.w_None
+                result_w.append(space.newtuple2(w_user_data,
+                                                space.newint(res)))
+            if len(reaped) < 64:
+                break
+        return space.newlist(result_w)
+
+
+W_Ring.typedef = TypeDef("_io_uring.Ring",
+    __new__ = interp2app(W_Ring.descr__new__.im_func),
+    __len__ = interp2app(W_Ring.descr_len),
+    closed = GetSetProperty(W_Ring.descr_get_closed),
+    fileno = interp2app(W_Ring.descr_fileno),
+    close = interp2app(W_Ring.descr_close),
+    prep_read = interp2app(W_Ring.descr_prep_read),
+    prep_write = interp2app(W_Ring.descr_prep_write),
+    prep_recv = interp2app(W_Ring.descr_prep_recv),
+    prep_send = interp2app(W_Ring.descr_prep_send),
+    prep_accept = interp2app(W_Ring.descr_prep_accept),
+    prep_nop = interp2app(W_Ring.descr_prep_nop),
+    submit = interp2app(W_Ring.descr_submit),
+    completions = interp2app(W_Ring.descr_completions),
+)
+W_Ring.typedef.acceptable_as_base_class = False
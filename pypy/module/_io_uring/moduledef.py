@@ -0,0 +1,21 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+
+class Module(MixedModule):
+    """Batched asynchronous I/O with the Linux io_uring interface.
+
+    Reads, writes, accepts, recvs and sends are queued with the prep_*()
+    methods of a Ring and handed to the kernel together by a single call
+    to submit(), which releases the GIL only once for the whole batch.
+    Finished operations are then collected with completions() as a list
+    of (user_data, result) pairs; a negative result is -errno.  The data
+    goes to and from Buffer objects, whose memory never moves.
+    """
+
+    appleveldefs = {
+    }
+
+    interpleveldefs = {
+        'Ring': 'interp_uring.W_Ring',
+        'Buffer': 'interp_uring.W_Buffer',
+    }
@@ -0,0 +1,117 @@
+import py
+
+from rpython.rlib import rio_uring
+from rpython.tool.udir import udir
+
+if not rio_uring.IS_SUPPORTED:
+    py.test.skip("io_uring not supported on this platform")
+
+
+class AppTestIOUring(object):
+    spaceconfig = {'usemodules': ['_io_uring', '_socket', 'posix']}
+
+    def setup_class(cls):
+        try:
+            rio_uring.IOUring(2).close()
+        except OSError:
+            py.test.skip("io_uring_setup() fails here")
+        cls.w_tmpfilename = cls.space.wrap(str(udir.join('test_io_uring.1')))
+
+    def test_buffer(self):
+        import _io_uring
+        buf = _io_uring.Buffer(10)
+        assert len(buf) == 10
+        m = memoryview(buf)
+        assert m.tobytes() == '\x00' * 10
+        m[2:5] = 'abc'
+        assert m[:6].tobytes() == '\x00\x00abc\x00'
+        raises(ValueError, _io_uring.Buffer, 0)
+
+    def test_nop(self):
+        import _io_uring
+        ring = _io_uring.Ring(4)
+        assert ring.fileno() > 0
+        assert not ring.closed
+        for i in range(10):     # more than fits in the ring at once
+            ring.prep_nop(user_data=i)
+        assert len(ring) == 10
+        got = []
+        while len(got) < 10:
+            ring.submit(1)
+            got += ring.completions()
+        assert sorted(got) == [(i, 0) for i in range(10)]
+        assert len(ring) == 0
+        ring.close()
+        assert ring.closed
+        raises(ValueError, ring.submit)
+        raises(ValueError, ring.prep_nop)
+        ring.close()
+
+    def test_read_write_file(self):
+        import _io_uring, os
+        buf = _io_uring.Buffer(32)
+        memoryview(buf)[:11] = 'hello world'
+        ring = _io_uring.Ring()
+        fd = os.open(self.tmpfilename, os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+        try:
+            ring.prep_write(fd, buf, 0, 5, offset=0, user_data='w1')
+            ring.prep_write(fd, buf, 5, 6, offset=5, user_data='w2')
+            assert ring.submit(2) == 2
+            assert sorted(ring.completions()) == [('w1', 5), ('w2', 6)]
+            ring.prep_read(fd, buf, 16, offset=6, user_data='r')
+            ring.submit(1)
+            assert ring.completions() == [('r', 5)]
+            assert memoryview(buf)[16:21].tobytes() == 'world'
+            raises(ValueError, ring.prep_read, fd, buf, 30, 5)
+            raises(ValueError, ring.prep_read, fd, buf, -1)
+        finally:
+            os.close(fd)
+            ring.close()
+
+    def test_errors_are_results(self):
+        import _io_uring, os, errno
+        buf = _io_uring.Buffer(8)
+        ring = _io_uring.Ring()
+        r, w = os.pipe()
+        try:
+            ring.prep_read(w, buf, user_data=1)
+            ring.submit(1)
+            [(user_data, res)] = ring.completions()
+            assert user_data == 1
+            assert res == -errno.EBADF
+        finally:
+            os.close(r)
+            os.close(w)
+            ring.close()
+
+    def test_socket_echo(self):
+        import _io_uring, _socket
+        listener = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(5)
+        client = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+        ring = _io_uring.Ring()
+        buf = _io_uring.Buffer(64)
+        try:
+            ring.prep_accept(listener, user_data='accept')
+            ring.submit()
+            client.connect(listener.getsockname())
+            ring.submit(1)
+            [(tag, conn_fd)] = ring.completions()
+            assert tag == 'accept'
+            assert conn_fd >= 0
+            client.sendall('ping')
+            ring.prep_recv(conn_fd, buf, user_data='recv')
+            ring.submit(1)
+            [(tag, n)] = ring.completions()
+            assert (tag, n) == ('recv', 4)
+            ring.prep_send(conn_fd, buf, 0, n, user_data='send')
+            ring.submit(1)
+            assert ring.completions() == [('send', 4)]
+            assert client.recv(10) == 'ping'
+            import os
+            os.close(conn_fd)
+        finally:
+            client.close()
+            listener.close()
+            ring.close()
@@ -0,0 +1,4 @@
+from pypy.objspace.fake.checkmodule import checkmodule
+
+def test_io_uring_translates():
+    checkmodule('_io_uring')
@@ -25,4 +25,6 @@ def enable(space, fileno):
 @jit.dont_look_inside
 def disable(space):
     """ Disable PyPy's logging facility. """
+    if space.config.translation.thread:
+        rjitlog.log_gil_stats()
     rjitlog.disable_jitlog()
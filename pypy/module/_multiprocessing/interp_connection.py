@@ -10,6 +10,7 @@ from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.gateway import (
     WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import GetSetProperty, TypeDef
+from pypy.module._multiprocessing import interp_pickle
 
 READABLE, WRITABLE = range(1, 3)
 PY_SSIZE_T_MAX = sys.maxint
@@ -132,6 +133,10 @@ class W_BaseConnection(W_Root):
     @unwrap_spec(offset='index')
     def recv_bytes_into(self, space, w_buffer, offset=0):
         rwbuffer = space.writebuf_w(w_buffer)
+        res = self.do_recv_into(space, rwbuffer, offset)
+        return space.newint(res)
+
+    def do_recv_into(self, space, rwbuffer, offset):
         length = rwbuffer.getlength()
 
         res, newbuf = self.do_recv_string(
@@ -144,19 +149,19 @@ class W_BaseConnection(W_Root):
         finally:
             if newbuf:
                 rffi.free_charp(newbuf)
-
-        return space.newint(res)
+        return res
 
     def send(self, space, w_obj):
         self._check_writable(space)
 
-        w_picklemodule = space.fromcache(State).w_picklemodule
-        w_protocol = space.getattr(
-            w_picklemodule, space.newtext("HIGHEST_PROTOCOL"))
-        w_pickled = space.call_method(
-            w_picklemodule, "dumps", w_obj, w_protocol)
-
-        buf = space.bytes_w(w_pickled)
+        buf = interp_pickle.dumps(space, w_obj)
+        if buf is None:
+            w_picklemodule = space.fromcache(State).w_picklemodule
+            w_protocol = space.getattr(
+                w_picklemodule, space.newtext("HIGHEST_PROTOCOL"))
+            w_pickled = space.call_method(
+                w_picklemodule, "dumps", w_obj, w_protocol)
+            buf = space.bytes_w(w_pickled)
         self.do_send_string(space, buf, 0, len(buf))
 
     def recv(self, space):
@@ -166,17 +171,18 @@ class W_BaseConnection(W_Root):
             space, self.BUFFER_SIZE, PY_SSIZE_T_MAX)
         try:
             if newbuf:
-                w_received = space.newbytes(rffi.charpsize2str(newbuf, res))
+                received = rffi.charpsize2str(newbuf, res)
             else:
-                w_received = space.newbytes(rffi.charpsize2str(self.buffer, res))
+                received = rffi.charpsize2str(self.buffer, res)
         finally:
             if newbuf:
                 rffi.free_charp(newbuf)
 
-        w_builtins = space.getbuiltinmodule('__builtin__')
-        w_picklemodule = space.fromcache(State).w_picklemodule
-        w_unpickled = space.call_method(
-            w_picklemodule, "loads", w_received)
+        w_unpickled = interp_pickle.loads(space, received)
+        if w_unpickled is None:
+            w_picklemodule = space.fromcache(State).w_picklemodule
+            w_unpickled = space.call_method(
+                w_picklemodule, "loads", space.newbytes(received))
 
         return w_unpickled
 
@@ -0,0 +1,516 @@
+"""A native pickler and unpickler for what connections usually carry: None,
+bools, ints, floats, str, unicode, and tuples, lists and dicts of them, as
+well as module-level functions and classes.  Both produce or accept pickle
+protocol 2, so that the other end of a connection can still be the pickle
+module.  On anything else dumps() and loads() return None, and the whole
+object goes through the pickle module instead.
+"""
+
+from rpython.rlib import rutf8
+from rpython.rlib.rarithmetic import intmask, string_to_int
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.rstring import (
+    StringBuilder, ParseStringError, ParseStringOverflowError)
+from rpython.rlib.rstruct import ieee
+
+from pypy.interpreter.function import Function
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.listobject import W_ListObject
+
+# the opcodes of pickle.py that are used here
+MARK = '('
+STOP = '.'
+INT = 'I'
+BININT = 'J'
+BININT1 = 'K'
+BININT2 = 'M'
+NONE = 'N'
+BINFLOAT = 'G'
+BINSTRING = 'T'
+SHORT_BINSTRING = 'U'
+BINUNICODE = 'X'
+APPEND = 'a'
+APPENDS = 'e'
+GLOBAL = 'c'
+DICT = 'd'
+EMPTY_DICT = '}'
+LIST = 'l'
+EMPTY_LIST = ']'
+SETITEM = 's'
+SETITEMS = 'u'
+TUPLE = 't'
+EMPTY_TUPLE = ')'
+BINGET = 'h'
+LONG_BINGET = 'j'
+BINPUT = 'q'
+LONG_BINPUT = 'r'
+PROTO = '\x80'
+TUPLE1 = '\x85'
+TUPLE2 = '\x86'
+TUPLE3 = '\x87'
+NEWTRUE = '\x88'
+NEWFALSE = '\x89'
+LONG1 = '\x8a'
+
+MAX_DEPTH = 200
+
+
+class CannotPickle(Exception):
+    pass
+
+
+class Pickler(object):
+    def __init__(self, space):
+        self.space = space
+        self.builder = StringBuilder()
+        self.memo = {}
+        self.tuples_in_progress = {}
+        self.depth = 0
+
+    def dumps(self, w_obj):
+        self.builder.append(PROTO)
+        self.builder.append('\x02')
+        self.save(w_obj)
+        self.builder.append(STOP)
+        return self.builder.build()
+
+    def write_int4(self, value):
+        for i in range(4):
+            self.builder.append(chr((value >> (i * 8)) & 0xff))
+
+    def put(self, w_obj):
+        index = len(self.memo)
+        self.memo[w_obj] = index
+        if index < 256:
+            self.builder.append(BINPUT)
+            self.builder.append(chr(index))
+        else:
+            self.builder.append(LONG_BINPUT)
+            self.write_int4(index)
+
+    def save(self, w_obj):
+        space = self.space
+        w_type = space.type(w_obj)
+        if w_type is space.w_int:
+            self.save_int(space.int_w(w_obj))
+        elif w_type is space.w_float:
+            self.save_float(space.float_w(w_obj))
+        elif w_type is space.w_bool:
+            if space.is_true(w_obj):
+                self.builder.append(NEWTRUE)
+            else:
+                self.builder.append(NEWFALSE)
+        elif space.is_w(w_obj, space.w_None):
+            self.builder.append(NONE)
+        else:
+            index = self.memo.get(w_obj, -1)
+            if index >= 0:
+                if index < 256:
+                    self.builder.append(BINGET)
+                    self.builder.append(chr(index))
+                else:
+                    self.builder.append(LONG_BINGET)
+                    self.write_int4(index)
+                return
+            if w_type is space.w_bytes:
+                self.save_bytes(space.bytes_w(w_obj))
+                self.put(w_obj)
+            elif w_type is space.w_unicode:
+                utf8 = space.utf8_w(w_obj)
+                if len(utf8) > 0x7fffffff:
+                    raise CannotPickle
+                self.builder.append(BINUNICODE)
+                self.write_int4(len(utf8))
+                self.builder.append(utf8)
+                self.put(w_obj)
+            elif w_type is space.w_tuple:
+                self.save_tuple(w_obj)
+            elif w_type is space.w_list:
+                self.save_list(w_obj)
+            elif w_type is space.w_dict:
+                self.save_dict(w_obj)
+            elif w_type is space.w_type or isinstance(w_obj, Function):
+                self.save_global(w_obj)
+            else:
+                raise CannotPickle
+
+    def save_int(self, value):
+        if 0 <= value < 0x100:
+            self.builder.append(BININT1)
+            self.builder.append(chr(value))
+        elif 0 <= value < 0x10000:
+            self.builder.append(BININT2)
+            self.builder.append(chr(value & 0xff))
+            self.builder.append(chr(value >> 8))
+        elif (value >> 31) == 0 or (value >> 31) == -1:
+            self.builder.append(BININT)
+            self.write_int4(value)
+        else:
+            # this is what pickle.py does for ints that need 64 bits
+            self.builder.append(INT)
+            self.builder.append(str(value))
+            self.builder.append('\n')
+
+    def save_float(self, value):
+        bits = ieee.float_pack(value, 8)
+        self.builder.append(BINFLOAT)
+        for i in range(7, -1, -1):
+            self.builder.append(chr(intmask((bits >> (i * 8)) & 0xff)))
+
+    def save_bytes(self, s):
+        length = len(s)
+        if length < 256:
+            self.builder.append(SHORT_BINSTRING)
+            self.builder.append(chr(length))
+        elif length <= 0x7fffffff:
+            self.builder.append(BINSTRING)
+            self.write_int4(length)
+        else:
+            raise CannotPickle
+        self.builder.append(s)
+
+    def enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise CannotPickle
+
+    def save_tuple(self, w_tuple):
+        items_w = self.space.fixedview(w_tuple)
+        length = len(items_w)
+        if length == 0:
+            self.builder.append(EMPTY_TUPLE)
+            return
+        if w_tuple in self.tuples_in_progress:
+            # a recursive tuple, leave it to pickle.py
+            raise CannotPickle
+        self.tuples_in_progress[w_tuple] = None
+        self.enter()
+        if length > 3:
+            self.builder.append(MARK)
+        for w_item in items_w:
+            self.save(w_item)
+        if length == 1:
+            self.builder.append(TUPLE1)
+        elif length == 2:
+            self.builder.append(TUPLE2)
+        elif length == 3:
+            self.builder.append(TUPLE3)
+        else:
+            self.builder.append(TUPLE)
+        self.depth -= 1
+        del self.tuples_in_progress[w_tuple]
+        self.put(w_tuple)
+
+    def save_list(self, w_list):
+        assert isinstance(w_list, W_ListObject)
+        self.builder.append(EMPTY_LIST)
+        self.put(w_list)
+        if w_list.length() == 0:
+            return
+        self.enter()
+        self.builder.append(MARK)
+        # write the unwrapped items of lists with a strategy directly
+        intlist = w_list.getitems_int()
+        if intlist is not None:
+            for value in intlist:
+                self.save_int(value)
+        else:
+            floatlist = w_list.getitems_float()
+            if floatlist is not None:
+                for value in floatlist:
+                    self.save_float(value)
+            else:
+                byteslist = w_list.getitems_bytes()
+                if byteslist is not None:
+                    for s in byteslist:
+                        self.save_bytes(s)
+                else:
+                    for w_item in w_list.getitems_copy():
+                        self.save(w_item)
+        self.builder.append(APPENDS)
+        self.depth -= 1
+
+    def save_dict(self, w_dict):
+        assert isinstance(w_dict, W_DictMultiObject)
+        self.builder.append(EMPTY_DICT)
+        self.put(w_dict)
+        if w_dict.length() == 0:
+            return
+        self.enter()
+        self.builder.append(MARK)
+        iterator = w_dict.iteritems()
+        while True:
+            w_key, w_value = iterator.next_item()
+            if w_key is None:
+                break
+            self.save(w_key)
+            self.save(w_value)
+        self.builder.append(SETITEMS)
+        self.depth -= 1
+
+    def save_global(self, w_obj):
+        # like pickle.py, only if the object can be found again under its
+        # own name in its module
+        space = self.space
+        w_module = space.findattr(w_obj, space.newtext('__module__'))
+        w_name = space.findattr(w_obj, space.newtext('__name__'))
+        if (w_module is None or w_name is None or
+                not space.isinstance_w(w_module, space.w_bytes) or
+                not space.isinstance_w(w_name, space.w_bytes)):
+            raise CannotPickle
+        module = space.bytes_w(w_module)
+        name = space.bytes_w(w_name)
+        if '\n' in module or '\n' in name:
+            raise CannotPickle
+        w_mod = space.finditem_str(space.sys.get('modules'), module)
+        if w_mod is None:
+            raise CannotPickle
+        w_found = space.findattr(w_mod, w_name)
+        if w_found is None or not space.is_w(w_found, w_obj):
+            raise CannotPickle
+        self.builder.append(GLOBAL)
+        self.builder.append(module)
+        self.builder.append('\n')
+        self.builder.append(name)
+        self.builder.append('\n')
+        self.put(w_obj)
+
+
+class Unpickler(object):
+    def __init__(self, space, data):
+        self.space = space
+        self.data = data
+        self.pos = 0
+        self.stack_w = []
+        self.marks = []
+        self.memo = {}
+
+    def read_byte(self):
+        pos = self.pos
+        if pos >= len(self.data):
+            raise CannotPickle
+        self.pos = pos + 1
+        return ord(self.data[pos])
+
+    def read_uint2(self):
+        return self.read_byte() | (self.read_byte() << 8)
+
+    def read_int4(self):
+        value = 0
+        for i in range(4):
+            value |= self.read_byte() << (i * 8)
+        if value >= 0x80000000:
+            value -= 0x100000000
+        return value
+
+    def read(self, length):
+        pos = self.pos
+        end = pos + length
+        if length < 0 or end > len(self.data):
+            raise CannotPickle
+        self.pos = end
+        assert pos >= 0
+        return self.data[pos:end]
+
+    def readline(self):
+        pos = self.pos
+        end = self.data.find('\n', pos)
+        if end < 0:
+            raise CannotPickle
+        self.pos = end + 1
+        return self.data[pos:end]
+
+    def push(self, w_obj):
+        self.stack_w.append(w_obj)
+
+    def pop(self):
+        if not self.stack_w or (self.marks and
+                                self.marks[-1] == len(self.stack_w)):
+            raise CannotPickle
+        return self.stack_w.pop()
+
+    def top(self):
+        if not self.stack_w:
+            raise CannotPickle
+        return self.stack_w[-1]
+
+    def pop_mark(self):
+        if not self.marks:
+            raise CannotPickle
+        start = self.marks.pop()
+        assert start >= 0
+        items_w = self.stack_w[start:]
+        del self.stack_w[start:]
+        return items_w
+
+    def top_list(self):
+        w_list = self.top()
+        if self.space.type(w_list) is not self.space.w_list:
+            raise CannotPickle
+        assert isinstance(w_list, W_ListObject)
+        return w_list
+
+    def top_dict(self):
+        w_dict = self.top()
+        if self.space.type(w_dict) is not self.space.w_dict:
+            raise CannotPickle
+        return w_dict
+
+    def loads(self):
+        space = self.space
+        while True:
+            op = chr(self.read_byte())
+            if op == BININT1:
+                self.push(space.newint(self.read_byte()))
+            elif op == BININT2:
+                self.push(space.newint(self.read_uint2()))
+            elif op == BININT:
+                self.push(space.newint(self.read_int4()))
+            elif op == BINFLOAT:
+                self.push(space.newfloat(ieee.unpack_float(self.read(8),
+                                                           True)))
+            elif op == SHORT_BINSTRING:
+                self.push(space.newbytes(self.read(self.read_byte())))
+            elif op == BINSTRING:
+                self.push(space.newbytes(self.read(self.read_int4())))
+            elif op == BINUNICODE:
+                utf8 = self.read(self.read_int4())
+                try:
+                    length = rutf8.check_utf8(utf8, True)
+                except rutf8.CheckError:
+                    raise CannotPickle
+                self.push(space.newutf8(utf8, length))
+            elif op == BINPUT:
+                self.memo[self.read_byte()] = self.top()
+            elif op == LONG_BINPUT:
+                self.memo[self.read_int4()] = self.top()
+            elif op == BINGET or op == LONG_BINGET:
+                if op == BINGET:
+                    index = self.read_byte()
+                else:
+                    index = self.read_int4()
+                w_obj = self.memo.get(index, None)
+                if w_obj is None:
+                    raise CannotPickle
+                self.push(w_obj)
+            elif op == MARK:
+                self.marks.append(len(self.stack_w))
+            elif op == EMPTY_LIST:
+                self.push(space.newlist([]))
+            elif op == LIST:
+                self.push(space.newlist(self.pop_mark()))
+            elif op == APPEND:
+                w_item = self.pop()
+                self.top_list().append(w_item)
+            elif op == APPENDS:
+                items_w = self.pop_mark()
+                w_list = self.top_list()
+                if w_list.length() == 0:
+                    w_list.extend(space.newlist(items_w))
+                else:
+                    for w_item in items_w:
+                        w_list.append(w_item)
+            elif op == EMPTY_DICT:
+                self.push(space.newdict())
+            elif op == DICT:
+                items_w = self.pop_mark()
+                w_dict = space.newdict()
+                self.setitems(w_dict, items_w)
+                self.push(w_dict)
+            elif op == SETITEM:
+                w_value = self.pop()
+                w_key = self.pop()
+                space.setitem(self.top_dict(), w_key, w_value)
+            elif op == SETITEMS:
+                items_w = self.pop_mark()
+                self.setitems(self.top_dict(), items_w)
+            elif op == EMPTY_TUPLE:
+                self.push(space.newtuple([]))
+            elif op == TUPLE1:
+                w_a = self.pop()
+                self.push(space.newtuple([w_a]))
+            elif op == TUPLE2:
+                w_b = self.pop()
+                w_a = self.pop()
+                self.push(space.newtuple2(w_a, w_b))
+            elif op == TUPLE3:
+                w_c = self.pop()
+                w_b = self.pop()
+                w_a = self.pop()
+                self.push(space.newtuple([w_a, w_b, w_c]))
+            elif op == TUPLE:
+                self.push(space.newtuple(self.pop_mark()))
+            elif op == NONE:
+                self.push(space.w_None)
+            elif op == NEWTRUE:
+                self.push(space.w_True)
+            elif op == NEWFALSE:
+                self.push(space.w_False)
+            elif op == INT:
+                self.push(self.load_int(self.readline()))
+            elif op == LONG1:
+                data = self.read(self.read_byte())
+                if not data:
+                    self.push(space.newlong(0))
+                else:
+                    self.push(space.newlong_from_rbigint(
+                        rbigint.frombytes(data, 'little', signed=True)))
+            elif op == GLOBAL:
+                module = self.readline()
+                name = self.readline()
+                self.push(self.find_class(module, name))
+            elif op == PROTO:
+                if self.read_byte() > 2:
+                    raise CannotPickle
+            elif op == STOP:
+                break
+            else:
+                raise CannotPickle
+        if len(self.stack_w) != 1 or self.marks or self.pos != len(self.data):
+            raise CannotPickle
+        return self.stack_w[0]
+
+    def setitems(self, w_dict, items_w):
+        if len(items_w) & 1:
+            raise CannotPickle
+        for i in range(0, len(items_w), 2):
+            self.space.setitem(w_dict, items_w[i], items_w[i + 1])
+
+    def load_int(self, line):
+        space = self.space
+        if line == '00':
+            return space.w_False
+        if line == '01':
+            return space.w_True
+        try:
+            return space.newint(string_to_int(line))
+        except (ParseStringError, ParseStringOverflowError):
+            raise CannotPickle
+
+    def find_class(self, module, name):
+        # same as pickle.Unpickler.find_class()
+        space = self.space
+        w_modules = space.sys.get('modules')
+        w_mod = space.finditem_str(w_modules, module)
+        if w_mod is None:
+            space.call_function(space.builtin.get('__import__'),
+                                space.newtext(module))
+            w_mod = space.getitem(w_modules, space.newtext(module))
+        return space.getattr(w_mod, space.newtext(name))
+
+
+def dumps(space, w_obj):
+    """Return 'w_obj' pickled with protocol 2, or None if it contains
+    anything that must be left to the pickle module."""
+    try:
+        return Pickler(space).dumps(w_obj)
+    except CannotPickle:
+        return None
+
+def loads(space, data):
+    """Return the object pickled in 'data', or None if it must be left to
+    the pickle module."""
+    try:
+        return Unpickler(space, data).loads()
+    except CannotPickle:
+        return None
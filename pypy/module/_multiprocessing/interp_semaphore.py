@@ -344,26 +344,31 @@ else:
     def delete_semaphore(handle):
         _sem_close_no_errno(handle)
 
+    def make_deadline(timeout):
+        """Return a raw-malloced timespec for 'timeout' seconds from now,
+        to pass to sem_timedwait().  The caller frees it."""
+        sec = int(timeout)
+        nsec = int(1e9 * (timeout - sec) + 0.5)
+
+        now_sec, now_usec = gettimeofday()
+
+        deadline = lltype.malloc(TIMESPECP.TO, 1, flavor='raw')
+        rffi.setintfield(deadline[0], 'c_tv_sec', now_sec + sec)
+        rffi.setintfield(deadline[0], 'c_tv_nsec', now_usec * 1000 + nsec)
+        val = (rffi.getintfield(deadline[0], 'c_tv_sec') +
+               rffi.getintfield(deadline[0], 'c_tv_nsec') / 1000000000)
+        rffi.setintfield(deadline[0], 'c_tv_sec', val)
+        val = rffi.getintfield(deadline[0], 'c_tv_nsec') % 1000000000
+        rffi.setintfield(deadline[0], 'c_tv_nsec', val)
+        return deadline
+
     def semlock_acquire(self, space, block, w_timeout):
         if not block:
             deadline = lltype.nullptr(TIMESPECP.TO)
         elif space.is_none(w_timeout):
             deadline = lltype.nullptr(TIMESPECP.TO)
         else:
-            timeout = space.float_w(w_timeout)
-            sec = int(timeout)
-            nsec = int(1e9 * (timeout - sec) + 0.5)
-
-            now_sec, now_usec = gettimeofday()
-
-            deadline = lltype.malloc(TIMESPECP.TO, 1, flavor='raw')
-            rffi.setintfield(deadline[0], 'c_tv_sec', now_sec + sec)
-            rffi.setintfield(deadline[0], 'c_tv_nsec', now_usec * 1000 + nsec)
-            val = (rffi.getintfield(deadline[0], 'c_tv_sec') +
-                   rffi.getintfield(deadline[0], 'c_tv_nsec') / 1000000000)
-            rffi.setintfield(deadline[0], 'c_tv_sec', val)
-            val = rffi.getintfield(deadline[0], 'c_tv_nsec') % 1000000000
-            rffi.setintfield(deadline[0], 'c_tv_nsec', val)
+            deadline = make_deadline(space.float_w(w_timeout))
         try:
             while True:
                 try:
@@ -0,0 +1,292 @@
+import errno
+import os
+
+from rpython.rlib import rmmap
+from rpython.rlib.rarithmetic import intmask
+from rpython.rtyper.lltypesystem import lltype, rffi
+
+from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
+from pypy.module._multiprocessing.interp_connection import (
+    W_BaseConnection, BufferTooShort, READABLE, WRITABLE, PY_SSIZE_T_MAX)
+from pypy.module._multiprocessing.interp_semaphore import (
+    CounterState, create_semaphore, delete_semaphore, sem_wait, sem_trywait,
+    sem_timedwait, sem_post, make_deadline, SEM_VALUE_MAX, TIMESPECP,
+    _check_signals)
+
+# Layout of the shared mapping: the index of the next slot to read, the
+# index of the next slot to write (on its own cache line), then the slots.
+# The first slot of every message starts with the length of the message.
+READ_INDEX = 0
+WRITE_INDEX = 64
+HEADER_SIZE = 128
+LENGTH_SIZE = rffi.sizeof(lltype.Signed)
+
+DEFAULT_SIZE = 1024 * 1024
+DEFAULT_SLOT_SIZE = 64 * 1024
+
+
+class SharedRing(object):
+    """A ring of fixed-size slots in an anonymous shared mapping.  It is
+    created before the processes that use it are forked, and the two
+    semaphores count the full and the empty slots.  Posting and waiting on
+    them also orders the accesses to the slots between the processes."""
+
+    def __init__(self, mmap, nslots, slot_size, full, empty):
+        self.mmap = mmap
+        self.nslots = nslots
+        self.slot_size = slot_size
+        self.full = full
+        self.empty = empty
+        self.users = 0
+
+    def release(self):
+        # only unmaps and closes the semaphores in this process
+        self.users -= 1
+        if self.users == 0:
+            self.mmap.close()
+            delete_semaphore(self.full)
+            delete_semaphore(self.empty)
+
+    def _index_ptr(self, offset):
+        return rffi.cast(rffi.SIGNEDP, self.mmap.getptr(offset))
+
+    def slot(self, which):
+        index = self._index_ptr(which)[0]
+        return self.mmap.getptr(HEADER_SIZE +
+                                (index % self.nslots) * self.slot_size)
+
+    def advance(self, which):
+        ptr = self._index_ptr(which)
+        ptr[0] += 1
+
+
+class W_SharedConnection(W_BaseConnection):
+    """One end of a one-way channel made of a SharedRing.  Messages are
+    copied into the shared slots by the sender and straight out of them by
+    the receiver.  There is no end-of-file: a receiver blocks until some
+    process sends a message, even if all the senders are closed."""
+
+    def __init__(self, space, ring, flags):
+        W_BaseConnection.__init__(self, space, flags)
+        self.ring = ring
+        ring.users += 1
+
+    def descr_repr(self, space):
+        conn_type = ["read-only", "write-only", "read-write"][self.flags - 1]
+        ring = self.ring
+        if ring is None:
+            return space.newtext("<closed %s SharedConnection>" % conn_type)
+        return space.newtext("<%s SharedConnection, %d slots of %d bytes>" % (
+            conn_type, ring.nslots, ring.slot_size))
+
+    def is_valid(self):
+        return self.ring is not None
+
+    def do_close(self):
+        ring = self.ring
+        if ring is not None:
+            self.ring = None
+            ring.release()
+
+    def _check_valid(self, space):
+        if self.ring is None:
+            raise oefmt(space.w_IOError, "handle is invalid")
+        return self.ring
+
+    def _wait(self, space, sem):
+        while True:
+            try:
+                sem_wait(sem)
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    _check_signals(space)
+                    continue
+                raise wrap_oserror(space, e)
+            return
+
+    def _post(self, space, sem):
+        try:
+            sem_post(sem)
+        except OSError as e:
+            raise wrap_oserror(space, e)
+
+    def do_send_string(self, space, buf, offset, size):
+        ring = self._check_valid(space)
+        with rffi.scoped_view_charp(buf) as charp:
+            src = rffi.ptradd(charp, offset)
+            self._wait(space, ring.empty)
+            slot = ring.slot(WRITE_INDEX)
+            rffi.cast(rffi.SIGNEDP, slot)[0] = size
+            start = LENGTH_SIZE
+            while True:
+                count = min(size, ring.slot_size - start)
+                rffi.c_memcpy(rffi.cast(rffi.VOIDP, rffi.ptradd(slot, start)),
+                              rffi.cast(rffi.CONST_VOIDP, src), count)
+                ring.advance(WRITE_INDEX)
+                self._post(space, ring.full)
+                size -= count
+                if size == 0:
+                    break
+                src = rffi.ptradd(src, count)
+                self._wait(space, ring.empty)
+                slot = ring.slot(WRITE_INDEX)
+                start = 0
+
+    def _recv_length(self, space):
+        """Wait for the next message and return its length.  Its first slot
+        is left in the ring, to be read by _recv_message()."""
+        ring = self._check_valid(space)
+        self._wait(space, ring.full)
+        return intmask(rffi.cast(rffi.SIGNEDP, ring.slot(READ_INDEX))[0])
+
+    def _recv_message(self, space, dst, length):
+        """Copy the message whose length was returned by _recv_length()
+        to 'dst', or drop it if 'dst' is NULL."""
+        ring = self.ring
+        slot = ring.slot(READ_INDEX)
+        start = LENGTH_SIZE
+        while True:
+            count = min(length, ring.slot_size - start)
+            if dst:
+                src = rffi.ptradd(slot, start)
+                rffi.c_memcpy(rffi.cast(rffi.VOIDP, dst),
+                              rffi.cast(rffi.CONST_VOIDP, src), count)
+                dst = rffi.ptradd(dst, count)
+            ring.advance(READ_INDEX)
+            self._post(space, ring.empty)
+            length -= count
+            if length == 0:
+                break
+            self._wait(space, ring.full)
+            slot = ring.slot(READ_INDEX)
+            start = 0
+
+    def do_recv_string(self, space, buflength, maxlength):
+        length = self._recv_length(space)
+        if length > maxlength: # bad message, close connection
+            self._recv_message(space, lltype.nullptr(rffi.CCHARP.TO), length)
+            self.flags &= ~READABLE
+            if self.flags == 0:
+                self.close()
+            raise oefmt(space.w_IOError, "bad message length")
+
+        if length <= buflength:
+            self._recv_message(space, self.buffer, length)
+            return length, lltype.nullptr(rffi.CCHARP.TO)
+        else:
+            newbuf = lltype.malloc(rffi.CCHARP.TO, length, flavor='raw')
+            self._recv_message(space, newbuf, length)
+            return length, newbuf
+
+    def do_recv_into(self, space, rwbuffer, offset):
+        res = self._recv_length(space)
+        # copy directly from the shared slot when the target buffer has a
+        # raw address, e.g. an array.array or an mmap, and the whole
+        # message is in the slot already received: nothing releases the
+        # GIL between get_raw_address() and the copy
+        if (res <= self.ring.slot_size - LENGTH_SIZE and
+                res <= rwbuffer.getlength() - offset):
+            try:
+                dst = rwbuffer.get_raw_address()
+            except ValueError:
+                pass
+            else:
+                self._recv_message(space, rffi.ptradd(dst, offset), res)
+                return res
+        # otherwise, waiting for the following slots releases the GIL and
+        # another thread could resize the target buffer, so the message
+        # goes through a private buffer
+        newbuf = lltype.malloc(rffi.CCHARP.TO, res, flavor='raw')
+        try:
+            self._recv_message(space, newbuf, res)
+            data = rffi.charpsize2str(newbuf, res)
+        finally:
+            lltype.free(newbuf, flavor='raw')
+        if res > rwbuffer.getlength() - offset:
+            raise BufferTooShort(space, space.newbytes(data))
+        rwbuffer.setslice(offset, data)
+        return res
+
+    def do_poll(self, space, timeout):
+        ring = self._check_valid(space)
+        if timeout > 0.0:
+            deadline = make_deadline(timeout)
+        else:
+            deadline = lltype.nullptr(TIMESPECP.TO)
+        try:
+            while True:
+                try:
+                    if timeout == 0.0:
+                        sem_trywait(ring.full)
+                    elif timeout < 0.0:
+                        sem_wait(ring.full)
+                    else:
+                        sem_timedwait(ring.full, deadline)
+                except OSError as e:
+                    if e.errno == errno.EINTR:
+                        _check_signals(space)
+                        continue
+                    elif e.errno in (errno.EAGAIN, errno.ETIMEDOUT):
+                        return False
+                    raise wrap_oserror(space, e)
+                break
+        finally:
+            if deadline:
+                lltype.free(deadline, flavor='raw')
+        # put back the slot we took
+        self._post(space, ring.full)
+        return True
+
+W_SharedConnection.typedef = TypeDef(
+    '_multiprocessing.SharedConnection', W_BaseConnection.typedef,
+)
+W_SharedConnection.typedef.acceptable_as_base_class = False
+
+
+@unwrap_spec(size=int, slot_size=int)
+def shared_pipe(space, size=DEFAULT_SIZE, slot_size=DEFAULT_SLOT_SIZE):
+    """shared_pipe(size, slot_size) -> (reader, writer)
+
+    Return the two ends of a one-way channel through 'size' bytes of
+    shared memory, divided in slots of 'slot_size' bytes.  Like
+    Pipe(duplex=False), it must be created before forking the processes
+    that use it.  Concurrent senders or receivers need to hold a lock
+    around each call."""
+    if slot_size < 2 * LENGTH_SIZE or slot_size % LENGTH_SIZE != 0:
+        raise oefmt(space.w_ValueError,
+                    "slot_size must be a multiple of %d, at least %d",
+                    LENGTH_SIZE, 2 * LENGTH_SIZE)
+    nslots = size // slot_size
+    if nslots < 2:
+        raise oefmt(space.w_ValueError,
+                    "size must be at least twice slot_size")
+    if (nslots > SEM_VALUE_MAX or
+            nslots > (PY_SSIZE_T_MAX - HEADER_SIZE) // slot_size):
+        raise oefmt(space.w_OverflowError, "size is too large")
+    try:
+        mmap = rmmap.mmap(-1, HEADER_SIZE + nslots * slot_size)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    except rmmap.RMMapError as e:
+        raise OperationError(space.w_ValueError, space.newtext(e.message))
+    counter = space.fromcache(CounterState).getCount()
+    try:
+        full = create_semaphore(space, "/mp%d-%d" % (os.getpid(), counter),
+                                0, nslots)
+    except OSError as e:
+        mmap.close()
+        raise wrap_oserror(space, e)
+    counter = space.fromcache(CounterState).getCount()
+    try:
+        empty = create_semaphore(space, "/mp%d-%d" % (os.getpid(), counter),
+                                 nslots, nslots)
+    except OSError as e:
+        mmap.close()
+        delete_semaphore(full)
+        raise wrap_oserror(space, e)
+    ring = SharedRing(mmap, nslots, slot_size, full, empty)
+    w_reader = W_SharedConnection(space, ring, READABLE)
+    w_writer = W_SharedConnection(space, ring, WRITABLE)
+    return space.newtuple2(w_reader, w_writer)
@@ -17,6 +17,10 @@ class Module(MixedModule):
         interpleveldefs['PipeConnection'] = \
             'interp_connection.W_PipeConnection'
         interpleveldefs['win32'] = 'interp_win32.win32_namespace(space)'
+    else:
+        interpleveldefs['SharedConnection'] = \
+            'interp_shared.W_SharedConnection'
+        interpleveldefs['shared_pipe'] = 'interp_shared.shared_pipe'
 
     def startup(self, space):
         from pypy.module._multiprocessing.interp_connection import State
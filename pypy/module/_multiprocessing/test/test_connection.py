@@ -218,3 +218,105 @@ class AppTestSocketConnection(BaseConnectionTest):
             fd = os.dup(1)     # closed by PipeConnection.__del__
             c = _multiprocessing.PipeConnection(fd)
             assert repr(c) == '<read-write PipeConnection, handle %d>' % fd
+
+class AppTestSharedConnection(BaseConnectionTest):
+    spaceconfig = {
+        "usemodules": [
+            '_multiprocessing', 'thread', 'signal', 'struct', 'array',
+            'itertools', 'binascii', 'select', 'fcntl', 'mmap',
+        ]
+    }
+
+    def setup_class(cls):
+        if sys.platform == "win32":
+            py.test.skip("not on win32")
+
+    def w_make_pair(self):
+        import _multiprocessing
+        return _multiprocessing.shared_pipe(1024, 64)
+
+    def test_repr(self):
+        import _multiprocessing
+        rhandle, whandle = _multiprocessing.shared_pipe(1024, 64)
+        assert repr(rhandle) == (
+            '<read-only SharedConnection, 16 slots of 64 bytes>')
+        whandle.close()
+        assert whandle.closed
+        assert not rhandle.closed
+        raises(IOError, whandle.send_bytes, "abc")
+
+    def test_bad_sizes(self):
+        import _multiprocessing
+        raises(ValueError, _multiprocessing.shared_pipe, 1024, 7)
+        raises(ValueError, _multiprocessing.shared_pipe, 100, 64)
+
+    def test_wrap_around(self):
+        rhandle, whandle = self.make_pair()
+        for i in range(50):
+            msg = chr(65 + i % 26) * (i * 7)
+            whandle.send_bytes(msg)
+            assert rhandle.recv_bytes() == msg
+        assert rhandle.poll() == False
+
+    def test_large_message(self):
+        import thread
+        rhandle, whandle = self.make_pair()
+        msg = ''.join([chr(i % 256) for i in range(10000)])
+        done = []
+        def reader():
+            done.append(rhandle.recv_bytes())
+        thread.start_new_thread(reader, ())
+        whandle.send_bytes(msg)
+        import time
+        for i in range(100):
+            if done:
+                break
+            time.sleep(0.1)
+        assert done == [msg]
+
+    def test_recv_bytes_into(self):
+        import array, multiprocessing
+        rhandle, whandle = self.make_pair()
+        whandle.send_bytes("hello world, ")
+        whandle.send_bytes("abc")
+        buf = array.array('c', 'x' * 20)
+        assert rhandle.recv_bytes_into(buf) == 13
+        assert rhandle.recv_bytes_into(buf, 13) == 3
+        assert buf.tostring() == 'hello world, abcxxxx'
+        buf = bytearray(4)
+        whandle.send_bytes("defg")
+        assert rhandle.recv_bytes_into(buf) == 4
+        assert buf == 'defg'
+        whandle.send_bytes("12345")
+        exc = raises(multiprocessing.BufferTooShort,
+                     rhandle.recv_bytes_into, buf)
+        assert exc.value.args == ("12345",)
+        assert rhandle.poll() == False
+
+    def test_recv_bytes_into_several_slots(self):
+        import array, multiprocessing
+        rhandle, whandle = self.make_pair()
+        msg = ''.join([chr(65 + i % 26) for i in range(300)])
+        whandle.send_bytes(msg)
+        buf = array.array('c', 'x' * 310)
+        assert rhandle.recv_bytes_into(buf, 5) == 300
+        assert buf.tostring() == 'x' * 5 + msg + 'x' * 5
+        whandle.send_bytes(msg)
+        exc = raises(multiprocessing.BufferTooShort,
+                     rhandle.recv_bytes_into, buf, 20)
+        assert exc.value.args == (msg,)
+        assert rhandle.poll() == False
+
+    def test_fork(self):
+        import os
+        rhandle, whandle = self.make_pair()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                rhandle.close()
+                whandle.send(range(500))
+            finally:
+                os._exit(0)
+        whandle.close()
+        assert rhandle.recv() == range(500)
+        os.waitpid(pid, 0)
@@ -0,0 +1,151 @@
+import pickle
+from pypy.module._multiprocessing import interp_pickle
+
+
+class TestNativePickle:
+    spaceconfig = {'usemodules': ['_multiprocessing', 'struct', 'binascii']}
+
+    def check(self, source, native=True):
+        space = self.space
+        w_obj = space.appexec([], "(): return %s" % (source,))
+        data = interp_pickle.dumps(space, w_obj)
+        if not native:
+            assert data is None
+            return
+        assert data is not None
+        # the host pickle module must read it back
+        assert pickle.loads(data) == eval(source)
+        w_res = interp_pickle.loads(space, data)
+        assert w_res is not None
+        assert space.eq_w(w_res, w_obj)
+        assert space.type(w_res) is space.type(w_obj)
+        # and what pickle.py produces must be readable natively
+        w_res = interp_pickle.loads(space, pickle.dumps(eval(source), 2))
+        assert w_res is not None
+        assert space.eq_w(w_res, w_obj)
+
+    def test_atoms(self):
+        for source in ["None", "True", "False", "0", "255", "256", "65536",
+                       "-1", "2**31 - 1", "-2**31", "2**40", "-2**40",
+                       "1.5", "-0.0", "1e300", "''", "'abc'", "'x' * 1000",
+                       "u''", "u'caf\\xe9 \\u1234 \\U00012345'",
+                       "u'\\ud800'"]:
+            self.check(source)
+
+    def test_containers(self):
+        for source in ["()", "(1,)", "(1, 2)", "(1, 2, 3)", "(1, 2, 3, 4)",
+                       "[]", "[1, 2, 3]", "[1.5, 2.5]", "['a', 'bc']",
+                       "[1, 'a', 2.5, None, u'x']", "range(1000)",
+                       "{}", "{1: 2, 'a': [3, 4], (5, 6): {7: u'8'}}",
+                       "[(i, str(i)) for i in range(300)]"]:
+            self.check(source)
+
+    def test_globals(self):
+        space = self.space
+        w_obj = space.appexec([], """():
+            import os
+            return [os.path.join, int, len]
+        """)
+        data = interp_pickle.dumps(space, w_obj)
+        assert 'cposixpath\njoin\n' in data
+        w_res = interp_pickle.loads(space, data)
+        assert space.eq_w(w_res, w_obj)
+
+    def test_fallback(self):
+        for source in ["2**100", "set([1])", "1j", "[1, 2, set()]",
+                       "{1: xrange(3)}", "(lambda: 1)"]:
+            self.check(source, native=False)
+        space = self.space
+        w_obj = space.appexec([], """():
+            class A(list):
+                pass
+            return A()
+        """)
+        assert interp_pickle.dumps(space, w_obj) is None
+        # nested too deeply
+        w_obj = space.appexec([], """():
+            l = []
+            for i in range(1000):
+                l = [l]
+            return l
+        """)
+        assert interp_pickle.dumps(space, w_obj) is None
+        # a recursive tuple
+        w_obj = space.appexec([], """():
+            l = []
+            t = (l,)
+            l.append(t)
+            return t
+        """)
+        assert interp_pickle.dumps(space, w_obj) is None
+        # opcodes that are not supported natively, or bad data
+        for data in [pickle.dumps(set([1]), 2), pickle.dumps([1, 2], 0),
+                     '\x80\x02K\x01', '\x80\x02K\x01K\x02.', '\x80\x02e.',
+                     '\x80\x03K\x01.', '\x80\x02h\x05.']:
+            assert interp_pickle.loads(space, data) is None
+
+    def test_shared_and_recursive(self):
+        space = self.space
+        w_obj = space.appexec([], """():
+            l = [1]
+            d = {}
+            d['self'] = d
+            return [l, l, d]
+        """)
+        data = interp_pickle.dumps(space, w_obj)
+        res = pickle.loads(data)
+        assert res[0] is res[1]
+        assert res[2]['self'] is res[2]
+        w_res = interp_pickle.loads(space, data)
+        assert space.is_true(space.appexec([w_res], """(res):
+            return res[0] is res[1] and res[2]['self'] is res[2]
+        """))
+
+    def test_strategies(self):
+        space = self.space
+        w_obj = space.appexec([], "(): return [range(5), [1.5] * 3, ['a']]")
+        w_res = interp_pickle.loads(space, interp_pickle.dumps(space, w_obj))
+        items_w = space.listview(w_res)
+        assert space.listview_int(items_w[0]) == range(5)
+        assert space.listview_float(items_w[1]) == [1.5] * 3
+        assert space.listview_bytes(items_w[2]) == ['a']
+
+
+class AppTestConnectionPickle:
+    spaceconfig = {'usemodules': ['_multiprocessing', 'thread', 'signal',
+                                  'itertools', 'select', 'struct', 'binascii',
+                                  'fcntl']}
+
+    def w_make_pair(self):
+        import os, _multiprocessing
+        r, w = os.pipe()
+        return (_multiprocessing.Connection(r, writable=False),
+                _multiprocessing.Connection(w, readable=False))
+
+    def test_compatible_with_pickle(self):
+        import pickle
+        rhandle, whandle = self.make_pair()
+        obj = [1, 2.5, 'abc', u'd\xe9f', (None, True), {'x': [10**12]}]
+        whandle.send(obj)
+        assert pickle.loads(rhandle.recv_bytes()) == obj
+        whandle.send_bytes(pickle.dumps(obj, 2))
+        assert rhandle.recv() == obj
+        # objects that are pickled by pickle.py
+        obj = [set([1, 2]), 10**30, 1j]
+        whandle.send(obj)
+        assert rhandle.recv() == obj
+        rhandle.close()
+        whandle.close()
+
+    def test_identity(self):
+        rhandle, whandle = self.make_pair()
+        l = [1, 2]
+        obj = [l, l]
+        obj.append(obj)
+        whandle.send(obj)
+        res = rhandle.recv()
+        assert res[0] == [1, 2]
+        assert res[0] is res[1]
+        assert res[2] is res
+        rhandle.close()
+        whandle.close()
@@ -164,6 +164,31 @@ def socketpair(space, family=rsocket.socketpair_default_family,
         W_Socket(space, sock2)
     )
 
+if hasattr(rsocket, 'CMSG_LEN'):
+    @unwrap_spec(length=int)
+    def CMSG_LEN(space, length):
+        """CMSG_LEN(length) -> control message length
+
+        Return the total length, without trailing padding, of an ancillary
+        data item with associated data of the given length.
+        """
+        if length < 0:
+            raise oefmt(space.w_OverflowError, "CMSG_LEN() argument out of range")
+        return space.newint(rsocket.CMSG_LEN(length))
+
+    @unwrap_spec(length=int)
+    def CMSG_SPACE(space, length):
+        """CMSG_SPACE(length) -> buffer size
+
+        Return the buffer size needed for recvmsg() to receive an ancillary
+        data item with associated data of the given length, along with any
+        trailing padding.
+        """
+        if length < 0:
+            raise oefmt(space.w_OverflowError,
+                        "CMSG_SPACE() argument out of range")
+        return space.newint(rsocket.CMSG_SPACE(length))
+
 # The following 4 functions refuse all negative numbers.
 # They also check that the argument is not too large, but note that
 # CPython 2.7 is not doing that consistently (CPython 3.x does).
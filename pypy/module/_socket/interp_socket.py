@@ -530,6 +530,137 @@ class W_Socket(W_Root):
         except SocketError as e:
             raise converted_error(space, e)
 
+    @unwrap_spec(message_size='nonnegint', ancbufsize='nonnegint', flags=int)
+    def recvmsg_w(self, space, message_size, ancbufsize=0, flags=0):
+        """recvmsg(bufsize[, ancbufsize[, flags]]) -> (data, ancdata, msg_flags, address)
+
+        Receive normal data (up to bufsize bytes) and ancillary data from the
+        socket.  The ancbufsize argument sets the size in bytes of the internal
+        buffer used to receive the ancillary data.  The ancdata is returned as
+        a list of (cmsg_level, cmsg_type, cmsg_data) tuples.
+        """
+        try:
+            data, ancdata, retflags, addr = self.sock.recvmsg(
+                message_size, ancbufsize, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newtuple([space.newbytes(data),
+                               self._wrap_ancdata(space, ancdata),
+                               space.newint(retflags),
+                               self._wrap_optional_addr(space, addr)])
+
+    @unwrap_spec(ancbufsize='nonnegint', flags=int)
+    def recvmsg_into_w(self, space, w_buffers, ancbufsize=0, flags=0):
+        """recvmsg_into(buffers[, ancbufsize[, flags]]) -> (nbytes, ancdata, msg_flags, address)
+
+        Like recvmsg(), but scatter the normal data received into the given
+        sequence of writable buffers instead of returning a new string.
+        """
+        buffers = [space.getarg_w('w*', w_buffer)
+                   for w_buffer in space.unpackiterable(w_buffers)]
+        try:
+            nbytes, ancdata, retflags, addr = self.sock.recvmsg_into(
+                buffers, ancbufsize, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newtuple([space.newint(nbytes),
+                               self._wrap_ancdata(space, ancdata),
+                               space.newint(retflags),
+                               self._wrap_optional_addr(space, addr)])
+
+    @unwrap_spec(flags=int)
+    def sendmsg_w(self, space, w_buffers, w_ancdata=None, flags=0,
+                  w_address=None):
+        """sendmsg(buffers[, ancdata[, flags[, address]]]) -> count
+
+        Send the normal data gathered from the sequence of buffers, together
+        with ancillary data given as a sequence of (cmsg_level, cmsg_type,
+        cmsg_data) tuples, with a single system call.  Return the number of
+        bytes of normal data sent.
+        """
+        messages = [space.bufferstr_w(w_buffer)
+                    for w_buffer in space.unpackiterable(w_buffers)]
+        ancillary = None
+        if w_ancdata is not None and not space.is_w(w_ancdata, space.w_None):
+            ancillary = []
+            for w_item in space.unpackiterable(w_ancdata):
+                w_level, w_type, w_data = space.fixedview(w_item, 3)
+                ancillary.append((space.int_w(w_level), space.int_w(w_type),
+                                  space.bufferstr_w(w_data)))
+        try:
+            address = None
+            if w_address is not None and not space.is_w(w_address,
+                                                        space.w_None):
+                address = self.addr_from_object(space, w_address)
+            count = self.sock.sendmsg(messages, ancillary, flags, address)
+        except SocketError as e:
+            raise converted_error(space, e)
+        if count == -1000:
+            raise explicit_socket_error(space,
+                        "sending multiple control messages not supported")
+        if count == -1001 or count == -1002:
+            raise explicit_socket_error(space, "ancillary data item too large")
+        return space.newint(count)
+
+    @unwrap_spec(msgsize=int, count=int, flags=int)
+    def recvmmsg_into_w(self, space, w_buffer, msgsize, count=0, flags=0):
+        """recvmmsg_into(buffer, msgsize[, count[, flags]]) -> [(nbytes, address), ...]
+
+        Receive up to count datagrams with a single system call, datagram
+        number i being stored at offset i * msgsize of the writable buffer.
+        If count is not specified (or 0), use as many slots as fit in the
+        buffer.  Block only until the first datagram is available.
+        """
+        rwbuffer = space.getarg_w('w*', w_buffer)
+        if msgsize <= 0:
+            raise oefmt(space.w_ValueError, "msgsize must be positive")
+        lgt = rwbuffer.getlength()
+        if count == 0:
+            count = lgt // msgsize
+        if count <= 0 or count > lgt // msgsize:
+            raise oefmt(space.w_ValueError,
+                        "count * msgsize is greater than the length of the "
+                        "buffer")
+        try:
+            result = self.sock.recvmmsg_into(rwbuffer, msgsize, count, flags)
+        except SocketError as e:
+            raise converted_error(space, e)
+        result_w = [space.newtuple2(space.newint(nbytes),
+                                    self._wrap_optional_addr(space, addr))
+                    for nbytes, addr in result]
+        return space.newlist(result_w)
+
+    @unwrap_spec(flags=int)
+    def sendmmsg_w(self, space, w_buffers, flags=0, w_address=None):
+        """sendmmsg(buffers[, flags[, address]]) -> count
+
+        Send each buffer of the sequence as a separate datagram, with a
+        single system call.  Return the number of datagrams sent, which may
+        be less than the number of buffers.
+        """
+        messages = [space.bufferstr_w(w_buffer)
+                    for w_buffer in space.unpackiterable(w_buffers)]
+        try:
+            address = None
+            if w_address is not None and not space.is_w(w_address,
+                                                        space.w_None):
+                address = self.addr_from_object(space, w_address)
+            count = self.sock.sendmmsg(messages, flags, address)
+        except SocketError as e:
+            raise converted_error(space, e)
+        return space.newint(count)
+
+    def _wrap_optional_addr(self, space, addr):
+        if addr is None:
+            return space.w_None
+        return addr_as_object(addr, self.sock.fd, space)
+
+    def _wrap_ancdata(self, space, ancdata):
+        ancdata_w = [space.newtuple([space.newint(level), space.newint(type),
+                                     space.newbytes(data)])
+                     for level, type, data in ancdata]
+        return space.newlist(ancdata_w)
+
     @unwrap_spec(cmd=int)
     def ioctl_w(self, space, cmd, w_option):
         from rpython.rtyper.lltypesystem import rffi, lltype
@@ -727,6 +858,10 @@ for name in ('dup',):
         socketmethodnames.remove(name)
 if hasattr(rsocket._c, 'WSAIoctl'):
     socketmethodnames.append('ioctl')
+if rsocket._c.HAVE_SENDMSG:
+    socketmethodnames.extend(['recvmsg', 'recvmsg_into', 'sendmsg'])
+if rsocket._c.HAVE_MMSG:
+    socketmethodnames.extend(['recvmmsg_into', 'sendmmsg'])
 
 socketmethods = {}
 for methodname in socketmethodnames:
@@ -762,8 +897,12 @@ listen(n) -- start listening for incoming connections
 makefile([mode, [bufsize]]) -- return a file object for the socket [*]
 recv(buflen[, flags]) -- receive data
 recvfrom(buflen[, flags]) -- receive data and sender's address
+recvmsg(buflen[, ancbuflen[, flags]]) -- receive data and ancillary data [*]
+recvmmsg_into(buffer, msgsize[, count[, flags]]) -- receive many datagrams [*]
 sendall(data[, flags]) -- send all data
 send(data[, flags]) -- send data, may not send all of it
+sendmsg(buffers[, ancdata[, flags[, addr]]]) -- send data and ancillary data [*]
+sendmmsg(buffers[, flags[, addr]]) -- send many datagrams [*]
 sendto(data[, flags], addr) -- send data to a given address
 setblocking(0 | 1) -- set or clear the blocking I/O flag
 setsockopt(level, optname, value) -- set socket options
@@ -726,7 +726,7 @@ class AppTestPacket:
 
 class AppTestSocketTCP:
     HOST = 'localhost'
-    spaceconfig = {'usemodules': ['_socket', 'array']}
+    spaceconfig = {'usemodules': ['_socket', 'array', 'struct']}
 
     def setup_method(self, method):
         w_HOST = self.space.wrap(self.HOST)
@@ -863,6 +863,87 @@ class AppTestSocketTCP:
         cli = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         assert cli.family == socket.AF_INET
 
+    def test_sendmsg_recvmsg(self):
+        import _socket
+        if not hasattr(_socket.socket, 'sendmsg'):
+            skip("no sendmsg()")
+        cli = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+        cli.connect(self.serv.getsockname())
+        conn, addr = self.serv.accept()
+        assert cli.sendmsg([b'dupa ', buffer(b'was '), b'here']) == 13
+        data, ancdata, flags, addr = conn.recvmsg(13, 0, _socket.MSG_WAITALL)
+        assert data == b'dupa was here'
+        assert ancdata == []
+        cli.sendmsg([b'abcdef', b'ghijkl'])
+        buf1, buf2 = bytearray(2), bytearray(10)
+        nbytes, ancdata, flags, addr = conn.recvmsg_into([buf1, buf2], 0,
+                                                         _socket.MSG_WAITALL)
+        assert nbytes == 12
+        assert buf1 == b'ab'
+        assert buf2 == b'cdefghijkl'
+        assert _socket.CMSG_LEN(4) < _socket.CMSG_SPACE(4)
+        raises(OverflowError, _socket.CMSG_LEN, -1)
+        cli.close()
+        conn.close()
+
+    def test_sendmsg_fds(self):
+        import _socket, os
+        if not hasattr(_socket.socket, 'sendmsg'):
+            skip("no sendmsg()")
+        import struct
+        a, b = _socket.socketpair(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        r, w = os.pipe()
+        try:
+            a.sendmsg([b'x'], [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS,
+                                struct.pack('i', w))])
+            data, ancdata, flags, addr = b.recvmsg(
+                1, _socket.CMSG_SPACE(struct.calcsize('i')))
+            assert data == b'x'
+            [(level, type, fddata)] = ancdata
+            assert (level, type) == (_socket.SOL_SOCKET, _socket.SCM_RIGHTS)
+            [w2] = struct.unpack('i', fddata)
+            os.write(w2, b'hi')
+            os.close(w2)
+            assert os.read(r, 2) == b'hi'
+        finally:
+            os.close(r)
+            os.close(w)
+            a.close()
+            b.close()
+
+    def test_sendmmsg_recvmmsg_into(self):
+        import _socket
+        if not hasattr(_socket.socket, 'sendmmsg'):
+            skip("no sendmmsg()")
+        s1 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s1.bind(('127.0.0.1', 0))
+        s2 = _socket.socket(_socket.AF_INET, _socket.SOCK_DGRAM)
+        s2.bind(('127.0.0.1', 0))
+        assert s2.sendmmsg([b'one', buffer(b'two'), b'three' * 10], 0,
+                           s1.getsockname()) == 3
+        buf = bytearray(4 * 16)
+        result = s1.recvmmsg_into(buf, 16)
+        assert [nbytes for nbytes, addr in result] == [3, 3, 16]
+        assert [addr for nbytes, addr in result] == [s2.getsockname()] * 3
+        assert buf[:3] == b'one'
+        assert buf[16:19] == b'two'
+        assert buf[32:48] == (b'three' * 10)[:16]
+        # the same ring buffer, through a memoryview slot range
+        s2.connect(s1.getsockname())
+        assert s2.sendmmsg([b'four']) == 1
+        result = s1.recvmmsg_into(memoryview(buf)[16:], 16, 2)
+        assert result == [(4, s2.getsockname())]
+        assert buf[16:20] == b'four'
+        raises(ValueError, s1.recvmmsg_into, buf, 0)
+        raises(ValueError, s1.recvmmsg_into, buf, 16, 5)
+        import sys
+        # count * msgsize would overflow a machine word
+        raises(ValueError, s1.recvmmsg_into, buf, 16, sys.maxsize // 8)
+        s1.setblocking(False)
+        raises(_socket.error, s1.recvmmsg_into, buf, 16)
+        s1.close()
+        s2.close()
+
     def test_missing_error_catching(self):
         from _socket import socket, error
         s = socket()
@@ -3,7 +3,7 @@ from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.baseobjspace import W_Root
-from rpython.rlib import rvmprof, jit
+from rpython.rlib import rvmprof, rgil, jit
 from pypy.interpreter.error import oefmt
 
 # ____________________________________________________________
@@ -67,9 +67,12 @@ def enable(space, fileno, period, memory, lines, native, real_time):
 
 def disable(space):
     """Disable vmprof.  Remember to close the file descriptor afterwards
-    if necessary.
+    if necessary.  With threads, the statistics of the GIL are written
+    into the profile first, as the metadata 'gil'.
     """
     try:
+        if space.config.translation.thread:
+            rvmprof.write_meta("gil", rgil.format_stats())
         rvmprof.disable()
     except rvmprof.VMProfError as e:
         raise VMProfError(space, e)
@@ -323,7 +323,8 @@ def open_bz2file_as_stream(space, w_path, mode="r", buffering=-1,
                            compresslevel=9):
     from rpython.rlib.streamio import decode_mode, open_path_helper
     from rpython.rlib.streamio import construct_stream_tower
-    os_flags, universal, reading, writing, basemode, binary = decode_mode(mode)
+    (os_flags, universal, reading, writing, basemode, binary,
+     mapping) = decode_mode(mode)
     if reading and writing:
         raise oefmt(space.w_ValueError, "cannot open in read-write mode")
     if basemode == "a":
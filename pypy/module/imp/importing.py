@@ -720,6 +720,122 @@ def load_part(space, w_path, prefix, partname, w_parent, tentative):
         # ImportError
         raise oefmt(space.w_ImportError, "No module named %s", modulename)
 
+# __________________________________________________________________
+#
+# lazy imports: the module object is created and stored in sys.modules
+# immediately, but its body only runs on the first access to its dict
+
+class LazyModule(Module):
+    """A source or bytecode module whose code is executed only when
+    one of its attributes is first read or written.  See
+    __pypy__.lazy_import()."""
+
+    def __init__(self, space, w_name, find_info):
+        Module.__init__(self, space, w_name)
+        # the stream is closed by the caller; it is reopened in _force()
+        self.find_info = find_info
+        self.forcing = False
+
+    def getdict(self, space):
+        if self.find_info is not None:
+            self._force(space)
+        return self.w_dict
+
+    @jit.dont_look_inside
+    def _force(self, space):
+        lock = getimportlock(space)
+        lock.acquire_lock()
+        try:
+            find_info = self.find_info
+            if find_info is None or self.forcing:
+                # already forced by another thread while we were waiting
+                # for the lock, or the code of the module is running in
+                # this thread right now
+                return
+            self.forcing = True
+            try:
+                try:
+                    find_info.stream = streamio.open_file_as_stream(
+                        find_info.filename, find_info.filemode)
+                except StreamErrors as e:
+                    raise wrap_streamerror(space, e,
+                                           space.newtext(find_info.filename))
+                # load_module(reuse=True) executes the code in the module
+                # found in sys.modules, which must be us
+                space.setitem(space.sys.get('modules'), self.w_name, self)
+                try:
+                    load_module(space, self.w_name, find_info, reuse=True)
+                finally:
+                    _close_ignore(find_info.stream)
+            except OperationError:
+                # like a failed import, remove the module from sys.modules;
+                # the next access to it tries again
+                self.forcing = False
+                w_mods = space.sys.get('modules')
+                space.call_method(w_mods, 'pop', self.w_name, space.w_None)
+                raise
+            self.find_info = None
+            self.forcing = False
+        finally:
+            lock.release_lock(silent_after_fork=True)
+
+@jit.dont_look_inside
+def lazy_import(space, modulename):
+    """Return the module 'modulename', creating it as a LazyModule if it
+    is a plain .py or .pyc file not imported yet.  Parent packages,
+    builtin modules, extension modules and modules found by import hooks
+    are imported eagerly as usual."""
+    if '/' in modulename or '\\' in modulename:
+        raise oefmt(space.w_ImportError,
+                    "Import by filename is not supported.")
+    w_modulename = space.newtext(modulename)
+    w_mod = check_sys_modules(space, w_modulename)
+    if w_mod is not None and not space.is_w(w_mod, space.w_None):
+        return w_mod
+
+    lock = getimportlock(space)
+    lock.acquire_lock()
+    try:
+        w_parent = None
+        w_path = None
+        last_dot = modulename.rfind('.')
+        if last_dot >= 0:
+            parentname = modulename[:last_dot]
+            absolute_import(space, parentname, 0, None, tentative=0)
+            w_parent = check_sys_modules_w(space, parentname)
+            if w_parent is not None:
+                w_path = try_getattr(space, w_parent, space.newtext('__path__'))
+            if w_path is None:
+                raise oefmt(space.w_ImportError, "No module named %s",
+                            modulename)
+            partname = modulename[last_dot + 1:]
+        else:
+            partname = modulename
+
+        w_mod = check_sys_modules(space, w_modulename)
+        if w_mod is not None and not space.is_w(w_mod, space.w_None):
+            return w_mod
+        find_info = find_module(space, modulename, w_modulename, partname,
+                                w_path)
+        if find_info is None:
+            raise oefmt(space.w_ImportError, "No module named %s", modulename)
+        try:
+            if (find_info.w_loader is None and
+                    find_info.modtype in (PY_SOURCE, PY_COMPILED)):
+                w_mod = LazyModule(space, w_modulename, find_info)
+                # not space.sys.setmodule(), which would read __name__
+                space.setitem(space.sys.get('modules'), w_modulename, w_mod)
+            else:
+                w_mod = load_module(space, w_modulename, find_info)
+        finally:
+            if find_info.stream:
+                _close_ignore(find_info.stream)
+        if w_parent is not None:
+            space.setattr(w_parent, space.newtext(partname), w_mod)
+        return w_mod
+    finally:
+        lock.release_lock(silent_after_fork=True)
+
 @jit.dont_look_inside
 def reload(space, w_module):
     """Reload the module.
@@ -39,6 +39,10 @@ def setup_directory_structure(space):
                     del_sys_module = "import sys\ndel sys.modules['del_sys_module']\n",
                     _md5 = "hello_world = 42\n",
                     gc = "should_never_be_seen = 42\n",
+                    lazy_a = "import sys\nsys.lazy_a_executed = True\nx = 42",
+                    lazy_broken = "raise ValueError('boom')",
+                    lazy_self = "import sys\nx = 42\n"
+                                "y = sys.modules['lazy_self'].x + 1",
                     )
     root.ensure("notapackage", dir=1)    # empty, no __init__.py
     setuppkg("pkg",
@@ -64,6 +68,7 @@ def setup_directory_structure(space):
              b          = "insubpackage = 1",
              )
     setuppkg("pkg.pkg2", a='', b='')
+    setuppkg("pkg_lazy", __init__="initialized = 1", sub="y = 43")
     setuppkg("pkg.withall",
              __init__  = "__all__ = ['foobar', 'barbaz']",
              foobar    = "found = 123",
@@ -248,6 +253,51 @@ class AppTestImport:
         assert pkg == sys.modules.get('pkg')
         assert pkg.a == sys.modules.get('pkg.a')
 
+    def test_lazy_import(self):
+        import sys, __pypy__
+        mod = __pypy__.lazy_import('lazy_a')
+        assert sys.modules['lazy_a'] is mod
+        assert not hasattr(sys, 'lazy_a_executed')
+        assert mod.x == 42
+        assert sys.lazy_a_executed
+        assert mod.__file__.startswith(sys.path[0])
+        import lazy_a
+        assert lazy_a is mod
+        assert __pypy__.lazy_import('lazy_a') is mod
+        del sys.lazy_a_executed
+
+    def test_lazy_import_dotted(self):
+        import sys, __pypy__
+        mod = __pypy__.lazy_import('pkg_lazy.sub')
+        assert sys.modules['pkg_lazy'].initialized == 1
+        assert sys.modules['pkg_lazy.sub'] is mod
+        assert sys.modules['pkg_lazy'].sub is mod
+        assert mod.y == 43
+
+    def test_lazy_import_builtin_and_package(self):
+        import sys, __pypy__
+        assert __pypy__.lazy_import('sys') is sys
+        pkg = __pypy__.lazy_import('pkg.pkg2')
+        assert pkg.__path__
+
+    def test_lazy_import_errors(self):
+        import sys, __pypy__
+        raises(ImportError, __pypy__.lazy_import, 'lazy_does_not_exist')
+        raises(ImportError, __pypy__.lazy_import, 'a.b')
+        mod = __pypy__.lazy_import('lazy_broken')
+        exc = raises(ValueError, getattr, mod, 'anything')
+        assert str(exc.value) == 'boom'
+        assert 'lazy_broken' not in sys.modules
+        # not left empty: the next access runs the code again
+        exc = raises(ValueError, getattr, mod, 'anything')
+        assert str(exc.value) == 'boom'
+
+    def test_lazy_import_uses_itself(self):
+        import sys, __pypy__
+        mod = __pypy__.lazy_import('lazy_self')
+        assert mod.y == 43
+        assert sys.modules['lazy_self'] is mod
+
     def test_import_keywords(self):
         __import__(name='sys', level=0)
 
@@ -210,6 +210,69 @@ Does not force update of metadata."""
     except OSError as e:
         raise wrap_oserror(space, e)
 
+_HAVE_SENDFILE_NO_OFFSET = hasattr(rposix, 'sendfile_no_offset')
+
+def _optional_offset(space, w_offset):
+    if space.is_none(w_offset):
+        return -1
+    offset = space.r_longlong_w(w_offset)
+    if offset < 0:
+        raise oefmt(space.w_ValueError, "offset must not be negative")
+    return offset
+
+@unwrap_spec(out_fd=c_int, in_fd=c_int, count=int)
+def sendfile(space, out_fd, in_fd, w_offset, count):
+    """sendfile(out_fd, in_fd, offset, count) -> byteswritten
+
+Copy count bytes from file descriptor in_fd to file descriptor out_fd,
+starting at offset, without going through user space.  If offset is None,
+read from the current position of in_fd and update it."""
+    offset = _optional_offset(space, w_offset)
+    if offset < 0 and not _HAVE_SENDFILE_NO_OFFSET:
+        raise oefmt(space.w_TypeError, "offset must be an integer")
+    try:
+        if _HAVE_SENDFILE_NO_OFFSET and offset < 0:
+            res = rposix.sendfile_no_offset(out_fd, in_fd, count)
+        else:
+            res = rposix.sendfile(out_fd, in_fd, offset, count)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    return space.newint(res)
+
+@unwrap_spec(src=c_int, dst=c_int, count=int, flags=c_int)
+def splice(space, src, dst, count, w_offset_src=None, w_offset_dst=None,
+           flags=0):
+    """splice(src, dst, count, offset_src=None, offset_dst=None, flags=0) -> count
+
+Move up to count bytes from file descriptor src to file descriptor dst,
+one of which must refer to a pipe, without copying them through user
+space.  A None offset means the current file position is used and
+updated."""
+    offset_src = _optional_offset(space, w_offset_src)
+    offset_dst = _optional_offset(space, w_offset_dst)
+    try:
+        res = rposix.splice(src, offset_src, dst, offset_dst, count, flags)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    return space.newint(res)
+
+@unwrap_spec(src=c_int, dst=c_int, count=int)
+def copy_file_range(space, src, dst, count, w_offset_src=None,
+                    w_offset_dst=None):
+    """copy_file_range(src, dst, count, offset_src=None, offset_dst=None) -> count
+
+Copy up to count bytes from file descriptor src to file descriptor dst,
+inside the kernel.  A None offset means the current file position is used
+and updated."""
+    offset_src = _optional_offset(space, w_offset_src)
+    offset_dst = _optional_offset(space, w_offset_dst)
+    try:
+        res = rposix.copy_file_range(src, offset_src, dst, offset_dst,
+                                     count, 0)
+    except OSError as e:
+        raise wrap_oserror(space, e)
+    return space.newint(res)
+
 def fchdir(space, w_fd):
     """Change to the directory of the given file descriptor.  fildes must be
 opened on a directory, not a file."""
@@ -172,6 +172,13 @@ corresponding Unix manual entries for more information on calls."""
     if hasattr(os, 'chroot'):
         interpleveldefs['chroot'] = 'interp_posix.chroot'
 
+    for name in ['sendfile', 'splice', 'copy_file_range']:
+        if hasattr(rposix, name):
+            interpleveldefs[name] = 'interp_posix.%s' % (name,)
+    for name in ['SPLICE_F_MOVE', 'SPLICE_F_NONBLOCK', 'SPLICE_F_MORE']:
+        if hasattr(rposix, name):
+            interpleveldefs[name] = 'space.wrap(%d)' % getattr(rposix, name)
+
     for name in rposix.WAIT_MACROS:
         if hasattr(os, name):
             interpleveldefs[name] = 'interp_posix.' + name
@@ -813,6 +813,72 @@ class AppTestPosix:
             with raises(ValueError):
                 os.fdatasync(-1)
 
+    if hasattr(rposix, 'sendfile_no_offset'):
+        def test_sendfile(self):
+            os = self.posix
+            fd = os.open(self.path2 + 'sendfile', os.O_RDWR | os.O_CREAT)
+            r, w = os.pipe()
+            try:
+                os.write(fd, b'abcdefghij')
+                assert os.sendfile(w, fd, 3, 4) == 4
+                assert os.read(r, 10) == b'defg'
+                assert os.lseek(fd, 0, 1) == 10
+                os.lseek(fd, 8, 0)
+                assert os.sendfile(w, fd, None, 100) == 2
+                assert os.read(r, 10) == b'ij'
+                assert os.lseek(fd, 0, 1) == 10
+                raises(ValueError, os.sendfile, w, fd, -1, 4)
+                raises(OSError, os.sendfile, w, r, 0, 4)
+            finally:
+                os.close(fd)
+                os.close(r)
+                os.close(w)
+
+    if hasattr(rposix, 'splice'):
+        def test_splice(self):
+            os = self.posix
+            fd = os.open(self.path2 + 'splice',
+                         os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+            r, w = os.pipe()
+            try:
+                os.write(fd, b'abcdefghij')
+                assert os.splice(fd, w, 5, offset_src=2,
+                                 flags=os.SPLICE_F_MOVE) == 5
+                assert os.read(r, 10) == b'cdefg'
+                os.write(w, b'xyz')
+                assert os.splice(r, fd, 3, None, 0) == 3
+                os.lseek(fd, 0, 0)
+                assert os.read(fd, 20) == b'xyzdefghij'
+                raises(OSError, os.splice, fd, fd, 3)
+            finally:
+                os.close(fd)
+                os.close(r)
+                os.close(w)
+
+    if hasattr(rposix, 'copy_file_range'):
+        def test_copy_file_range(self):
+            import errno
+            os = self.posix
+            src = os.open(self.path2 + 'cfr1',
+                          os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+            dst = os.open(self.path2 + 'cfr2',
+                          os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+            try:
+                os.write(src, b'abcdefghij')
+                try:
+                    res = os.copy_file_range(src, dst, 100, 3)
+                except OSError as e:
+                    if e.errno in (errno.ENOSYS, errno.EXDEV):
+                        skip("copy_file_range() not supported here")
+                    raise
+                assert res == 7
+                assert os.copy_file_range(src, dst, 3, 0, 7) == 3
+                os.lseek(dst, 0, 0)
+                assert os.read(dst, 20) == b'defghijabc'
+            finally:
+                os.close(src)
+                os.close(dst)
+
     if hasattr(os, 'fchdir'):
         def test_fchdir(self):
             os = self.posix
@@ -33,6 +33,10 @@ PyFrame._virtualizable_ = ['last_instr', 'pycode',
 
 JUMP_ABSOLUTE = opmap['JUMP_ABSOLUTE']
 
+# code objects up to this many bytes of bytecode are traced after
+# 'small_function_threshold' calls instead of 'function_threshold'
+SMALL_FUNCTION_SIZE = 200
+
 def get_printable_location(next_instr, is_being_profiled, bytecode):
     from pypy.tool.stdlib_opcode import opcode_method_names
     name = opcode_method_names[ord(bytecode.co_code[next_instr])]
@@ -61,6 +65,9 @@ def get_location(next_instr, is_being_profiled, bytecode):
 def should_unroll_one_iteration(next_instr, is_being_profiled, bytecode):
     return (bytecode.co_flags & CO_GENERATOR) != 0
 
+def is_small_function(next_instr, is_being_profiled, bytecode):
+    return len(bytecode.co_code) <= SMALL_FUNCTION_SIZE
+
 class PyPyJitDriver(JitDriver):
     reds = ['frame', 'ec']
     greens = ['next_instr', 'is_being_profiled', 'pycode']
@@ -71,6 +78,7 @@ pypyjitdriver = PyPyJitDriver(get_printable_location = get_printable_location,
                               get_unique_id = get_unique_id,
                               should_unroll_one_iteration =
                               should_unroll_one_iteration,
+                              is_small_function = is_small_function,
                               name='pypyjit',
                               is_recursive=True)
 
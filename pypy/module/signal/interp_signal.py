@@ -39,6 +39,9 @@ class SignalActionFlag(AbstractActionFlag):
         p = pypysig_getaddr_occurred()
         p.c_value = -1
 
+    def get_ticker_address(self):
+        return rffi.cast(rffi.SIGNEDP, pypysig_getaddr_occurred())
+
     def decrement_ticker(self, by):
         p = pypysig_getaddr_occurred()
         value = p.c_value
@@ -28,6 +28,10 @@ class GILThreadLocals(OSThreadLocals):
             # Note: this is a quasi-immutable read by module/pypyjit/interp_jit
             # It must be changed (to True) only if it was really False before
             rgil.allocate()
+            # let threads waiting for the GIL ask for it through the
+            # ticker, after the switch interval
+            rgil.set_switch_request_ticker(
+                space.actionflag.get_ticker_address())
             self.gil_ready = True
             result = True
         else:
@@ -43,9 +47,13 @@ class GILThreadLocals(OSThreadLocals):
 
 
 class GILReleaseAction(PeriodicAsyncAction):
-    """An action called every sys.checkinterval bytecodes.  It releases
-    the GIL to give some other thread a chance to run.
+    """An action called every sys.checkinterval bytecodes, or when a thread
+    waiting for the GIL asks for it.  It releases the GIL to give some
+    other thread a chance to run.  If the ticker lives in raw memory (i.e.
+    with the signal module), threads are only switched on request, after
+    the switch interval; otherwise we fall back to the bytecode counter.
     """
 
     def perform(self, executioncontext, frame):
-        rgil.yield_thread()
+        if rgil.switch_requested():
+            rgil.yield_thread()
@@ -11,7 +11,9 @@ like: (on the left, without the new bytecodes; on the right, with them)
 """
 
 from pypy.interpreter import function
+from pypy.interpreter.module import Module
 from rpython.rlib import jit
+from pypy.objspace.std.celldict import LOAD_ATTR_module_cached
 from pypy.objspace.std.mapdict import LOOKUP_METHOD_mapdict, \
     LOOKUP_METHOD_mapdict_fill_cache_method
 
@@ -38,6 +40,13 @@ def LOOKUP_METHOD(f, nameindex, *ignored):
         # mapdict has an extra-fast version of this function
         if LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
             return
+        # and the module dict cache handles 'module.function(args..)'
+        if type(w_obj) is Module:
+            w_value = LOAD_ATTR_module_cached(f.getcode(), w_obj, nameindex)
+            if w_value is not None:
+                f.pushvalue(w_value)
+                f.pushvalue_none()
+                return
 
     w_name = f.getname_w(nameindex)
     w_value = None
@@ -61,7 +70,6 @@ def LOOKUP_METHOD(f, nameindex, *ignored):
             # this handles directly the common case
             #   module.function(args..)
             w_value = w_obj.getdictvalue(space, name)
-            # xxx we could also use the mapdict cache in that case, probably
         else:
             typ = type(w_descr)
             if typ is function.Function or typ is function.FunctionWithFixedCode:
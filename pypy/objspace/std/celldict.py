@@ -298,6 +298,51 @@ def _LOAD_GLOBAL_cached(self, nameindex, next_instr):
 def _load_global_fallback(self, varname):
     return self._load_global(varname)
 
+# ____________________________________________________________
+# caching of attribute reads on plain modules, like 'os.path'
+
+class ModuleAttrCache(object):
+    def __init__(self, w_dict, cache):
+        self.w_dict_wref = weakref.ref(w_dict)
+        self.cache_wref = cache.ref
+
+@objectmodel.always_inline
+def LOAD_ATTR_module_cached(pycode, w_module, nameindex):
+    """ Read the attribute 'co_names[nameindex]' of w_module, which must be
+    exactly an instance of Module, using the global cache of the module
+    dict. Returns None if the cache cannot answer; the caller must then
+    fall back to the general getattr. Not used if we_are_jitted(). """
+    caches = pycode._moduleattr_caches
+    if caches is not None:
+        entry = caches[nameindex]
+        if entry is not None and entry.w_dict_wref() is w_module.w_dict:
+            cache = entry.cache_wref()
+            if cache is not None:
+                w_value = cache.getvalue(pycode.space)
+                if w_value is not None:
+                    return w_value
+    return _load_attr_module_fill_cache(pycode, w_module, nameindex)
+
+@objectmodel.dont_inline
+def _load_attr_module_fill_cache(pycode, w_module, nameindex):
+    space = pycode.space
+    name = space.text_w(pycode.co_names_w[nameindex])
+    # the module type is not mutable, so if 'name' is not found there now,
+    # it never will be: the attribute comes straight from the module dict
+    if space.lookup(w_module, name) is not None:
+        return None
+    w_dict = w_module.w_dict
+    if not isinstance(w_dict, W_ModuleDictObject):
+        return None
+    cache = w_dict.get_global_cache(name)
+    if cache is None:
+        return None
+    if space._side_effects_ok():
+        if pycode._moduleattr_caches is None:
+            pycode._moduleattr_caches = [None] * len(pycode.co_names_w)
+        pycode._moduleattr_caches[nameindex] = ModuleAttrCache(w_dict, cache)
+    return cache.getvalue(space)
+
 def STORE_GLOBAL_cached(self, nameindex, next_instr):
     w_newvalue = self.popvalue()
     if jit.we_are_jitted() or self.getdebug() is not None:
@@ -6,6 +6,7 @@ from rpython.rlib.longlong2float import longlong2float, float2longlong
 from rpython.rlib.rweakref import dead_ref
 
 from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.module import Module
 from pypy.interpreter.typedef import _share_methods
 from pypy.objspace.std.dictmultiobject import (
     W_DictMultiObject, DictStrategy, ObjectDictStrategy, BaseKeyIterator,
@@ -13,6 +14,7 @@ from pypy.objspace.std.dictmultiobject import (
     W_DictObject, BytesDictStrategy, UnicodeDictStrategy
 )
 from pypy.objspace.std.typeobject import MutableCell
+from pypy.objspace.std.celldict import LOAD_ATTR_module_cached
 
 
 
@@ -1317,7 +1319,12 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
     w_name = pycode.co_names_w[nameindex]
-    if map is not None:
+    if map is None and type(w_obj) is Module:
+        # common case of 'module.attribute'
+        w_value = LOAD_ATTR_module_cached(pycode, w_obj, nameindex)
+        if w_value is not None:
+            return w_value
+    elif map is not None:
         w_type = map.terminator.w_cls
         w_descr = w_type.getattribute_if_not_from_object()
         if w_descr is not None:
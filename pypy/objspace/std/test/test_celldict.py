@@ -1,5 +1,6 @@
 import py
 
+from pypy.interpreter.pycode import PyCode
 from pypy.objspace.std.celldict import ModuleDictStrategy
 from pypy.objspace.std.dictmultiobject import W_DictObject, W_ModuleDictObject
 from pypy.objspace.std.test.test_dictmultiobject import (
@@ -153,6 +154,94 @@ class AppTestCellDict(object):
         d[object()] = 5
         assert d.values() == [5]
 
+class TestModuleAttrCache(object):
+
+    def test_cache_is_filled(self):
+        space = self.space
+        w_f = space.appexec([], """():
+            import types
+            m = types.ModuleType("m")
+            m.x = 42
+            def f():
+                return m.x, m.__name__, m.__dict__
+            f()
+            return f
+        """)
+        code = space.interp_w(PyCode, space.getattr(w_f, space.wrap("func_code")))
+        caches = code._moduleattr_caches
+        x_entry, name_entry, dict_entry = caches
+        assert x_entry is not None
+        assert x_entry.cache_wref().getvalue(space) is not None
+        assert name_entry is not None
+        assert dict_entry is None    # found on the module type
+
+
+class AppTestModuleAttrCache(object):
+
+    def test_module_attribute(self):
+        import types
+        m = types.ModuleType("m")
+        m.x = 1
+        def f(mod):
+            return mod.x
+        def g(mod):
+            return mod.x()
+        for i in range(3):
+            assert f(m) == 1
+        m.x = 2
+        assert f(m) == 2
+        m.__dict__['x'] = 3
+        assert f(m) == 3
+        del m.x
+        raises(AttributeError, f, m)
+        m.x = lambda: 42
+        assert g(m) == 42
+        m.x = lambda: 43
+        assert g(m) == 43
+        other = types.ModuleType("other")
+        other.x = 5
+        assert f(other) == 5
+        assert f(m)() == 43
+        del m.x
+        raises(AttributeError, g, m)
+
+    def test_module_type_attributes(self):
+        import types
+        m = types.ModuleType("m", "docstring")
+        def f(mod):
+            return mod.__dict__, mod.__doc__, mod.__name__
+        for i in range(3):
+            assert f(m) == (m.__dict__, "docstring", "m")
+
+    def test_module_subclass(self):
+        import types
+        class M(types.ModuleType):
+            @property
+            def x(self):
+                return 42
+        def f(mod):
+            return mod.x
+        m = types.ModuleType("m")
+        m.x = 1
+        assert f(m) == 1
+        sub = M("sub")
+        sub.__dict__['x'] = 2
+        assert f(sub) == 42
+        assert f(m) == 1
+
+    def test_module_dict_devolves(self):
+        import types
+        m = types.ModuleType("m")
+        m.x = 1
+        def f(mod):
+            return mod.x
+        assert f(m) == 1
+        m.__dict__[5] = 6
+        assert f(m) == 1
+        m.x = 2
+        assert f(m) == 2
+
+
 class TestCellCache(object):
     FakeString = FakeString
 
@@ -0,0 +1,69 @@
+""" Measure --jit bridge_compaction=N, which traces a loop again once N
+bridges were attached to it (see MemoryManager.bridge_attached() in
+rpython/jit/metainterp/memmgr.py).
+
+The workload is a function called over and over, like the handler of a
+long-running service, whose hot path changes after the warm-up: its loop
+is first traced for one kind of item, and then mostly sees other kinds,
+which go through bridges.  Every setting runs in a fresh process and
+prints the time spent tracing, the number of loops and bridges compiled,
+and the time per call once the JIT has settled.
+
+Usage: pypy bridge-compaction-bench.py [calls [items]]
+"""
+
+import sys, subprocess
+
+WORKLOAD = """
+import time, pypyjit
+
+def handle(items, kind):
+    total = 0
+    for x in items:
+        if kind == 0:
+            total += x
+        elif kind == 1:
+            total += x * 2
+        elif kind == 2:
+            total -= x
+        else:
+            total ^= x
+    return total
+
+items = range(ITEMS)
+for i in range(CALLS):          # warm up: only kind 0
+    handle(items, 0)
+for i in range(CALLS):          # the mix changes
+    handle(items, 1 + i % 3)
+t0 = time.time()
+for i in range(CALLS):          # steady state
+    handle(items, 1 + i % 3)
+t1 = time.time()
+stats = pypyjit.get_stats_snapshot()
+print stats.counter_times['TRACING'], \\
+      stats.counters['TOTAL_COMPILED_LOOPS'], \\
+      stats.counters['TOTAL_COMPILED_BRIDGES'], (t1 - t0) / CALLS
+"""
+
+def measure(calls, items, compaction):
+    source = (WORKLOAD.replace('CALLS', str(calls))
+                      .replace('ITEMS', str(items)))
+    cmd = [sys.executable, '--jit', 'bridge_compaction=%d' % compaction,
+           '-c', source]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    out = p.communicate()[0]
+    tracing, loops, bridges, per_call = out.split()
+    return float(tracing), int(loops), int(bridges), float(per_call)
+
+def main(calls, items):
+    print '%-20s %10s %6s %8s %12s' % ('bridge_compaction', 'tracing',
+                                       'loops', 'bridges', 'per call')
+    for compaction in [0, 1, 2, 4]:
+        tracing, loops, bridges, per_call = measure(calls, items, compaction)
+        print '%-20d %9.3fs %6d %8d %10.1fus' % (
+            compaction, tracing, loops, bridges, per_call * 1e6)
+
+if __name__ == '__main__':
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    main(calls, items)
@@ -0,0 +1,56 @@
+""" Time compile() on large generated modules, which is what dominates
+the cold start of big applications whose .pyc files are missing or stale.
+
+Usage: pypy compile-bench.py [number of functions]
+"""
+
+import sys, time
+
+FUNCTION = '''
+def function_%(i)d(a, b=%(i)d, *args, **kwds):
+    """Docstring of function_%(i)d."""
+    x = a + b * 2 - (a // 3) %% 7
+    if x > %(i)d and not a or b is None:
+        y = [i * 2 for i in range(x) if i %% 3]
+        z = {'key%(i)d': y, 'other': (a, b, x)}
+    elif -x < 0:
+        y = z = None
+    else:
+        try:
+            y = a.attr.method(b, x, key=kwds.get('k%(i)d'))[0]
+        except (KeyError, AttributeError) as e:
+            raise ValueError("function_%(i)d: %%s" %% (e,))
+    for k, v in sorted(kwds.items()):
+        x += len(k) << 1 | v & 0xff
+    return lambda q: q + x, y, z
+
+class Class_%(i)d(object):
+    attr = %(i)d
+
+    def method(self, other):
+        return self.attr ** 2 + other.attr if other else self.attr
+'''
+
+def make_module(count):
+    return ''.join([FUNCTION % {'i': i} for i in range(count)])
+
+def bench(count, repeat=5):
+    source = make_module(count)
+    lines = source.count('\n')
+    best = None
+    for i in range(repeat):
+        t0 = time.time()
+        compile(source, '<bench_%d>' % count, 'exec')
+        t1 = time.time()
+        if best is None or t1 - t0 < best:
+            best = t1 - t0
+    print '%6d functions, %7d lines: %.3fs (%.0f lines/s)' % (
+        count, lines, best, lines / best)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        counts = [int(sys.argv[1])]
+    else:
+        counts = [100, 1000, 5000]
+    for count in counts:
+        bench(count)
@@ -0,0 +1,106 @@
+""" Compare an echo server driven by select.epoll with one driven by
+_io_uring, which submits all the pending recvs and sends of an iteration
+with a single system call.
+
+A forked client process opens a number of connections and, for a number
+of rounds, sends a message on each of them and waits for all the replies.
+
+Usage: pypy echo-bench.py [connections [rounds]]
+"""
+
+import os, sys, time, socket, select
+
+MESSAGE = 'x' * 64
+
+def client(address, connections, rounds):
+    socks = [socket.create_connection(address) for i in range(connections)]
+    for i in range(rounds):
+        for s in socks:
+            s.sendall(MESSAGE)
+        for s in socks:
+            received = 0
+            while received < len(MESSAGE):
+                received += len(s.recv(4096))
+    for s in socks:
+        s.close()
+
+def serve_epoll(listener, connections):
+    ep = select.epoll()
+    ep.register(listener.fileno(), select.EPOLLIN)
+    conns = {}
+    accepted = 0
+    while accepted < connections or conns:
+        for fd, event in ep.poll():
+            if fd == listener.fileno():
+                conn, _ = listener.accept()
+                conns[conn.fileno()] = conn
+                ep.register(conn.fileno(), select.EPOLLIN)
+                accepted += 1
+                continue
+            conn = conns[fd]
+            data = conn.recv(4096)
+            if data:
+                conn.sendall(data)
+            else:
+                ep.unregister(fd)
+                conn.close()
+                del conns[fd]
+    ep.close()
+
+def serve_uring(listener, connections):
+    import _io_uring
+    bufsize = 4096
+    ring = _io_uring.Ring(max(2 * connections, 64))
+    buf = _io_uring.Buffer(bufsize * connections)
+    for i in range(connections):
+        ring.prep_accept(listener, user_data=('accept', i, -1))
+    live = connections
+    while live:
+        ring.submit(1)
+        for (kind, slot, fd), res in ring.completions():
+            if kind == 'accept':
+                fd = res
+                ring.prep_recv(fd, buf, slot * bufsize, bufsize,
+                               user_data=('recv', slot, fd))
+            elif kind == 'recv':
+                if res <= 0:
+                    os.close(fd)
+                    live -= 1
+                else:
+                    ring.prep_send(fd, buf, slot * bufsize, res,
+                                   user_data=('send', slot, fd))
+            elif kind == 'send':
+                ring.prep_recv(fd, buf, slot * bufsize, bufsize,
+                               user_data=('recv', slot, fd))
+    ring.close()
+
+def bench(name, serve, connections, rounds):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(connections)
+    t0 = time.time()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            client(listener.getsockname(), connections, rounds)
+        finally:
+            os._exit(0)
+    serve(listener, connections)
+    os.waitpid(pid, 0)
+    t1 = time.time()
+    listener.close()
+    total = connections * rounds
+    print '%-8s %5d connections, %7d messages: %.3fs (%.0f msg/s)' % (
+        name, connections, total, t1 - t0, total / (t1 - t0))
+
+if __name__ == '__main__':
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    bench('epoll', serve_epoll, connections, rounds)
+    try:
+        import _io_uring
+    except ImportError:
+        print 'io_uring: not available'
+    else:
+        bench('io_uring', serve_uring, connections, rounds)
@@ -0,0 +1,89 @@
+""" Measure the GIL handoff cost of many threads doing tiny I/O operations.
+
+Every operation below is a short system call around which the GIL is
+released and reacquired: os.fstat() and os.write() to /dev/null, pread-style
+os.lseek()+os.read() on a small file, and a send()+recv() of one byte over a
+socketpair.  Each kind of operation is run in a number of threads at the
+same time for a fixed duration, once with the "sticky GIL" disabled and once
+with the default threshold (see __pypy__.thread.set_sticky_gil_threshold).
+
+Usage: pypy gil-io-bench.py [threads [seconds]]
+"""
+
+import os, sys, time, socket, tempfile, thread
+
+def op_fstat(state):
+    os.fstat(state['fd'])
+
+def op_write(state):
+    os.write(state['null'], 'x')
+
+def op_pread(state):
+    os.lseek(state['fd'], 0, 0)
+    os.read(state['fd'], 64)
+
+def op_socket(state):
+    a, b = state['pair']
+    a.send('x')
+    b.recv(1)
+
+def worker(op, duration, results, lock, filename):
+    state = {
+        'fd': os.open(filename, os.O_RDONLY),
+        'null': os.open(os.devnull, os.O_WRONLY),
+        'pair': socket.socketpair(),
+    }
+    count = 0
+    end = time.time() + duration
+    while time.time() < end:
+        for i in range(100):
+            op(state)
+        count += 100
+    os.close(state['fd'])
+    os.close(state['null'])
+    for s in state['pair']:
+        s.close()
+    results.append(count)
+    lock.release()
+
+def bench(name, op, nthreads, duration, filename):
+    results = []
+    locks = []
+    for i in range(nthreads):
+        lock = thread.allocate_lock()
+        lock.acquire()
+        locks.append(lock)
+        thread.start_new_thread(worker,
+                                (op, duration, results, lock, filename))
+    for lock in locks:
+        lock.acquire()
+    total = sum(results)
+    print '  %-8s %2d threads: %9.0f ops/s' % (name, nthreads,
+                                               total / duration)
+
+OPS = [('fstat', op_fstat), ('write', op_write), ('pread', op_pread),
+       ('socket', op_socket)]
+
+if __name__ == '__main__':
+    nthreads = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    fd, filename = tempfile.mkstemp()
+    os.write(fd, 'x' * 4096)
+    os.close(fd)
+    try:
+        try:
+            from __pypy__ import thread as pypythread
+            default = pypythread.get_sticky_gil_threshold()
+            settings = [('sticky GIL off', 0.0),
+                        ('sticky GIL %g s' % default, default)]
+        except (ImportError, AttributeError):
+            pypythread = None
+            settings = [('default', None)]
+        for title, threshold in settings:
+            if pypythread is not None:
+                pypythread.set_sticky_gil_threshold(threshold)
+            print title
+            for name, op in OPS:
+                bench(name, op, nthreads, duration, filename)
+    finally:
+        os.unlink(filename)
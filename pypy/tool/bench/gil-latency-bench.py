@@ -0,0 +1,64 @@
+""" Measure how long a thread doing I/O waits for the GIL while other
+threads run pure Python code.
+
+The I/O thread repeatedly sleeps for a millisecond and measures how late
+it is when it gets to run again.  This is done with a number of busy
+threads and for several values of the switch interval (see
+__pypy__.thread.set_switch_interval).  The GIL waiting statistics of all
+threads are printed at the end (__pypy__.thread.gil_wait_stats).
+
+Usage: pypy gil-latency-bench.py [busy-threads [seconds]]
+"""
+
+import sys, time, thread
+
+def busy(stop, lock):
+    n = 0
+    while not stop:
+        n += 1
+    lock.release()
+
+def measure(duration):
+    delays = []
+    end = time.time() + duration
+    while time.time() < end:
+        t0 = time.time()
+        time.sleep(0.001)
+        delays.append(time.time() - t0 - 0.001)
+    delays.sort()
+    return delays
+
+def bench(title, nthreads, duration):
+    stop = []
+    locks = []
+    for i in range(nthreads):
+        lock = thread.allocate_lock()
+        lock.acquire()
+        locks.append(lock)
+        thread.start_new_thread(busy, (stop, lock))
+    delays = measure(duration)
+    stop.append(True)
+    for lock in locks:
+        lock.acquire()
+    print '%-24s %2d busy threads: median %7.3f ms, 99%% %7.3f ms' % (
+        title, nthreads, delays[len(delays) // 2] * 1000,
+        delays[len(delays) * 99 // 100] * 1000)
+
+if __name__ == '__main__':
+    nthreads = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    try:
+        from __pypy__ import thread as pypythread
+        pypythread.get_switch_interval
+    except (ImportError, AttributeError):
+        bench('default', nthreads, duration)
+    else:
+        default = pypythread.get_switch_interval()
+        for interval in [0.001, default, 0.05]:
+            pypythread.set_switch_interval(interval)
+            bench('switch interval %g s' % interval, nthreads, duration)
+        pypythread.set_switch_interval(default)
+        for ident, (seconds, count) in sorted(
+                pypythread.gil_wait_stats().items()):
+            print '  thread %d: waited %d times, %.3f s' % (ident, count,
+                                                             seconds)
@@ -0,0 +1,63 @@
+""" Measure a polymorphic call site: one loop calls a method on objects of
+one common class, plus a mix of other classes that each show up more or
+less often.
+
+The failures of a guard_class are counted per class that reaches it (see
+AbstractResumeGuardDescr.must_compile() in rpython/jit/metainterp/
+compile.py), so that bridges are only made for the classes that are
+common on their own, and not one after the other for every rare class.
+For every mix, prints the time and the number of bridges compiled.
+
+Usage: pypy guard-class-bench.py [iterations]
+"""
+
+import sys, time
+import pypyjit
+
+def make_classes(count):
+    classes = []
+    for i in range(count):
+        classes.append(type('Sub%d' % i, (object,),
+                            {'f': lambda self, i=i: i}))
+    return classes
+
+class Common(object):
+    def f(self):
+        return 1
+
+MIXES = [
+    # (name, number of other classes, one iteration out of 'every')
+    ('monomorphic', 0, 0),
+    ('2 classes, 1/2', 1, 2),
+    ('4 classes, 1/4', 3, 4),
+    ('50 rare classes, 1/10', 50, 10),
+    ('500 rare classes, 1/3', 500, 3),
+]
+
+def run(others, every, iterations):
+    common = Common()
+    objs = [cls() for cls in make_classes(others)]
+    a = 0
+    for i in xrange(iterations):
+        if every and i % every == 0:
+            o = objs[(i // every) % others]
+        else:
+            o = common
+        a += o.f()
+    return a
+
+def bridges():
+    return pypyjit.get_stats_snapshot().counters['TOTAL_COMPILED_BRIDGES']
+
+def main(iterations):
+    print '%-28s %10s %8s' % ('mix', 'time', 'bridges')
+    for name, others, every in MIXES:
+        b0 = bridges()
+        t0 = time.time()
+        run(others, every, iterations)
+        t1 = time.time()
+        print '%-28s %9.3fs %8d' % (name, t1 - t0, bridges() - b0)
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    main(iterations)
@@ -0,0 +1,54 @@
+""" Measure the cost of sending numeric lists over multiprocessing
+connections.
+
+Connection.send() and recv() pickle lists, dicts, tuples, ints, floats and
+strings natively, and use the pickle module only for other objects.  This
+times send()/recv() of lists of ints and of floats over a pipe, compared to
+doing the same through the pickle module with send_bytes()/recv_bytes();
+then it times multiprocessing.Pool.map() over the same lists.
+
+Usage: pypy pool-pickle-bench.py [list-size [repeat]]
+"""
+
+import sys, time, pickle, multiprocessing
+
+def via_send(reader, writer, obj):
+    writer.send(obj)
+    reader.recv()
+
+def via_pickle(reader, writer, obj):
+    writer.send_bytes(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+    pickle.loads(reader.recv_bytes())
+
+def bench_connection(title, transfer, obj, repeat):
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    t0 = time.time()
+    for i in range(repeat):
+        transfer(reader, writer, obj)
+    t1 = time.time()
+    reader.close()
+    writer.close()
+    print '%-28s %.3f ms per list' % (title, (t1 - t0) * 1000 / repeat)
+
+def square_all(numbers):
+    return [x * x for x in numbers]
+
+def bench_pool(title, obj, repeat):
+    pool = multiprocessing.Pool(4)
+    pool.map(square_all, [obj] * 4)       # warm up
+    t0 = time.time()
+    pool.map(square_all, [obj] * repeat, chunksize=1)
+    t1 = time.time()
+    pool.close()
+    pool.join()
+    print '%-28s %.3f ms per list' % (title, (t1 - t0) * 1000 / repeat)
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    ints = range(size)
+    floats = [i * 0.5 for i in range(size)]
+    for name, obj in [('ints', ints), ('floats', floats)]:
+        bench_connection('send/recv, %s' % name, via_send, obj, repeat)
+        bench_connection('pickle module, %s' % name, via_pickle, obj, repeat)
+        bench_pool('Pool.map, %s' % name, obj, repeat)
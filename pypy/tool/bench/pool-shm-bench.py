@@ -0,0 +1,41 @@
+""" Compare the throughput of a multiprocessing.Pool whose task and result
+queues are pipes with one whose queues are rings in shared memory
+(multiprocessing.Pool(shared_memory=True), see _multiprocessing.shared_pipe).
+
+Every task sends a large array.array of doubles to a worker, which sums it
+and sends it back.
+
+Usage: pypy pool-shm-bench.py [processes [array-size [tasks]]]
+"""
+
+import sys, time, array, multiprocessing
+
+def work(data):
+    sum(data)
+    return data
+
+def bench(title, shared_memory, processes, size, ntasks):
+    pool = multiprocessing.Pool(processes, shared_memory=shared_memory)
+    data = array.array('d', range(size))
+    pool.map(work, [data] * processes)      # warm up
+    t0 = time.time()
+    pool.map(work, [data] * ntasks, chunksize=1)
+    t1 = time.time()
+    pool.close()
+    pool.join()
+    mb = ntasks * len(data) * data.itemsize * 2 / (1024.0 * 1024.0)
+    print '%-14s %2d processes: %.3fs (%.0f MB/s)' % (
+        title, processes, t1 - t0, mb / (t1 - t0))
+
+if __name__ == '__main__':
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    ntasks = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    bench('pipes', False, processes, size, ntasks)
+    try:
+        import _multiprocessing
+        _multiprocessing.shared_pipe
+    except AttributeError:
+        print 'shared memory: not available'
+    else:
+        bench('shared memory', True, processes, size, ntasks)
@@ -0,0 +1,67 @@
+""" Time sequential reads of a large file through the builtin file type.
+
+A file opened with mode 'rm' starts reading large regular files out of an
+mmap once they turn out to be read sequentially; mode 'r' always goes
+through read() system calls and the input buffer.  Both are timed for
+iterating over the lines and for reading the file in 64 kB chunks; the
+file is read once beforehand so that it is in the page cache.
+
+Usage: pypy readahead-bench.py [size-in-MB [filename]]
+"""
+
+import os, sys, time, tempfile
+
+def make_file(filename, size):
+    line = ''.join([chr(ord('a') + i % 26) for i in range(79)]) + '\n'
+    block = line * (1024 * 1024 // len(line))
+    f = open(filename, 'wb')
+    written = 0
+    while written < size:
+        f.write(block)
+        written += len(block)
+    f.close()
+
+def iterate(f):
+    n = 0
+    for line in f:
+        n += len(line)
+    return n
+
+def chunks(f):
+    n = 0
+    while True:
+        data = f.read(65536)
+        if not data:
+            break
+        n += len(data)
+    return n
+
+def bench(name, mode, reader, filename):
+    f = open(filename, mode)
+    t0 = time.time()
+    n = reader(f)
+    t1 = time.time()
+    f.close()
+    print '%-22s %6d MB: %.3fs (%.0f MB/s)' % (
+        name, n >> 20, t1 - t0, (n >> 20) / (t1 - t0))
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    if len(sys.argv) > 2:
+        filename = sys.argv[2]
+        cleanup = False
+    else:
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        cleanup = True
+    try:
+        if cleanup or not os.path.exists(filename):
+            make_file(filename, size << 20)
+        chunks(open(filename, 'r'))
+        bench('lines, buffered', 'r', iterate, filename)
+        bench('lines, readahead', 'rm', iterate, filename)
+        bench('chunks, buffered', 'r', chunks, filename)
+        bench('chunks, readahead', 'rm', chunks, filename)
+    finally:
+        if cleanup:
+            os.unlink(filename)
@@ -0,0 +1,90 @@
+""" Measure the memory taken by the resume data of the guards, i.e. the
+information needed to leave the machine code and go back to the
+interpreter (see rpython/jit/metainterp/resumecode.py), and the time
+taken by guard failures, which decode it.
+
+Every workload runs in a fresh process and prints the counters
+RESUME_BYTES (the resume code kept) and RESUME_BYTES_SHARED (the resume
+code that was not stored a second time because an identical one was
+already made for another guard of the same trace).  The 'guard failures'
+workload runs with a trace_eagerness that is too high for any bridge to
+be made, so that its time is spent mostly in guard failures.
+
+Usage: pypy resume-memory-bench.py [iterations]
+"""
+
+import sys, subprocess
+
+WORKLOADS = {
+    'many small functions': ("", """
+def f0(x): return x + 1
+def f1(x): return f0(x) * 2
+def f2(x): return f1(x) - f0(x)
+def f3(x, d): return d.get(x % 7, f2(x))
+def run(n):
+    d = {1: 2, 3: 4}
+    total = 0
+    for i in xrange(n):
+        total += f3(i, d)
+        if total > 10**9:
+            total = 0
+    return total
+"""),
+    'objects and calls': ("", """
+class A(object):
+    def __init__(self, x):
+        self.x = x
+    def get(self):
+        return self.x
+def run(n):
+    l = [A(i) for i in range(100)]
+    total = 0
+    for i in xrange(n):
+        a = l[i % 100]
+        total += a.get() + len(str(i % 10))
+    return total
+"""),
+    'guard failures': ("trace_eagerness=1000000000", """
+def run(n):
+    total = 0
+    for i in xrange(n):
+        if i % 3 == 0:
+            total += i
+        else:
+            total -= 1
+    return total
+"""),
+}
+
+TIMER = """
+import time, pypyjit
+t0 = time.time()
+run(ITERATIONS)
+t1 = time.time()
+c = pypyjit.get_stats_snapshot().counters
+print c['RESUME_BYTES'], c['RESUME_BYTES_SHARED'], t1 - t0
+"""
+
+def measure(source, jitargs):
+    cmd = [sys.executable]
+    if jitargs:
+        cmd += ['--jit', jitargs]
+    cmd += ['-c', source]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    out = p.communicate()[0]
+    kept, shared, t = out.split()
+    return int(kept), int(shared), float(t)
+
+def main(iterations):
+    print '%-24s %12s %12s %10s' % ('workload', 'resume bytes', 'shared',
+                                     'time')
+    for name in sorted(WORKLOADS):
+        jitargs, source = WORKLOADS[name]
+        source += TIMER.replace('ITERATIONS', str(iterations))
+        kept, shared, t = measure(source, jitargs)
+        print '%-24s %12d %11.1f%% %9.3fs' % (
+            name, kept, 100.0 * shared / max(1, kept + shared), t)
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    main(iterations)
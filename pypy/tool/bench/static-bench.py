@@ -0,0 +1,90 @@
+""" Compare ways of serving a static file over a socket: reading it into
+strings and calling sendall(), or socket.sendfile(), which hands the
+transfer to os.sendfile() so that the data never goes through user space.
+Also times shutil.copyfile(), which uses os.copy_file_range() or
+os.sendfile() where available.
+
+A forked client process requests the file a number of times over one
+connection and reads every response completely.
+
+Usage: pypy static-bench.py [size-in-kB [requests]]
+"""
+
+import os, sys, time, socket, shutil, tempfile
+
+def client(address, size, requests):
+    s = socket.create_connection(address)
+    for i in range(requests):
+        s.sendall('GET\n')
+        received = 0
+        while received < size:
+            chunk = s.recv(65536)
+            if not chunk:
+                raise Exception("connection closed early")
+            received += len(chunk)
+    s.close()
+
+def serve_read(conn, f, size):
+    f.seek(0)
+    while True:
+        data = f.read(65536)
+        if not data:
+            break
+        conn.sendall(data)
+
+def serve_sendfile(conn, f, size):
+    conn.sendfile(f, 0, size)
+
+def bench(name, serve, filename, size, requests):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    t0 = time.time()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            client(listener.getsockname(), size, requests)
+        finally:
+            os._exit(0)
+    conn, _ = listener.accept()
+    with open(filename, 'rb') as f:
+        for i in range(requests):
+            request = ''
+            while not request.endswith('\n'):
+                request += conn.recv(16)
+            serve(conn, f, size)
+    os.waitpid(pid, 0)
+    t1 = time.time()
+    conn.close()
+    listener.close()
+    total = size * requests / (1024.0 * 1024.0)
+    print '%-10s %7d requests of %6d kB: %.3fs (%.0f MB/s)' % (
+        name, requests, size // 1024, t1 - t0, total / (t1 - t0))
+
+def bench_copyfile(filename, size, requests):
+    target = filename + '.copy'
+    t0 = time.time()
+    for i in range(requests):
+        shutil.copyfile(filename, target)
+    t1 = time.time()
+    os.unlink(target)
+    total = size * requests / (1024.0 * 1024.0)
+    print '%-10s %7d copies   of %6d kB: %.3fs (%.0f MB/s)' % (
+        'copyfile', requests, size // 1024, t1 - t0, total / (t1 - t0))
+
+if __name__ == '__main__':
+    size = 1024 * (int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    fd, filename = tempfile.mkstemp()
+    try:
+        os.write(fd, os.urandom(size))
+        os.close(fd)
+        bench('read+send', serve_read, filename, size, requests)
+        if hasattr(socket.socket, 'sendfile'):
+            bench('sendfile', serve_sendfile, filename, size, requests)
+        else:
+            print 'sendfile: not available'
+        bench_copyfile(filename, size, requests)
+    finally:
+        os.unlink(filename)
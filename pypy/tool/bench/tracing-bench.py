@@ -0,0 +1,101 @@
+""" Measure the speed of tracing, i.e. of the meta-interpreter in
+rpython/jit/metainterp/pyjitpl.py that records the operations of a hot
+loop or function before they are optimized and compiled.
+
+Every workload runs in a fresh process with a low threshold, so that the
+first iterations trace a lot of code, like the warm-up of a big
+framework.  For every workload, prints the time spent tracing, the
+number of recorded operations and the time per recorded operation, as
+well as the total time of the run.  Run it with two builds to compare
+them.
+
+Usage: pypy tracing-bench.py [repeat]
+"""
+
+import sys, subprocess
+
+WORKLOADS = {
+    # many small functions that are all inlined in the trace
+    'call chain': """
+def make(n):
+    src = ['def f0(x): return x + 1']
+    for i in range(1, n):
+        src.append('def f%d(x): return f%d(x) + %d' % (i, i - 1, i))
+    d = {}
+    exec '\\n'.join(src) in d
+    return d['f%d' % (n - 1)]
+f = make(60)
+def run():
+    total = 0
+    for i in xrange(2000):
+        total += f(i)
+    return total
+""",
+    # one big function with many bytecodes and guards
+    'big function': """
+def make(n):
+    src = ['def f(x, d):']
+    for i in range(n):
+        src.append('    if x > %d: x = d.get(%d, x) + %d' % (i, i % 10, i))
+    src.append('    return x')
+    d = {}
+    exec '\\n'.join(src) in d
+    return d['f']
+f = make(300)
+def run():
+    d = dict.fromkeys(range(10), 1)
+    total = 0
+    for i in xrange(2000):
+        total += f(i, d)
+    return total
+""",
+    # attribute and method access on instances of many classes
+    'objects': """
+classes = []
+for i in range(40):
+    classes.append(type('C%d' % i, (object,),
+                        {'get': lambda self, i=i: self.x + i}))
+def run():
+    objs = []
+    for i in xrange(40):
+        o = classes[i]()
+        o.x = i
+        objs.append(o)
+    total = 0
+    for i in xrange(2000):
+        for o in objs:
+            total += o.get()
+    return total
+""",
+}
+
+TIMER = """
+import time, pypyjit
+t0 = time.time()
+for _ in range(REPEAT):
+    run()
+t1 = time.time()
+stats = pypyjit.get_stats_snapshot()
+print stats.counter_times['TRACING'], stats.counters['RECORDED_OPS'], t1 - t0
+"""
+
+def measure(source):
+    cmd = [sys.executable, '--jit', 'threshold=200,function_threshold=100',
+           '-c', source]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    out = p.communicate()[0]
+    tracing, ops, total = out.split()
+    return float(tracing), int(ops), float(total)
+
+def main(repeat):
+    print '%-16s %10s %10s %10s %10s' % ('workload', 'tracing', 'ops',
+                                         'per op', 'total')
+    for name in sorted(WORKLOADS):
+        source = WORKLOADS[name] + TIMER.replace('REPEAT', str(repeat))
+        tracing, ops, total = measure(source)
+        print '%-16s %9.3fs %10d %8.2fus %9.3fs' % (
+            name, tracing, ops, tracing / max(1, ops) * 1e6, total)
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    main(repeat)
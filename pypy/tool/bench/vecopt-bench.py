@@ -0,0 +1,125 @@
+""" Measure the speed-up that the vectorizer (--jit vec=1) gives on float64
+loops.  On x86 the vectorized loops use SSE 4.1, and the three-operand AVX
+forms of the arithmetic instructions when the CPU supports AVX (see
+rpython/jit/backend/x86/detect_feature.py).
+
+Every workload runs in a fresh process, once without and once with the
+vectorizer.  The micronumpy workloads need the _numpypy module.  The list
+and array.array workloads are only vectorized with vec_all=1: they check
+that the cost model picks these loops up, and that it leaves alone the
+loops that have nothing to gain ('list, scalar').
+
+Usage: pypy vecopt-bench.py [array-size [repeat]]
+"""
+
+import sys, os, subprocess
+
+WORKLOADS = {
+    'numpy a + b': """
+import _numpypy.multiarray as np
+a = np.array([1.5] * SIZE, dtype='float64')
+b = np.array([2.5] * SIZE, dtype='float64')
+def run():
+    a + b
+""",
+    'numpy a * b + a': """
+import _numpypy.multiarray as np
+a = np.array([1.5] * SIZE, dtype='float64')
+b = np.array([2.5] * SIZE, dtype='float64')
+def run():
+    a * b + a
+""",
+    'numpy a.sum()': """
+import _numpypy.multiarray as np
+a = np.array([1.5] * SIZE, dtype='float64')
+def run():
+    a.sum()
+""",
+    'array c[i] = a[i] * b[i]': """
+import array
+a = array.array('d', [1.5] * SIZE)
+b = array.array('d', [2.5] * SIZE)
+c = array.array('d', [0.0] * SIZE)
+def run():
+    for i in range(SIZE):
+        c[i] = a[i] * b[i]
+""",
+    'array c[i] = a[i] + b[i]': """
+import array
+a = array.array('d', [1.5] * SIZE)
+b = array.array('d', [2.5] * SIZE)
+c = array.array('d', [0.0] * SIZE)
+def run():
+    for i in range(SIZE):
+        c[i] = a[i] + b[i]
+""",
+    'list c[i] = a[i] * b[i]': """
+a = [1.5] * SIZE
+b = [2.5] * SIZE
+c = [0.0] * SIZE
+def run():
+    for i in range(SIZE):
+        c[i] = a[i] * b[i]
+""",
+    'list sum(a[i] * b[i])': """
+a = [1.5] * SIZE
+b = [2.5] * SIZE
+def run():
+    s = 0.0
+    for i in range(SIZE):
+        s += a[i] * b[i]
+    return s
+""",
+    'list a[i] += 1 (ints)': """
+a = range(SIZE)
+def run():
+    for i in range(SIZE):
+        a[i] += 1
+""",
+    'list, scalar': """
+a = [1.5] * SIZE
+def run():
+    s = 0.0
+    for x in a:
+        if x > 1.0:
+            s += x
+        else:
+            s -= x
+    return s
+""",
+}
+
+TIMER = """
+import time
+run()       # warm up
+t0 = time.time()
+for _ in range(REPEAT):
+    run()
+print time.time() - t0
+"""
+
+def measure(source, jitargs):
+    cmd = [sys.executable, '--jit', jitargs, '-c', source]
+    with open(os.devnull, 'w') as devnull:
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=devnull)
+        out = p.communicate()[0]
+    if p.returncode != 0:
+        return None
+    return float(out)
+
+def main(size, repeat):
+    print '%-28s %10s %10s %8s' % ('workload', 'vec=0', 'vec=1', 'speedup')
+    for name in sorted(WORKLOADS):
+        source = (WORKLOADS[name].replace('SIZE', str(size)) +
+                  TIMER.replace('REPEAT', str(repeat)))
+        t0 = measure(source, 'vec=0,vec_all=0')
+        t1 = measure(source, 'vec=1,vec_all=1')
+        if t0 is None or t1 is None:
+            print '%-28s not available' % (name,)
+            continue
+        print '%-28s %9.3fs %9.3fs %7.2fx' % (name, t0, t1, t0 / t1)
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    main(size, repeat)
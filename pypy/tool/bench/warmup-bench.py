@@ -0,0 +1,94 @@
+""" Measure the warm-up curve of a program made of many functions that
+are each only mildly warm, like the handlers of a big web application:
+none of them runs often enough on its own to reach the 'threshold' or
+'function_threshold' of the JIT quickly.
+
+The program calls every function a few times per round.  For every
+setting of the JIT parameters, in a fresh process, prints the time of
+the rounds, so that the curve shows when the code stops running in the
+interpreter and how much the lower thresholds cost in tracing.  The
+'small_function_threshold' settings lower the threshold only for the
+code objects that pypy/module/pypyjit/interp_jit.py finds small, which
+all the handlers are.
+
+Usage: pypy warmup-bench.py [functions [rounds]]
+"""
+
+import sys, subprocess
+
+SETTINGS = [
+    'default',
+    'off',
+    'function_threshold=200',
+    'function_threshold=200,threshold=300',
+    'small_function_threshold=200',
+    'small_function_threshold=200,threshold=300',
+    'decay=0',
+]
+
+WORKLOAD = """
+import time
+def make(n):
+    src = []
+    for i in range(n):
+        src.append('''
+def handler%d(request):
+    total = 0
+    for key in request:
+        if key %% %d == 0:
+            total += request[key] * 2
+        else:
+            total -= 1
+    return total
+''' % (i, i % 7 + 2))
+    d = {}
+    exec ''.join(src) in d
+    return [d['handler%d' % i] for i in range(n)]
+
+handlers = make(FUNCTIONS)
+request = dict.fromkeys(range(20), 3)
+times = []
+for r in range(ROUNDS):
+    t0 = time.time()
+    for handler in handlers:
+        for _ in range(5):
+            handler(request)
+    times.append(time.time() - t0)
+print ' '.join(['%f' % t for t in times])
+"""
+
+def measure(setting, functions, rounds):
+    source = (WORKLOAD.replace('FUNCTIONS', str(functions))
+                      .replace('ROUNDS', str(rounds)))
+    cmd = [sys.executable]
+    if setting != 'default':
+        cmd += ['--jit', setting]
+    cmd += ['-c', source]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    out = p.communicate()[0]
+    return [float(t) for t in out.split()]
+
+def main(functions, rounds):
+    results = []
+    for setting in SETTINGS:
+        results.append(measure(setting, functions, rounds))
+    for i, setting in enumerate(SETTINGS):
+        print '[%d] %s' % (i, setting)
+    print '%-6s' % 'round',
+    for i in range(len(SETTINGS)):
+        print '%12s' % ('[%d]' % i),
+    print
+    for r in range(rounds):
+        print '%-6d' % r,
+        for times in results:
+            print '%11.1fms' % (times[r] * 1000),
+        print
+    print '%-6s' % 'total',
+    for times in results:
+        print '%11.1fms' % (sum(times) * 1000),
+    print
+
+if __name__ == '__main__':
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    main(functions, rounds)
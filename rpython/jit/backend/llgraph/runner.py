@@ -53,7 +53,8 @@ class LLTrace(object):
         self.operations = []
         for op in operations:
             opnum = op.getopnum()
-            if opnum == rop.GUARD_VALUE:
+            if (opnum == rop.GUARD_VALUE or opnum == rop.GUARD_CLASS or
+                    opnum == rop.GUARD_NONNULL_CLASS):
                 # we don't care about the value 13 here, because we gonna
                 # fish it from the extra slot on frame anyway
                 op.getdescr().make_a_counter_per_value(op, 13)
@@ -985,11 +986,11 @@ class LLGraphCPU(model.AbstractCPU):
             count = self.vector_ext.vec_size() // descr.get_item_size_in_bytes()
             assert _count == count
             assert count > 0
-            adr = support.addr_add_bytes(struct, (offset * scale + disp))
-            a = support.cast_arg(lltype.Ptr(descr.A), adr)
-            array = a._obj
+            array, start = self._vec_array(struct, offset * scale + disp,
+                                           descr)
             for i in range(count):
-                val = support.cast_result(descr.A.OF, array.getitem(i))
+                val = support.cast_result(descr.A.OF,
+                                          array.getitem(start + i))
                 values.append(val)
             return values
         return load
@@ -999,11 +1000,21 @@ class LLGraphCPU(model.AbstractCPU):
     del build_load
 
     def bh_vec_store(self, struct, offset, newvalues, scale, disp, descr, count):
-        adr = support.addr_add_bytes(struct, offset * scale + disp)
-        a = support.cast_arg(lltype.Ptr(descr.A), adr)
-        array = a._obj
+        array, start = self._vec_array(struct, offset * scale + disp, descr)
         for i,n in enumerate(newvalues):
-            array.setitem(i, support.cast_arg(descr.A.OF, n))
+            array.setitem(start + i, support.cast_arg(descr.A.OF, n))
+
+    def _vec_array(self, struct, byte_offset, descr):
+        if isinstance(struct, lltype._ptr):
+            # a gc array, e.g. the items of a list: the offset is a
+            # multiple of the item size
+            a = support.cast_arg(lltype.Ptr(descr.A), struct)
+            itemsize = descr.get_item_size_in_bytes()
+            assert byte_offset % itemsize == 0
+            return a._obj, byte_offset // itemsize
+        adr = support.addr_add_bytes(struct, byte_offset)
+        a = support.cast_arg(lltype.Ptr(descr.A), adr)
+        return a._obj, 0
 
     def store_fail_descr(self, deadframe, descr):
         pass # I *think*
@@ -1248,10 +1259,11 @@ class LLFrame(object):
             llmemory.cast_int_to_adr(klass),
             rclass.CLASSTYPE)
         if value.typeptr != expected_class:
-            self.fail_guard(descr)
+            self.fail_guard(descr, extra_value=arg)
 
     def execute_guard_nonnull_class(self, descr, arg, klass):
-        self.execute_guard_nonnull(descr, arg)
+        if not arg:
+            self.fail_guard(descr, extra_value=arg)
         self.execute_guard_class(descr, arg, klass)
 
     def execute_guard_gc_type(self, descr, arg, typeid):
@@ -15,7 +15,7 @@ from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib.rjitlog import rjitlog as jl
 
 DEBUG_COUNTER = lltype.Struct('DEBUG_COUNTER',
-    # 'b'ridge, 'l'abel or # 'e'ntry point
+    # 'b'ridge, 'l'abel, # 'e'ntry point or 'g'uard failures of a loop
     ('i', lltype.Signed),      # first field, at offset 0
     ('type', lltype.Char),
     ('number', lltype.Signed)
@@ -388,7 +388,7 @@ class BaseAssembler(object):
                                track_allocation=False)
         struct.i = 0
         struct.type = tp
-        if tp == 'b' or tp == 'e':
+        if tp == 'b' or tp == 'e' or tp == 'g':
             struct.number = number
         else:
             assert token
@@ -416,6 +416,8 @@ class BaseAssembler(object):
                         num = str(r_uint(num))
                     if struct.type == 'b':
                         prefix = 'bridge %s' % num
+                    elif struct.type == 'g':
+                        prefix = 'guard failures %s' % num
                     else:
                         prefix = 'entry %s' % num
                 debug_print(prefix + ':' + str(struct.i))
@@ -428,6 +430,8 @@ class BaseAssembler(object):
         length = len(self.loop_run_counters)
         for i in range(length):
             struct = self.loop_run_counters[i]
+            if struct.type == 'g':
+                continue    # not part of the jitlog format
             # only log if it has been executed
             if struct.i > 0:
                 jl._log_jit_counter(struct)
@@ -8,6 +8,7 @@ from rpython.rtyper.annlowlevel import llhelper, MixLevelHelperAnnotator
 from rpython.rtyper.annlowlevel import hlstr, hlunicode
 from rpython.rtyper.llannotation import lltype_to_annotation
 from rpython.rlib.objectmodel import we_are_translated, specialize, compute_hash
+from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.rmmap import enter_assembler_writing, leave_assembler_writing
 from rpython.jit.metainterp import history, compile
 from rpython.jit.metainterp.optimize import SpeculativeError
@@ -262,11 +263,15 @@ class AbstractLLCPU(AbstractCPU):
         if blocks is not None:
             compiled_loop_token.asmmemmgr_blocks = None
             for rawstart, rawstop in blocks:
+                self.tracker.total_freed_code_bytes += rawstop - rawstart
                 self.gc_ll_descr.freeing_block(rawstart, rawstop)
                 self.asmmemmgr.free(rawstart, rawstop)
                 if self.HAS_CODEMAP:
                     self.codemap.free_asm_block(rawstart, rawstop)
 
+    def get_code_size_in_use(self):
+        return intmask(self.asmmemmgr.get_stats()[1])
+
     def force(self, addr_of_force_token):
         frame = rffi.cast(jitframe.JITFRAMEPTR, addr_of_force_token)
         frame = frame.resolve()
@@ -10,6 +10,8 @@ class CPUTotalTracker(object):
     total_compiled_bridges = 0
     total_freed_loops = 0
     total_freed_bridges = 0
+    total_evicted_loops = 0
+    total_freed_code_bytes = 0
 
 class AbstractCPU(object):
     supports_floats = False
@@ -162,6 +164,12 @@ class AbstractCPU(object):
         """
         pass
 
+    def get_code_size_in_use(self):
+        """Returns the number of bytes of machine code and raw data
+        currently allocated for the compiled loops and bridges, or 0 if
+        the backend does not know."""
+        return 0
+
     def sizeof(self, S):
         raise NotImplementedError
 
@@ -292,6 +300,9 @@ class AbstractCPU(object):
 class CompiledLoopToken(object):
     asmmemmgr_blocks = None
     asmmemmgr_gcreftracers = None
+    # with set_debug(True), the address of the counter of guard failures
+    # of the loop and its bridges, if the backend maintains it
+    guard_failure_counter = 0
 
     def __init__(self, cpu, number):
         cpu.tracker.total_compiled_loops += 1
@@ -313,6 +324,14 @@ class CompiledLoopToken(object):
         debug_print("allocating Bridge #", self.bridges_count, "of Loop #", self.number)
         debug_stop("jit-mem-looptoken-alloc")
 
+    def get_code_size(self):
+        """The number of bytes allocated for this loop and its bridges."""
+        size = 0
+        if self.asmmemmgr_blocks is not None:
+            for rawstart, rawstop in self.asmmemmgr_blocks:
+                size += rawstop - rawstart
+        return size
+
     def update_frame_info(self, oldlooptoken, baseofs):
         new_fi = self.frame_info
         new_loop_tokens = []
@@ -4474,10 +4474,15 @@ class LLtypeBackendTest(BaseBackendTest):
         mem0 = self.cpu.asmmemmgr.total_mallocs
         looptoken = self.test_compile_bridge()
         mem1 = self.cpu.asmmemmgr.total_mallocs
+        assert self.cpu.get_code_size_in_use() == mem1
+        size = looptoken.compiled_loop_token.get_code_size()
+        assert size == mem1 - mem0
+        freed0 = self.cpu.tracker.total_freed_code_bytes
         self.cpu.free_loop_and_bridges(looptoken.compiled_loop_token)
         mem2 = self.cpu.asmmemmgr.total_mallocs
         assert mem2 < mem1
         assert mem2 == mem0
+        assert self.cpu.tracker.total_freed_code_bytes == freed0 + size
 
     def test_memoryerror(self):
         excdescr = BasicFailDescr(666)
@@ -4768,6 +4773,33 @@ class LLtypeBackendTest(BaseBackendTest):
         fail = self.cpu.get_latest_descr(deadframe)
         assert fail.identifier == 99
 
+    def test_guard_class_counter_per_value(self):
+        class ValueFailDescr(BasicFailDescr):
+            index = -1
+            def make_a_counter_per_value(self, op, index):
+                self.index = index
+        t_box, T_box, _ = self.alloc_instance(self.T)
+        u_box, U_box, _ = self.alloc_instance(self.U)
+        null_box = self.null_instance()
+        for opnum, box in [(rop.GUARD_CLASS, u_box),
+                           (rop.GUARD_NONNULL_CLASS, u_box),
+                           (rop.GUARD_NONNULL_CLASS, null_box)]:
+            faildescr = ValueFailDescr(1)
+            operations = [
+                ResOperation(opnum, [t_box, T_box], descr=faildescr),
+                ResOperation(rop.FINISH, [], descr=BasicFinalDescr(2))]
+            operations[0].setfailargs([])
+            looptoken = JitCellToken()
+            self.cpu.compile_loop([t_box], operations, looptoken)
+            if faildescr.index == -1:
+                py.test.skip("guard_class has no counter per class")
+            deadframe = self.cpu.execute_token(looptoken,
+                                               box.getref_base())
+            assert self.cpu.get_latest_descr(deadframe) is faildescr
+            value = self.cpu.get_value_direct(deadframe, 'r',
+                                              faildescr.index)
+            assert value == box.getref_base()
+
     def test_raw_load_int(self):
         from rpython.rlib import rawstorage
         from rpython.rlib.rarithmetic import r_longlong
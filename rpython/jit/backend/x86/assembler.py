@@ -530,6 +530,9 @@ class Assembler386(BaseAssembler, VectorAssemblerMixin):
             number = looptoken.number
             operations = self._inject_debugging_code(looptoken, operations,
                                                      'e', number)
+        if self._debug:
+            counter = self._register_counter('g', looptoken.number, None)
+            clt.guard_failure_counter = rffi.cast(lltype.Signed, counter)
 
         regalloc = RegAlloc(self, self.cpu.translate_support_code)
         #
@@ -2002,6 +2005,9 @@ class Assembler386(BaseAssembler, VectorAssemblerMixin):
         self._update_at_exit(guardtok.fail_locs, guardtok.failargs,
                              guardtok.faildescr, regalloc)
         #
+        counter = self.current_clt.guard_failure_counter
+        if counter:
+            self.mc.INC(heap(counter))
         faildescrindex, target = self.store_info_on_descr(startpos, guardtok)
         if IS_X86_64:
             self.mc.PUSH_p(0)     # %rip-relative
@@ -348,6 +348,45 @@ rex_w  = encode_rex, 0, REX_W, None       # a REX.W prefix
 rex_nw = encode_rex_opt, 0, 0, None       # an optional REX prefix
 rex_fw = encode_rex, 0, 0, None           # a forced REX prefix
 
+# ____________________________________________________________
+# The VEX prefix of AVX instructions.  It replaces the legacy prefix, the
+# REX prefix and the 0F escape bytes, and it encodes one more source
+# register ('vvvv').  vex_vvvv() must come just before vex(): it passes the
+# register in the orbyte.
+
+VEX_PP = {'': 0, '\x66': 1, '\xF3': 2, '\xF2': 3}
+VEX_MAP = {'\x0F': 1, '\x0F\x38': 2, '\x0F\x3A': 3}
+
+def encode_vex_vvvv(mc, reg, _, orbyte):
+    assert orbyte == 0
+    if mc.WORD == 4:
+        assert 0 <= reg < 8
+    return (~reg & 15) << 3     # stored inverted
+
+def vex_vvvv(argnum):
+    return encode_vex_vvvv, argnum, None, None
+
+@specialize.arg(2)
+def encode_vex(mc, rexbyte, fields, orbyte):
+    # 'fields' packs the opcode map, W, L and pp, see vex()
+    opmap = fields >> 8
+    last = orbyte | (fields & 0x7F)
+    if rexbyte & (REX_X | REX_B) == 0 and fields & 0x80 == 0 and opmap == 1:
+        # two-byte form
+        if rexbyte & REX_R == 0:
+            last |= 0x80
+        mc.writechar('\xC5')
+        mc.writechar(chr(last))
+    else:
+        mc.writechar('\xC4')
+        mc.writechar(chr(((~rexbyte & 7) << 5) | opmap))
+        mc.writechar(chr((fields & 0x80) | last))
+    return 0
+
+def vex(prefix, escape, w=0, l=0):
+    fields = (VEX_MAP[escape] << 8) | (w << 7) | (l << 2) | VEX_PP[prefix]
+    return encode_vex, 0, fields, None
+
 # ____________________________________________________________
 
 def insn(*encoding):
@@ -1008,6 +1047,32 @@ define_modrm_modes('DIVPS_x*', [        rex_nw, '\x0F\x5E', register(1, 8)], reg
 define_modrm_modes('DIVPD_x*', ['\x66', rex_nw, '\x0F\x5E', register(1, 8)], regtype='XMM')
 define_modrm_modes('DIVPS_x*', [        rex_nw, '\x0F\x5E', register(1, 8)], regtype='XMM')
 
+# AVX: the three-operand forms 'dst = src1 op src2', with a VEX prefix
+def define_vex_insn(insnname, prefix, insn_char):
+    methname = insnname + '_xxx'
+    insn_func = xmminsn(vex_vvvv(2), vex(prefix, '\x0F'), insn_char,
+                        register(1, 8), register(3), '\xC0')
+    assert not hasattr(AbstractX86CodeBuilder, methname)
+    setattr(AbstractX86CodeBuilder, methname, insn_func)
+
+define_vex_insn('VADDPD', '\x66', '\x58')
+define_vex_insn('VADDPS', '',      '\x58')
+define_vex_insn('VSUBPD', '\x66', '\x5C')
+define_vex_insn('VSUBPS', '',      '\x5C')
+define_vex_insn('VMULPD', '\x66', '\x59')
+define_vex_insn('VMULPS', '',      '\x59')
+define_vex_insn('VDIVPD', '\x66', '\x5E')
+define_vex_insn('VDIVPS', '',      '\x5E')
+
+define_vex_insn('VPADDQ', '\x66', '\xD4')
+define_vex_insn('VPADDD', '\x66', '\xFE')
+define_vex_insn('VPADDW', '\x66', '\xFD')
+define_vex_insn('VPADDB', '\x66', '\xFC')
+define_vex_insn('VPSUBQ', '\x66', '\xFB')
+define_vex_insn('VPSUBD', '\x66', '\xFA')
+define_vex_insn('VPSUBW', '\x66', '\xF9')
+define_vex_insn('VPSUBB', '\x66', '\xF8')
+
 def define_pxmm_insn(insnname_template, insn_char):
     def add_insn(char, *post):
         methname = insnname_template.replace('*', char)
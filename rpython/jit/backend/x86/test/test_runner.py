@@ -599,10 +599,48 @@ class TestDebuggingAssembler(object):
             assert struct.i == 1
             struct = self.cpu.assembler.get_loop_run_counters(2)
             assert struct.i == 9
+            struct = self.cpu.assembler.get_loop_run_counters(3)
+            assert struct.type == 'g'
+            assert struct.i == 1
             self.cpu.finish_once()
         finally:
             debug._log = None
         l0 = ('debug_print', 'entry -1:1')
         l1 = ('debug_print', preambletoken.repr_of_descr() + ':1')
         l2 = ('debug_print', targettoken.repr_of_descr() + ':9')
-        assert ('jit-backend-counts', [l0, l1, l2]) in dlog
+        l3 = ('debug_print', 'guard failures -1:1')
+        assert ('jit-backend-counts', [l0, l1, l2, l3]) in dlog
+
+    def test_guard_failure_counter(self):
+        faildescr1 = BasicFailDescr(1)
+        faildescr2 = BasicFailDescr(2)
+        loop = parse('''
+        [i0]
+        i1 = int_lt(i0, 10)
+        guard_true(i1, descr=faildescr1) [i0]
+        finish(i0)
+        ''', namespace={'faildescr1': faildescr1})
+        bridge = parse('''
+        [i0]
+        i1 = int_lt(i0, 20)
+        guard_true(i1, descr=faildescr2) [i0]
+        finish(i0)
+        ''', namespace={'faildescr2': faildescr2})
+        self.cpu.assembler.set_debug(True)
+        looptoken = JitCellToken()
+        looptoken.number = 42
+        self.cpu.compile_loop(loop.inputargs, loop.operations, looptoken)
+        for i in [5, 15, 25]:
+            self.cpu.execute_token(looptoken, i)
+        self.cpu.compile_bridge(faildescr1, bridge.inputargs,
+                                bridge.operations, looptoken)
+        for i in [5, 15, 25, 35]:
+            self.cpu.execute_token(looptoken, i)
+        # failures of the guard of the loop before the bridge was attached,
+        # and failures of the guard of the bridge
+        runs = self.cpu.get_all_loop_runs()
+        counts = {}
+        for i in range(len(runs)):
+            counts[runs[i].type, runs[i].number] = runs[i].counter
+        assert counts[('e', 42)] == 7
+        assert counts[('g', 42)] == 2 + 2
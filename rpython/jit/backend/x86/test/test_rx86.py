@@ -243,3 +243,12 @@ def test_multibyte_nops():
         assert len(cls.MULTIBYTE_NOPs) == 16
         for i in range(16):
             assert len(cls.MULTIBYTE_NOPs[i]) == i
+
+def test_vex_64():
+    s = CodeBuilder64()
+    s.VADDPD_xxx(xmm1, xmm2, xmm3)        # two-byte VEX prefix
+    s.VADDPD_xxx(xmm9, xmm10, xmm3)       # VEX.R and VEX.vvvv
+    s.VSUBPS_xxx(xmm1, xmm2, xmm11)       # VEX.B needs three bytes
+    assert s.getvalue() == ('\xC5\xE9\x58\xCB' +
+                            '\xC5\x29\x58\xCB' +
+                            '\xC4\xC1\x68\x5C\xCB')
@@ -7,8 +7,10 @@ from rpython.jit.backend.x86.vector_ext import TempVector
 from rpython.jit.backend.x86.test import test_basic
 from rpython.jit.backend.x86.test.test_assembler import \
         (TestRegallocPushPop as BaseTestAssembler)
+from rpython.jit.backend.x86 import detect_feature, rx86
 from rpython.jit.metainterp.test import test_zvector
-from rpython.rtyper.lltypesystem import lltype
+from rpython.rlib.jit import JitDriver
+from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.jit.backend.detect_cpu import getcpuclass
 
 class TestBasic(test_basic.Jit386Mixin, test_zvector.VectorizeTests):
@@ -29,8 +31,126 @@ class TestBasic(test_basic.Jit386Mixin, test_zvector.VectorizeTests):
     def test_list_vectorize(self):
         pass # needs support_guard_gc_type, disable for now
 
+    def test_user_loop_float_list(self):
+        pass # needs support_guard_gc_type, disable for now
+
+    def record_vex_insns(self, monkeypatch):
+        emitted = []
+        def recording(name, insn):
+            def record(mc, *args):
+                emitted.append(name)
+                return insn(mc, *args)
+            return record
+        cls = rx86.AbstractX86CodeBuilder
+        for name in dir(cls):
+            if name.startswith('V') and name.endswith('_xxx'):
+                monkeypatch.setattr(cls, name,
+                                    recording(name, getattr(cls, name)))
+        return emitted
+
+    @py.test.mark.parametrize('use_avx', [True, False])
+    @py.test.mark.parametrize('type', [rffi.DOUBLE, lltype.Signed])
+    def test_vec_arith_left_operand_alive(self, use_avx, type, monkeypatch):
+        if use_avx and not detect_feature.detect_avx():
+            py.test.skip("this cpu has no AVX")
+        monkeypatch.setattr(detect_feature, 'detect_avx', lambda: use_avx)
+        emitted = self.record_vex_insns(monkeypatch)
+        myjitdriver = JitDriver(greens = [], reds = 'auto', vectorize=True)
+        T = lltype.Array(type, hints={'nolength': True})
+        kind = 'float' if type is rffi.DOUBLE else 'int'
+        def f(n):
+            va = lltype.malloc(T, n, flavor='raw')
+            vb = lltype.malloc(T, n, flavor='raw')
+            vc = lltype.malloc(T, n, flavor='raw')
+            vd = lltype.malloc(T, n, flavor='raw')
+            for i in range(n):
+                va[i] = rffi.cast(type, 3 * i + 1)
+                vb[i] = rffi.cast(type, i)
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point()
+                a = va[i]
+                b = vb[i]
+                # the left operand of each subtraction is needed again
+                c = a - b
+                d = b - a
+                vc[i] = c + a
+                vd[i] = d + b
+                i += 1
+            total = 0
+            for i in range(n):
+                total += int(vc[i]) * 1000 + int(vd[i])
+            lltype.free(va, flavor='raw')
+            lltype.free(vb, flavor='raw')
+            lltype.free(vc, flavor='raw')
+            lltype.free(vd, flavor='raw')
+            return total
+        res = self.meta_interp(f, [60], vec=True)
+        assert res == f(60)
+        assert 'vec_%s_sub' % kind in self._vector_ops()
+        assert bool(emitted) == use_avx
+
     enable_opts = 'intbounds:rewrite:virtualize:string:earlyforce:pure:heap:unroll'
 
+class FakeCPUID(object):
+    OSXSAVE_AVX = (1<<27) | (1<<28)
+
+    def __init__(self, ecx_1=OSXSAVE_AVX, ebx_7=0, max_leaf=7, xcr0=0x06):
+        self.ecx_1 = ecx_1
+        self.ebx_7 = ebx_7
+        self.max_leaf = max_leaf
+        self.xcr0 = xcr0
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(detect_feature, 'cpu_id', self.cpu_id)
+        monkeypatch.setattr(detect_feature, 'xgetbv', self.xgetbv)
+
+    def cpu_id(self, eax=1, ret_edx=True, ret_ecx=False, ret_ebx=False,
+               ecx=0):
+        if eax == 0 and not (ret_edx or ret_ecx or ret_ebx):
+            return self.max_leaf
+        if eax == 1 and ret_ecx:
+            return self.ecx_1
+        if eax == 7 and ecx == 0 and ret_ebx:
+            assert self.max_leaf >= 7
+            return self.ebx_7
+        raise AssertionError("unexpected cpu_id(eax=%d)" % eax)
+
+    def xgetbv(self):
+        # XGETBV faults if the OS did not set OSXSAVE
+        assert self.ecx_1 & (1<<27)
+        return self.xcr0
+
+def test_detect_avx(monkeypatch):
+    FakeCPUID().install(monkeypatch)
+    assert detect_feature.detect_avx()
+    assert not detect_feature.detect_avx2()
+    assert not detect_feature.detect_avx512f()
+
+def test_detect_avx_not_enabled_by_os(monkeypatch):
+    FakeCPUID(ecx_1=1<<28).install(monkeypatch)
+    assert not detect_feature.detect_avx()
+    FakeCPUID(xcr0=0x02).install(monkeypatch)
+    assert not detect_feature.detect_avx()
+    assert not detect_feature.detect_avx2()
+
+def test_detect_avx2(monkeypatch):
+    FakeCPUID(ebx_7=1<<5).install(monkeypatch)
+    assert detect_feature.detect_avx2()
+    FakeCPUID(ebx_7=1<<5, max_leaf=6).install(monkeypatch)
+    assert not detect_feature.detect_avx2()
+    FakeCPUID(ecx_1=1<<28, ebx_7=1<<5).install(monkeypatch)
+    assert not detect_feature.detect_avx2()
+
+def test_detect_avx512f(monkeypatch):
+    FakeCPUID(ebx_7=1<<16, xcr0=0xE6).install(monkeypatch)
+    assert detect_feature.detect_avx512f()
+    # the OS does not save the opmask and ZMM registers
+    FakeCPUID(ebx_7=1<<16, xcr0=0x06).install(monkeypatch)
+    assert not detect_feature.detect_avx512f()
+    FakeCPUID(ebx_7=1<<5, xcr0=0xE6).install(monkeypatch)
+    assert not detect_feature.detect_avx512f()
+
 @py.test.fixture
 def regalloc(request):
     from rpython.jit.backend.x86.regalloc import X86FrameManager
@@ -51,10 +51,14 @@ class TempInt(TempVar):
 class X86VectorExt(VectorExt):
 
     should_align_unroll = True
+    # use the three-operand AVX forms of some instructions, see
+    # consider_vec_arith()
+    use_avx = False
 
     def setup_once(self, asm):
         if detect_feature.detect_sse4_1():
             self.enable(16, accum=True)
+            self.use_avx = detect_feature.detect_avx()
             asm.setup_once_vector()
         self._setup = True
 
@@ -249,7 +253,18 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_add(self, op, arglocs, resloc):
         loc0, loc1, size_loc = arglocs
         size = size_loc.value
-        if size == 1:
+        if resloc is not loc0:
+            # the three-operand form, see consider_vec_arith()
+            args = (resloc.value, loc0.value, loc1.value)
+            if size == 1:
+                self.mc.VPADDB_xxx(*args)
+            elif size == 2:
+                self.mc.VPADDW_xxx(*args)
+            elif size == 4:
+                self.mc.VPADDD_xxx(*args)
+            elif size == 8:
+                self.mc.VPADDQ_xxx(*args)
+        elif size == 1:
             self.mc.PADDB(loc0, loc1)
         elif size == 2:
             self.mc.PADDW(loc0, loc1)
@@ -261,7 +276,18 @@ class VectorAssemblerMixin(object):
     def genop_vec_int_sub(self, op, arglocs, resloc):
         loc0, loc1, size_loc = arglocs
         size = size_loc.value
-        if size == 1:
+        if resloc is not loc0:
+            # the three-operand form, see consider_vec_arith()
+            args = (resloc.value, loc0.value, loc1.value)
+            if size == 1:
+                self.mc.VPSUBB_xxx(*args)
+            elif size == 2:
+                self.mc.VPSUBW_xxx(*args)
+            elif size == 4:
+                self.mc.VPSUBD_xxx(*args)
+            elif size == 8:
+                self.mc.VPSUBQ_xxx(*args)
+        elif size == 1:
             self.mc.PSUBB(loc0, loc1)
         elif size == 2:
             self.mc.PSUBW(loc0, loc1)
@@ -285,27 +311,25 @@ class VectorAssemblerMixin(object):
     def genop_vec_float_{type}(self, op, arglocs, resloc):
         loc0, loc1, itemsize_loc = arglocs
         itemsize = itemsize_loc.value
-        if itemsize == 4:
+        if resloc is not loc0:
+            # the three-operand form, see consider_vec_arith()
+            if itemsize == 4:
+                self.mc.V{p_op_s}_xxx(resloc.value, loc0.value, loc1.value)
+            elif itemsize == 8:
+                self.mc.V{p_op_d}_xxx(resloc.value, loc0.value, loc1.value)
+        elif itemsize == 4:
             self.mc.{p_op_s}(loc0, loc1)
         elif itemsize == 8:
             self.mc.{p_op_d}(loc0, loc1)
     """
-    for op in ['add','mul','sub']:
-        OP = op.upper()
+    for op, OP in [('add', 'ADD'), ('mul', 'MUL'), ('sub', 'SUB'),
+                   ('truediv', 'DIV')]:
         _source = genop_vec_float_arith.format(type=op,
                                                p_op_s=OP+'PS',
                                                p_op_d=OP+'PD')
         exec(py.code.Source(_source).compile())
     del genop_vec_float_arith
 
-    def genop_vec_float_truediv(self, op, arglocs, resloc):
-        loc0, loc1, sizeloc = arglocs
-        size = sizeloc.value
-        if size == 4:
-            self.mc.DIVPS(loc0, loc1)
-        elif size == 8:
-            self.mc.DIVPD(loc0, loc1)
-
     def genop_vec_float_abs(self, op, arglocs, resloc):
         src, sizeloc = arglocs
         size = sizeloc.value
@@ -626,7 +650,16 @@ class VectorRegallocMixin(object):
         size = op.bytesize
         args = op.getarglist()
         loc1 = self.make_sure_var_in_reg(op.getarg(1), args)
-        loc0 = self.xrm.force_result_in_reg(op, op.getarg(0), args)
+        if (self.assembler.cpu.vector_ext.use_avx and
+                op.getopnum() != rop.VEC_INT_MUL and
+                self.xrm.stays_alive(lhs)):
+            # with AVX, 'lhs' does not need to be copied first if it is
+            # still needed after this operation
+            loc0 = self.make_sure_var_in_reg(lhs, args)
+            resloc = self.xrm.force_allocate_reg(op, args)
+            self.perform(op, [loc0, loc1, imm(size)], resloc)
+            return
+        loc0 = self.xrm.force_result_in_reg(op, lhs, args)
         self.perform(op, [loc0, loc1, imm(size)], loc0)
 
     consider_vec_int_add = consider_vec_arith
@@ -676,8 +676,8 @@ class AbstractResumeGuardDescr(ResumeDescr):
     status = r_uint(0)
 
     ST_BUSY_FLAG    = 0x01     # if set, busy tracing from the guard
-    ST_TYPE_MASK    = 0x06     # mask for the type (TY_xxx)
-    ST_SHIFT        = 3        # in "status >> ST_SHIFT" is stored:
+    ST_TYPE_MASK    = 0x0E     # mask for the type (TY_xxx)
+    ST_SHIFT        = 4        # in "status >> ST_SHIFT" is stored:
                                # - if TY_NONE, the jitcounter hash directly
                                # - otherwise, the guard_value failarg index
     ST_SHIFT_MASK   = -(1 << ST_SHIFT)
@@ -685,6 +685,15 @@ class AbstractResumeGuardDescr(ResumeDescr):
     TY_INT          = 0x02
     TY_REF          = 0x04
     TY_FLOAT        = 0x06
+    TY_CLASS        = 0x08     # guard_class: a counter per class seen
+    # if TY_CLASS, "status >> ST_SHIFT" stores in its low 8 bits the
+    # failarg index, then in 4 bits the number of classes seen, then in 16
+    # bits a bitmap of the hashes of the classes seen (see see_class())
+    CL_INDEX_MASK   = 0xFF
+    CL_COUNT_SHIFT  = ST_SHIFT + 8
+    CL_COUNT_MASK   = 0xF << CL_COUNT_SHIFT
+    CL_SEEN_SHIFT   = CL_COUNT_SHIFT + 4
+    CL_MAX_CLASSES  = 8
 
     def get_resumestorage(self):
         raise NotImplementedError("abstract base class")
@@ -741,11 +750,13 @@ class AbstractResumeGuardDescr(ResumeDescr):
         elif self.status & self.ST_BUSY_FLAG:
             return False
         #
-        else:    # we have a GUARD_VALUE that fails.
+        else:    # we have a GUARD_VALUE or a GUARD_CLASS that fails.
             from rpython.rlib.objectmodel import current_object_addr_as_int
 
             index = intmask(self.status >> self.ST_SHIFT)
             typetag = intmask(self.status & self.ST_TYPE_MASK)
+            if typetag == self.TY_CLASS:
+                index &= self.CL_INDEX_MASK
 
             # fetch the actual value of the guard_value, possibly turning
             # it to an integer
@@ -760,6 +771,17 @@ class AbstractResumeGuardDescr(ResumeDescr):
                 floatval = metainterp_sd.cpu.get_value_direct(deadframe, 'f',
                                                               index)
                 intval = longlong.gethash_fast(floatval)
+            elif typetag == self.TY_CLASS:
+                # profile the classes seen by a failing guard_class: a
+                # bridge is only traced for a class that is common on its
+                # own, instead of for whichever class fails after many
+                # failures of rare classes.
+                refval = metainterp_sd.cpu.get_value_direct(deadframe, 'r',
+                                                            index)
+                if refval:
+                    intval = metainterp_sd.cpu.bh_classof(refval)
+                else:
+                    intval = 0     # guard_nonnull_class with a NULL
             else:
                 assert 0, typetag
 
@@ -767,6 +789,8 @@ class AbstractResumeGuardDescr(ResumeDescr):
                 if isinstance(intval, llmemory.AddressAsInt):
                     intval = llmemory.cast_adr_to_int(
                         llmemory.cast_int_to_adr(intval), "forced")
+            if typetag == self.TY_CLASS:
+                intval = self.see_class(intval)
 
             hash = r_uint(current_object_addr_as_int(self) * 777767777 +
                           intval * 1442968193)
@@ -774,6 +798,22 @@ class AbstractResumeGuardDescr(ResumeDescr):
         increment = jitdriver_sd.warmstate.increment_trace_eagerness
         return jitcounter.tick(hash, increment)
 
+    def see_class(self, intval):
+        """Record the class 'intval' seen by a failing guard_class.
+        Returns 'intval', or 0 once about CL_MAX_CLASSES different classes
+        were seen: at a megamorphic site, the rare classes would never
+        get a bridge, and always fail into the blackhole interpreter, so
+        they all tick a single counter again, like for other guards."""
+        count = intmask((self.status & self.CL_COUNT_MASK) >>
+                        self.CL_COUNT_SHIFT)
+        if count >= self.CL_MAX_CLASSES:
+            return 0
+        h = ((r_uint(intval) * r_uint(1442968193)) >> 16) & 15
+        bit = r_uint(1) << (self.CL_SEEN_SHIFT + intmask(h))
+        if not (self.status & bit):
+            self.status += bit + (r_uint(1) << self.CL_COUNT_SHIFT)
+        return intval
+
     def start_compiling(self):
         # start tracing and compiling from this guard.
         self.status |= self.ST_BUSY_FLAG
@@ -795,14 +835,27 @@ class AbstractResumeGuardDescr(ResumeDescr):
             self._debug_subinputargs = new_loop.inputargs
             self._debug_suboperations = new_loop.operations
         propagate_original_jitcell_token(new_loop)
+        original_jitcell_token = new_loop.original_jitcell_token
         send_bridge_to_backend(metainterp.jitdriver_sd, metainterp.staticdata,
                                self, inputargs, new_loop.operations,
-                               new_loop.original_jitcell_token,
+                               original_jitcell_token,
                                metainterp.box_names_memo)
         record_loop_or_bridge(metainterp.staticdata, new_loop)
+        warmrunnerdesc = metainterp.staticdata.warmrunnerdesc
+        if warmrunnerdesc is not None:    # for tests
+            memmgr = warmrunnerdesc.memory_manager
+            if memmgr.bridge_attached(original_jitcell_token):
+                metainterp.jitdriver_sd.warmstate.retrace_with_bridges(
+                    original_jitcell_token)
 
     def make_a_counter_per_value(self, guard_value_op, index):
-        assert guard_value_op.getopnum() == rop.GUARD_VALUE
+        opnum = guard_value_op.getopnum()
+        if (opnum == rop.GUARD_CLASS or
+                opnum == rop.GUARD_NONNULL_CLASS):
+            assert 0 <= index <= self.CL_INDEX_MASK
+            self.status = self.TY_CLASS | (r_uint(index) << self.ST_SHIFT)
+            return
+        assert opnum == rop.GUARD_VALUE
         box = guard_value_op.getarg(0)
         if box.type == history.INT:
             ty = self.TY_INT
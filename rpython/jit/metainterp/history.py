@@ -435,6 +435,8 @@ class JitCellToken(AbstractDescr):
     retraced_count = 0
     invalidated = False
     outermost_jitdriver_sd = None
+    jitcell = None         # the JitCell it is attached to, if any
+    bridges_attached = 0   # counted only with 'bridge_compaction'
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
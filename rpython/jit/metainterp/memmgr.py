@@ -2,6 +2,7 @@ import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.listsort import make_timsort_class
 
 #
 # Logic to decide which loops are old and not used any more.
@@ -19,10 +20,32 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# With the 'bridge_compaction' parameter, a loop to which that many
+# bridges were attached is traced again from the interpreter (see
+# WarmEnterState.retrace_with_bridges()).  The old loop is then no longer
+# entered from the interpreter, and it gets old and is freed like the
+# others, unless other loops still jump to it.
+#
+# With the 'max_code_size' parameter, whenever the backend uses more
+# memory than that for machine code, the loops that were least recently
+# entered (i.e. with the smallest 'generation') are removed from
+# 'alive_loops' until the code that is left fits in 3/4 of the limit.
+# The loops entered since the previous generation are always kept.  A
+# removed loop that other loops still jump to stays alive, so the limit
+# is only a goal.  As this costs a sort and a full collection, it is only
+# done again after the code has grown by a quarter of the limit since
+# the previous time: if the loops could not be freed, the code size stays
+# above the limit, and we must not do it again after every compilation.
+#
+
+LoopTokenSort = make_timsort_class(
+    lt=lambda looptoken1, looptoken2:
+        looptoken1.generation < looptoken2.generation)
 
 class MemoryManager(object):
 
-    def __init__(self):
+    def __init__(self, cpu=None):
+        self.cpu = cpu
         self.check_frequency = -1
         # NB. use of r_int64 to be extremely far on the safe side:
         # this is increasing by one after each loop or bridge is
@@ -38,6 +61,9 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.bridge_compaction = 0
+        self.max_code_size = 0
+        self.evict_above = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -54,12 +80,25 @@ class MemoryManager(object):
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_code_size > 0:
+            size = self.cpu.get_code_size_in_use()
+            if size > self.max_code_size and size > self.evict_above:
+                self._evict_loops_now(size)
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
             self.alive_loops[looptoken] = None
 
+    def bridge_attached(self, looptoken):
+        """A bridge was attached to the loop 'looptoken'.  Returns True
+        if the loop should now be traced again, so that the paths of its
+        hot bridges become part of the new loop."""
+        if self.bridge_compaction <= 0:
+            return False
+        looptoken.bridges_attached += 1
+        return looptoken.bridges_attached == self.bridge_compaction
+
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
         oldtotal = len(self.alive_loops)
@@ -82,6 +121,36 @@ class MemoryManager(object):
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
 
+    def _evict_loops_now(self, size):
+        debug_start("jit-mem-evict")
+        goal = self.max_code_size - self.max_code_size // 4
+        debug_print("Code size before:  ", size)
+        looptokens = self.alive_loops.keys()
+        LoopTokenSort(looptokens).sort()
+        max_generation = self.current_generation - 1
+        evicted = 0
+        for looptoken in looptokens:
+            if size <= goal or looptoken.generation >= max_generation:
+                break
+            del self.alive_loops[looptoken]
+            if looptoken.compiled_loop_token is not None:
+                size -= looptoken.compiled_loop_token.get_code_size()
+            evicted += 1
+        self.cpu.tracker.total_evicted_loops += evicted
+        debug_print("Loop tokens evicted:", evicted)
+        debug_print("Loop tokens left:  ", len(self.alive_loops))
+        if evicted:
+            looptoken = None
+            looptokens = None
+            from rpython.rlib import rgc
+            rgc.collect()
+            if not we_are_translated():
+                rgc.collect(); rgc.collect()
+        size = self.cpu.get_code_size_in_use()
+        self.evict_above = size + self.max_code_size // 4
+        debug_print("Code size after:   ", size)
+        debug_stop("jit-mem-evict")
+
     def release_all_loops(self):
         debug_start("jit-mem-releaseall")
         debug_print("Loop tokens cleared:", len(self.alive_loops))
@@ -465,6 +465,15 @@ class BoxArrayIter(object):
 BoxArrayIter.BOXARRAYITER0 = BoxArrayIter(0, ['\x00', '\x00'])
 
 
+def _same_boxes(boxes1, boxes2):
+    if len(boxes1) != len(boxes2):
+        return False
+    for i in range(len(boxes1)):
+        if boxes1[i] is not boxes2[i]:
+            return False
+    return True
+
+
 class Trace(BaseTrace):
     _deadranges = (-1, None)
 
@@ -487,6 +496,8 @@ class Trace(BaseTrace):
         self._snapshot_data = []
         self._snapshot_array_data = []
         self.append_snapshot_array_data_int(0) # all 0-length arrays get index 0
+        self._last_vable_boxes = None   # see _list_of_boxes_virtualizable()
+        self._last_vable_array = 0
         if not we_are_translated() and isinstance(max_num_inputargs, list): # old api for tests
             self.inputargs = max_num_inputargs
             for i, box in enumerate(max_num_inputargs):
@@ -568,6 +579,7 @@ class Trace(BaseTrace):
         return self._pos, self._count, self._index, len(self._snapshot_data), len(self._snapshot_array_data)
 
     def cut_at(self, end):
+        self._last_vable_boxes = None     # the positions will be reused
         self._pos = end[0]
         self._count = end[1]
         index = end[2]
@@ -718,11 +730,19 @@ class Trace(BaseTrace):
     def _list_of_boxes_virtualizable(self, boxes):
         if not boxes:
             return self.new_array(0)
+        # the guards that follow each other, e.g. all the guards of one
+        # bytecode, often see the same virtualizable boxes: they share
+        # the array then, instead of encoding it again
+        if (self._last_vable_boxes is not None and
+                _same_boxes(self._last_vable_boxes, boxes)):
+            return self._last_vable_array
         boxes_list_storage = self.new_array(len(boxes))
         # the virtualizable is at the end, move it to the front in the snapshot
         self._add_box_to_storage(boxes_list_storage, boxes[-1])
         for i in range(len(boxes) - 1):
             self._add_box_to_storage(boxes_list_storage, boxes[i])
+        self._last_vable_boxes = boxes[:]
+        self._last_vable_array = boxes_list_storage
         return boxes_list_storage
 
     def new_array(self, lgt):
@@ -6,7 +6,7 @@ from rpython.jit.metainterp.optimizeopt.test.test_dependency import DependencyBa
 from rpython.jit.metainterp.optimizeopt.vector import (VectorizingOptimizer,
         MemoryRef, isomorphic, Pair, NotAVectorizeableLoop,
         NotAProfitableLoop, GuardStrengthenOpt, CostModel, GenericCostModel,
-        PackSet, optimize_vector)
+        PackSet, optimize_vector, user_loop_bail_fast_path)
 from rpython.jit.metainterp.optimizeopt.schedule import (Scheduler,
         SchedulerState, VecScheduleState, Pack)
 from rpython.jit.metainterp.optimizeopt.optimizer import BasicLoopInfo
@@ -1368,3 +1368,81 @@ class TestVectorize(VecTestHelper):
         for op in trace.operations:
             assert op not in dups
             dups.add(op)
+
+    def test_user_loop_bail_fast_path(self):
+        warmstate = FakeWarmState()
+        # an elementwise loop over the storage of a float list
+        trace = self.parse_loop("""
+        [p0, p1, p2, i0, i1]
+        f0 = getarrayitem_gc_f(p0, i0, descr=floatarraydescr)
+        f1 = getarrayitem_gc_f(p1, i0, descr=floatarraydescr)
+        f2 = float_mul(f0, f1)
+        setarrayitem_gc(p2, i0, f2, descr=floatarraydescr)
+        i2 = int_add(i0, 1)
+        i3 = int_lt(i2, i1)
+        guard_true(i3) [p0, p1, p2, i2, i1]
+        jump(p0, p1, p2, i2, i1)
+        """)
+        assert not user_loop_bail_fast_path(trace, warmstate)
+        # no array access at all
+        trace = self.parse_loop("""
+        [i0, i1, i5]
+        i2 = int_add(i0, 1)
+        i3 = int_lt(i2, i1)
+        guard_true(i3) [i2, i1]
+        jump(i2, i1, i5)
+        """)
+        assert user_loop_bail_fast_path(trace, warmstate)
+        # calls cannot be vectorized
+        trace = self.parse_loop("""
+        [p0, i0, i1]
+        f0 = getarrayitem_gc_f(p0, i0, descr=floatarraydescr)
+        f1 = call_f(0, f0)
+        i2 = int_add(i0, 1)
+        i3 = int_lt(i2, i1)
+        guard_true(i3) [p0, i2, i1]
+        jump(p0, i2, i1)
+        """)
+        assert user_loop_bail_fast_path(trace, warmstate)
+        # more guards than operations to vectorize
+        trace = self.parse_loop("""
+        [p0, i0, i1]
+        i4 = getarrayitem_gc_i(p0, i0, descr=arraydescr)
+        i5 = int_is_true(i4)
+        guard_true(i5) [p0, i0, i1]
+        i6 = int_lt(i4, 100)
+        guard_true(i6) [p0, i0, i1]
+        i7 = int_gt(i4, 10)
+        guard_true(i7) [p0, i0, i1]
+        i8 = int_ne(i4, 20)
+        guard_true(i8) [p0, i0, i1]
+        i9 = int_lt(i0, i1)
+        guard_true(i9) [p0, i0, i1]
+        jump(p0, i0, i1)
+        """)
+        assert user_loop_bail_fast_path(trace, warmstate)
+
+    def test_user_code_needs_savings(self):
+        costmodel = GenericCostModel(self.cpu, 0)
+        assert costmodel.profitable()
+        # user code is only vectorized with a threshold of at least 1
+        costmodel = GenericCostModel(self.cpu, 1)
+        assert not costmodel.profitable()
+        costmodel.savings = 1
+        assert costmodel.profitable()
+        trace = self.parse_loop("""
+        [p0, p1, p2, i0, i1]
+        f0 = raw_load_f(p0, i0, descr=floatarraydescr)
+        f1 = raw_load_f(p1, i0, descr=floatarraydescr)
+        f2 = float_mul(f0, f1)
+        raw_store(p2, i0, f2, descr=floatarraydescr)
+        i2 = int_add(i0, 8)
+        i3 = int_lt(i2, i1)
+        guard_true(i3) [p0, p1, p2, i2, i1]
+        jump(p0, p1, p2, i2, i1)
+        """)
+        info = FakeLoopInfo(trace)
+        info.snapshot(trace)
+        opt = self.vectoroptimizer(trace)
+        opt.run_optimization(self.metainterp_sd, info, trace, None, True)
+        assert opt.unroll_count > 0
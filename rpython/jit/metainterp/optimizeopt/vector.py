@@ -175,12 +175,15 @@ def optimize_vector(trace, metainterp_sd, jitdriver_sd, warmstate,
 def user_loop_bail_fast_path(loop, warmstate):
     """ In a fast path over the trace loop: try to prevent vecopt
         of spending time on a loop that will most probably fail.
+        With vec_all, this runs on every loop of user code (e.g. loops
+        over float/int lists or array.array), thus it must quickly reject
+        the common loops that have nothing to gain.
     """
 
     resop_count = 0 # the count of operations minus debug_merge_points
     vector_instr = 0
     guard_count = 0
-    at_least_one_array_access = True
+    at_least_one_array_access = False
     for i,op in enumerate(loop.operations):
         if rop.is_jit_debug(op.opnum):
             continue
@@ -202,6 +205,14 @@ def user_loop_bail_fast_path(loop, warmstate):
     if not at_least_one_array_access:
         return True
 
+    if vector_instr == 0:
+        return True
+
+    # each guard that cannot be strengthened must unpack its fail
+    # arguments, loops that mostly check things are not worth it
+    if guard_count > vector_instr:
+        return True
+
     return False
 
 class VectorizingOptimizer(Optimizer):
@@ -251,7 +262,11 @@ class VectorizingOptimizer(Optimizer):
         self.find_adjacent_memory_refs(graph)
         self.extend_packset()
         self.combine_packset()
-        costmodel = GenericCostModel(self.cpu, self.cost_threshold)
+        threshold = self.cost_threshold
+        if user_code:
+            # only vectorize user code if there is a real saving
+            threshold = max(1, threshold)
+        costmodel = GenericCostModel(self.cpu, threshold)
         state = VecScheduleState(graph, self.packset, self.cpu, costmodel)
         self.schedule(state)
         if not state.profitable():
@@ -630,7 +645,7 @@ class CostModel(object):
         raise NotImplementedError
 
     def profitable(self):
-        return self.savings >= 0
+        return self.savings >= self.threshold
 
 class GenericCostModel(CostModel):
     def record_pack_savings(self, pack, times):
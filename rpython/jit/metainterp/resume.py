@@ -150,9 +150,13 @@ class ResumeDataLoopMemo(object):
         self.cached_boxes = {}
         self.cached_virtuals = {}
 
+        self.numberings = resumecode.new_numbering_dict()
+
         self.nvirtuals = 0
         self.nvholes = 0
         self.nvreused = 0
+        self.nresumebytes = 0
+        self.nresumeshared = 0
 
     def getconst(self, const):
         if const.type == INT:
@@ -283,10 +287,25 @@ class ResumeDataLoopMemo(object):
         self.cached_boxes.clear()
         self.cached_virtuals.clear()
 
+    def share_numbering(self, numb):
+        # the resume code of many guards is identical, e.g. for the
+        # guards that follow each other after a call; give them all the
+        # same numbering.  It is never modified after it is created.
+        shared = self.numberings.get(numb, resumecode.NULL_NUMBER)
+        if shared:
+            self.nresumeshared += len(numb.code)
+            return shared
+        self.numberings[numb] = numb
+        self.nresumebytes += len(numb.code)
+        return numb
+
     def update_counters(self, profiler):
         profiler.count(jitprof.Counters.NVIRTUALS, self.nvirtuals)
         profiler.count(jitprof.Counters.NVHOLES, self.nvholes)
         profiler.count(jitprof.Counters.NVREUSED, self.nvreused)
+        profiler.count(jitprof.Counters.RESUME_BYTES, self.nresumebytes)
+        profiler.count(jitprof.Counters.RESUME_BYTES_SHARED,
+                       self.nresumeshared)
 
 _frame_info_placeholder = (None, 0, 0)
 
@@ -437,7 +456,8 @@ class ResumeDataVirtualAdder(VirtualVisitor):
         numb_state.patch(1, len(liveboxes))
 
         self._add_optimizer_sections(numb_state, liveboxes, liveboxes_from_env)
-        storage.rd_numb = numb_state.create_numbering()
+        storage.rd_numb = self.memo.share_numbering(
+            numb_state.create_numbering())
         storage.rd_consts = self.memo.consts
         return liveboxes[:]
 
@@ -20,10 +20,14 @@
 
   # ----- optimization section
   <more code>                                      further sections according to bridgeopt.py
+
+Guards of the same trace whose resume code ends up being identical share
+a single NUMBERING (see ResumeDataLoopMemo.share_numbering()).
 """
 
 from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib import objectmodel
+from rpython.rlib.rarithmetic import intmask
 
 NUMBERINGP = lltype.Ptr(lltype.GcForwardReference())
 NUMBERING = lltype.GcStruct('Numbering',
@@ -31,23 +35,37 @@ NUMBERING = lltype.GcStruct('Numbering',
 NUMBERINGP.TO.become(NUMBERING)
 NULL_NUMBER = lltype.nullptr(NUMBERING)
 
-def append_numbering(lst, item):
+def _encoded_item(item):
     item = rffi.cast(lltype.Signed, item)
     item *= 2
     if item < 0:
         item = -1 - item
-
     assert item >= 0
+    return item
+
+def _encoded_size(item):
     if item < 2**7:
-        lst.append(rffi.cast(rffi.UCHAR, item))
+        return 1
     elif item < 2**14:
-        lst.append(rffi.cast(rffi.UCHAR, item | 0x80))
-        lst.append(rffi.cast(rffi.UCHAR, item >> 7))
+        return 2
     else:
         assert item < 2**16
-        lst.append(rffi.cast(rffi.UCHAR, item | 0x80))
-        lst.append(rffi.cast(rffi.UCHAR, (item >> 7) | 0x80))
-        lst.append(rffi.cast(rffi.UCHAR, item >> 14))
+        return 3
+
+def _write_item(code, index, item):
+    if item < 2**7:
+        code[index] = rffi.cast(rffi.UCHAR, item)
+        return index + 1
+    elif item < 2**14:
+        code[index] = rffi.cast(rffi.UCHAR, item | 0x80)
+        code[index + 1] = rffi.cast(rffi.UCHAR, item >> 7)
+        return index + 2
+    else:
+        code[index] = rffi.cast(rffi.UCHAR, item | 0x80)
+        code[index + 1] = rffi.cast(rffi.UCHAR, (item >> 7) | 0x80)
+        code[index + 2] = rffi.cast(rffi.UCHAR, item >> 14)
+        return index + 3
+_write_item._always_inline_ = True
 
 
 def numb_next_item(numb, index):
@@ -93,12 +111,14 @@ class Writer(object):
         return self.append_short(short)
 
     def create_numbering(self):
-        final = objectmodel.newlist_hint(len(self.current) * 3)
+        size = 0
+        for item in self.current:
+            size += _encoded_size(_encoded_item(item))
+        numb = lltype.malloc(NUMBERING, size)
+        index = 0
         for item in self.current:
-            append_numbering(final, item)
-        numb = lltype.malloc(NUMBERING, len(final))
-        for i, elt in enumerate(final):
-            numb.code[i] = elt
+            index = _write_item(numb.code, index, _encoded_item(item))
+        assert index == size
         return numb
 
     def patch_current_size(self, index):
@@ -114,6 +134,26 @@ def create_numbering(l):
     return w.create_numbering()
 
 
+def numb_eq(numb1, numb2):
+    if len(numb1.code) != len(numb2.code):
+        return False
+    for i in range(len(numb1.code)):
+        if (rffi.cast(lltype.Signed, numb1.code[i]) !=
+                rffi.cast(lltype.Signed, numb2.code[i])):
+            return False
+    return True
+
+def numb_hash(numb):
+    x = len(numb.code)
+    for i in range(len(numb.code)):
+        x = intmask((x * 1000003) ^ rffi.cast(lltype.Signed, numb.code[i]))
+    return x
+
+def new_numbering_dict():
+    """A dict whose keys are numberings, compared by their content."""
+    return objectmodel.r_dict(numb_eq, numb_hash)
+
+
 class Reader(object):
     def __init__(self, code):
         self.code = code
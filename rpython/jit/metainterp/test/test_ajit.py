@@ -5052,3 +5052,46 @@ class TestLLtype(BaseLLtypeTests, LLJitMixin):
         res2 = self.interp_operations(f, [6])
         assert res1 == res2
         self.check_operations_history(guard_class=1, record_exact_class=0)
+
+    def _run_rare_classes(self, count):
+        myjitdriver = JitDriver(greens = [], reds = ['x', 'a', 'objs'])
+        class Base:
+            def f(self):
+                return 1
+        classes = []
+        for i in range(count):
+            class Sub(Base):
+                def f(self, i=i):
+                    return i
+            classes.append(Sub)
+        def f(x):
+            set_param(myjitdriver, 'trace_eagerness', 5)
+            objs = [Base()] + [cls() for cls in classes]
+            a = 0
+            while x > 0:
+                myjitdriver.can_enter_jit(x=x, a=a, objs=objs)
+                myjitdriver.jit_merge_point(x=x, a=a, objs=objs)
+                if x % 3 == 0:
+                    o = objs[1 + (x // 3) % count]
+                else:
+                    o = objs[0]
+                a += o.f()
+                x -= 1
+            return a
+        x = 3 * 3 * count     # every rare class fails about 3 times
+        res = self.meta_interp(f, [x])
+        assert res == f(x)
+
+    def test_guard_class_few_rare_classes(self):
+        self._run_rare_classes(6)
+        # the failures of the guard_class are counted per class: none
+        # of the rare classes gets its own bridge (without that, there
+        # is a bridge after every 5 failures)
+        self.check_trace_count(2)
+
+    def test_guard_class_many_rare_classes(self):
+        self._run_rare_classes(50)
+        # after about 8 different classes, the failures are counted per
+        # guard again, so that a megamorphic site gets bridges instead
+        # of going through the blackhole interpreter forever
+        assert get_stats().compiled_count > 2
@@ -16,11 +16,29 @@ from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.rlib.jit import JitDriver, dont_look_inside
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.jit.metainterp.warmstate import BaseJitCell
+from rpython.jit.backend.model import CPUTotalTracker
 from rpython.rlib import rgc
 
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    bridges_attached = 0
+    compiled_loop_token = None
+
+class FakeCompiledLoopToken:
+    def __init__(self, size):
+        self.size = size
+    def get_code_size(self):
+        return self.size
+
+class FakeCPU:
+    # the code of a loop is freed as soon as it leaves 'alive_loops'
+    def __init__(self):
+        self.tracker = CPUTotalTracker()
+        self.memmgr = None
+    def get_code_size_in_use(self):
+        return sum([looptoken.compiled_loop_token.get_code_size()
+                    for looptoken in self.memmgr.alive_loops])
 
 
 class _TestMemoryManager:
@@ -78,6 +96,72 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_bridge_attached(self):
+        memmgr = MemoryManager()
+        token = FakeLoopToken()
+        for i in range(5):
+            assert not memmgr.bridge_attached(token)
+        memmgr.bridge_compaction = 3
+        token = FakeLoopToken()
+        assert [memmgr.bridge_attached(token) for i in range(5)] == [
+            False, False, True, False, False]
+
+    def test_max_code_size(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        cpu.memmgr = memmgr
+        memmgr.max_code_size = 1000
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            token.compiled_loop_token = FakeCompiledLoopToken(150)
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.keep_loop_alive(tokens[0])     # entered all the time
+            memmgr.next_generation()
+            assert cpu.get_code_size_in_use() <= 1000
+        # 7 loops are too much: the 2 least recently entered ones are
+        # evicted after the 7th loop, and again after the 9th one
+        assert memmgr.alive_loops == dict.fromkeys(
+            [tokens[0]] + tokens[5:])
+        assert cpu.tracker.total_evicted_loops == 4
+
+    def test_max_code_size_keeps_recent_loops(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        cpu.memmgr = memmgr
+        memmgr.max_code_size = 100
+        tokens = [FakeLoopToken() for i in range(3)]
+        for token in tokens:
+            token.compiled_loop_token = FakeCompiledLoopToken(150)
+            memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        assert cpu.tracker.total_evicted_loops == 0
+
+    def test_max_code_size_loops_still_referenced(self):
+        cpu = FakeCPU()
+        memmgr = MemoryManager(cpu)
+        cpu.memmgr = memmgr
+        # the evicted loops are all still jumped to, so none is freed
+        tokens = []
+        cpu.get_code_size_in_use = lambda: len(tokens) * 100
+        evictions = []
+        evict_loops_now = memmgr._evict_loops_now
+        def _evict_loops_now(size):
+            evictions.append(size)
+            evict_loops_now(size)
+        memmgr._evict_loops_now = _evict_loops_now
+        memmgr.max_code_size = 1000
+        for i in range(30):
+            token = FakeLoopToken()
+            token.compiled_loop_token = FakeCompiledLoopToken(100)
+            tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+        # the code stays above the limit, but we try again only every
+        # time it has grown by a quarter of the limit
+        assert evictions == [1100, 1400, 1700, 2000, 2300, 2600, 2900]
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
@@ -251,6 +335,38 @@ class _TestIntegration(LLJitMixin):
         # Loop with number 1, h(), has not been freed
         assert 1 in [t.number for t in tokens if t]
 
+    def test_bridge_compaction(self):
+        myjitdriver = JitDriver(greens=[], reds=['n', 'flag', 'a'])
+        def g(flag):
+            n = 20
+            a = 0
+            while n > 0:
+                myjitdriver.can_enter_jit(n=n, flag=flag, a=a)
+                myjitdriver.jit_merge_point(n=n, flag=flag, a=a)
+                if flag:
+                    a += 2
+                else:
+                    a += 1
+                n -= 1
+            return a
+        def f():
+            # the loop is traced with flag == 0, and gets a bridge for
+            # flag == 1.  With bridge_compaction=1, the loop is then
+            # traced again, following flag == 1; but only once.
+            total = 0
+            for flag in [0, 1, 0, 1]:
+                for i in range(8):
+                    total += g(flag)
+            return total
+
+        res = self.meta_interp(f, [], bridge_compaction=0)
+        assert res == f()
+        self.check_jitcell_token_count(1)
+
+        res = self.meta_interp(f, [], bridge_compaction=1)
+        assert res == f()
+        self.check_jitcell_token_count(2)
+
 # ____________________________________________________________
 
 def test_all():
@@ -186,6 +186,26 @@ class TestOpencoder(object):
         assert l[1].virtualizables == [l[0], i1, i2]
         assert l[1].vref_boxes == [l[0], i1]
 
+    def test_virtualizable_shared(self):
+        i0, i1, i2 = IntFrontendOp(0, 0), IntFrontendOp(1, 0), IntFrontendOp(2, 0)
+        t = Trace([i0, i1, i2], metainterp_sd)
+        p0 = FakeOp(t.record_op(rop.NEW_WITH_VTABLE, [], descr=SomeDescr()))
+        vable_boxes = [i1, i2, p0]
+        t.record_op(rop.GUARD_TRUE, [i0])
+        t.capture_resumedata([], vable_boxes, [])
+        size = len(t._snapshot_array_data)
+        t.record_op(rop.GUARD_TRUE, [i1])
+        t.capture_resumedata([], vable_boxes, [])
+        assert len(t._snapshot_array_data) == size
+        vable_boxes[0] = i0
+        t.record_op(rop.GUARD_TRUE, [i2])
+        t.capture_resumedata([], vable_boxes, [])
+        assert len(t._snapshot_array_data) > size
+        (i0, i1, i2), l, iter = self.unpack(t)
+        assert l[1].virtualizables == [l[0], i1, i2]
+        assert l[2].virtualizables == [l[0], i1, i2]
+        assert l[3].virtualizables == [l[0], i0, i2]
+
     def test_liveranges(self):
         i0, i1, i2 = IntFrontendOp(0, 0), IntFrontendOp(1, 0), IntFrontendOp(2, 0)
         t = Trace([i0, i1, i2], metainterp_sd)
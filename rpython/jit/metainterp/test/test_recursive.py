@@ -504,6 +504,53 @@ class RecursiveTests:
         res = self.meta_interp(main, [1], enable_opts='', trace_limit=TRACE_LIMIT)
         self.check_resops(call=0, call_may_force=0)
 
+    def test_small_function_threshold(self):
+        def is_small_function(pc, code):
+            return len(hlstr(code)) < 5
+        myjitdriver = JitDriver(greens=['pc', 'code'], reds=['n'],
+                                is_small_function=is_small_function)
+
+        def interpret(code, n):
+            pc = 0
+            while pc < len(code):
+                myjitdriver.jit_merge_point(n=n, code=code, pc=pc)
+                if code[pc] == "+":
+                    n += 1
+                else:
+                    n -= 1
+                pc += 1
+            return n
+
+        def main(small, count, small_function_threshold):
+            # only trace from the start of functions
+            set_param(None, 'threshold', 100000)
+            set_param(None, 'function_threshold', 1000)
+            set_param(None, 'small_function_threshold',
+                      small_function_threshold)
+            if small:
+                code = "++"
+            else:
+                code = "+++-++"
+            n = 0
+            for i in range(count):
+                n = interpret(code, n)
+            return n
+
+        # no function is traced before 1000 calls, except the small ones
+        res = self.meta_interp(main, [1, 20, 5])
+        assert res == 40
+        self.check_trace_count(1)
+        res = self.meta_interp(main, [0, 20, 5])
+        assert res == 80
+        self.check_trace_count(0)
+        res = self.meta_interp(main, [1, 20, 0])
+        assert res == 40
+        self.check_trace_count(0)
+        # a small_function_threshold higher than function_threshold is unused
+        res = self.meta_interp(main, [1, 20, 2000])
+        assert res == 40
+        self.check_trace_count(0)
+
     def test_trace_from_start(self):
         def p(pc, code):
             code = hlstr(code)
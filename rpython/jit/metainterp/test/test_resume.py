@@ -867,6 +867,24 @@ def test_virtual_adder_memo_const_sharing():
     assert len(memo.consts) == 3
     assert storage2.rd_consts is memo.consts
 
+def test_virtual_adder_memo_numbering_sharing():
+    metainterp_sd = FakeMetaInterpStaticData()
+    memo = ResumeDataLoopMemo(metainterp_sd)
+    storages = []
+    for consts in [(1, 2, 3), (1, 2, 3), (1, 2, 4)]:
+        storage, t = make_storage(*[ConstInt(c) for c in consts])
+        i = t.get_iter()
+        modifier = ResumeDataVirtualAdder(FakeOptimizer(i), storage, storage,
+                                          i, memo)
+        modifier.finish()
+        storages.append(storage)
+    assert storages[1].rd_numb == storages[0].rd_numb
+    assert storages[2].rd_numb != storages[0].rd_numb
+    numb1 = storages[0].rd_numb
+    numb2 = storages[2].rd_numb
+    assert memo.nresumebytes == len(numb1.code) + len(numb2.code)
+    assert memo.nresumeshared == len(numb1.code)
+
 
 class ResumeDataFakeReader(ResumeDataBoxReader):
     """Another subclass of AbstractResumeDataReader meant for tests."""
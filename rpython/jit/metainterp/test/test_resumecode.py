@@ -1,5 +1,5 @@
 from rpython.jit.metainterp.resumecode import create_numbering,\
-    unpack_numbering, Reader, Writer
+    unpack_numbering, Reader, Writer, new_numbering_dict
 from rpython.rtyper.lltypesystem import lltype
 
 from hypothesis import strategies, given, example
@@ -60,3 +60,20 @@ def test_patch(l):
         n = w.create_numbering()
         assert unpack_numbering(n)[1:] == l
         assert unpack_numbering(n)[0] == middle + 1
+
+def test_numbering_dict():
+    d = new_numbering_dict()
+    for l in examples:
+        d[create_numbering(l)] = l
+    for l in examples:
+        assert d[create_numbering(l)] == l
+    assert create_numbering([1, 2, 3, 5]) not in d
+
+def test_numbering_dict_rtyped():
+    from rpython.rtyper.test.test_llinterp import interpret
+    def f(n):
+        d = new_numbering_dict()
+        d[create_numbering([1, 2, n])] = 5
+        return d.get(create_numbering([1, 2, 3]), 0)
+    assert interpret(f, [3]) == 5
+    assert interpret(f, [4]) == 0
@@ -121,6 +121,7 @@ def test_make_jitdriver_callbacks_1():
         _get_unique_id_ptr = None
         _can_never_inline_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _is_small_function_ptr = None
         red_args_types = []
     class FakeCell:
         dont_trace_here = False
@@ -147,6 +148,7 @@ def test_make_jitdriver_callbacks_3():
         _can_never_inline_ptr = None
         _get_unique_id_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _is_small_function_ptr = None
         red_args_types = []
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
     state.make_jitdriver_callbacks()
@@ -169,6 +171,7 @@ def test_make_jitdriver_callbacks_4():
         _can_never_inline_ptr = None
         _get_unique_id_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _is_small_function_ptr = None
         red_args_types = []
 
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
@@ -191,9 +194,32 @@ def test_make_jitdriver_callbacks_5():
         _get_unique_id_ptr = None
         _can_never_inline_ptr = llhelper(CAN_NEVER_INLINE, can_never_inline)
         _should_unroll_one_iteration_ptr = None
+        _is_small_function_ptr = None
         red_args_types = []
 
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
     state.make_jitdriver_callbacks()
     res = state.can_never_inline(5, 42.5)
     assert res is True
+
+def test_make_jitdriver_callbacks_6():
+    def is_small_function(x, y):
+        assert y == 42.5
+        return x < 10
+    IS_SMALL_FUNCTION = lltype.Ptr(lltype.FuncType(
+        [lltype.Signed, lltype.Float], lltype.Bool))
+    class FakeJitDriverSD:
+        jitdriver = None
+        _green_args_spec = [lltype.Signed, lltype.Float]
+        _get_printable_location_ptr = None
+        _confirm_enter_jit_ptr = None
+        _get_unique_id_ptr = None
+        _can_never_inline_ptr = None
+        _should_unroll_one_iteration_ptr = None
+        _is_small_function_ptr = llhelper(IS_SMALL_FUNCTION, is_small_function)
+        red_args_types = []
+
+    state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
+    state.make_jitdriver_callbacks()
+    assert state.is_small_function(5, 42.5) is True
+    assert state.is_small_function(15, 42.5) is False
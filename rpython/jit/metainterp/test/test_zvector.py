@@ -436,6 +436,57 @@ class VectorizeTests(object):
         res = self.meta_interp(f, [60], vec=True, vec_all=True)
         assert res == f(60) == 34.5
 
+    def _vector_ops(self):
+        return [op.getopname() for loop in get_stats().get_all_loops()
+                               for op in loop.operations
+                               if op.getopname().startswith('vec_')]
+
+    def test_user_loop_float_list(self):
+        # no vectorize=True: like a loop over lists of floats in PyPy, it
+        # is only vectorized because of vec_all
+        myjitdriver = JitDriver(greens = [], reds = 'auto')
+        def f(n):
+            la = [i * 0.5 for i in range(n)]
+            lb = [i * 1.25 for i in range(n)]
+            lc = [0.0] * n
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point()
+                lc[i] = la[i] + lb[i]
+                i += 1
+            total = 0.0
+            for x in lc:
+                total += x
+            return total
+        res = self.meta_interp(f, [60], vec=True, vec_all=True)
+        assert res == f(60) == sum([i * 1.75 for i in range(60)])
+        assert 'vec_float_add' in self._vector_ops()
+
+    def test_user_loop_raw_int_array(self):
+        # like a loop over array.array('l'): raw memory without a length
+        myjitdriver = JitDriver(greens = [], reds = 'auto')
+        T = lltype.Array(lltype.Signed, hints={'nolength': True})
+        def f(n):
+            va = lltype.malloc(T, n, flavor='raw')
+            vb = lltype.malloc(T, n, flavor='raw')
+            for i in range(n):
+                va[i] = i
+                vb[i] = 3 * i
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point()
+                va[i] = va[i] + vb[i]
+                i += 1
+            total = 0
+            for i in range(n):
+                total += va[i]
+            lltype.free(va, flavor='raw')
+            lltype.free(vb, flavor='raw')
+            return total
+        res = self.meta_interp(f, [60], vec=True, vec_all=True)
+        assert res == f(60) == 4 * sum(range(60))
+        assert 'vec_int_add' in self._vector_ops()
+
     @py.test.mark.parametrize('type,value', [(rffi.DOUBLE, 58.4547),
         (lltype.Signed, 2300000), (rffi.INT, 4321),
         (rffi.SHORT, 9922), (rffi.SIGNEDCHAR, -127)])
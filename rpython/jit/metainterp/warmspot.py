@@ -94,7 +94,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
                     disable_unrolling=sys.maxint,
                     enable_opts=ALL_OPTS_NAMES, max_retrace_guards=15,
                     max_unroll_recursion=7, vec=0, vec_all=0, vec_cost=0,
-                    **kwds):
+                    bridge_compaction=0, small_function_threshold=0, **kwds):
     from rpython.config.config import ConfigError
     translator = interp.typer.annotator.translator
     try:
@@ -109,6 +109,8 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
     for jd in warmrunnerdesc.jitdrivers_sd:
         jd.warmstate.set_param_threshold(3)          # for tests
         jd.warmstate.set_param_function_threshold(function_threshold)
+        jd.warmstate.set_param_small_function_threshold(
+            small_function_threshold)
         jd.warmstate.set_param_trace_eagerness(2)    # for tests
         jd.warmstate.set_param_trace_limit(trace_limit)
         jd.warmstate.set_param_inlining(inline)
@@ -117,6 +119,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_max_retrace_guards(max_retrace_guards)
         jd.warmstate.set_param_enable_opts(enable_opts)
         jd.warmstate.set_param_max_unroll_recursion(max_unroll_recursion)
+        jd.warmstate.set_param_bridge_compaction(bridge_compaction)
         jd.warmstate.set_param_disable_unrolling(disable_unrolling)
         jd.warmstate.set_param_vec(vec)
         jd.warmstate.set_param_vec_all(vec_all)
@@ -240,6 +243,7 @@ class WarmRunnerDesc(object):
         self.set_translator(translator)
         self.memory_manager = memmgr.MemoryManager()
         self.build_cpu(CPUClass, **kwds)
+        self.memory_manager.cpu = self.cpu
         self.inline_inlineable_portals()
         self.find_portals()
         self.codewriter = codewriter.CodeWriter(self.cpu, self.jitdrivers_sd)
@@ -601,6 +605,8 @@ class WarmRunnerDesc(object):
             jd._should_unroll_one_iteration_ptr = self._make_hook_graph(jd,
                 annhelper, jd.jitdriver.should_unroll_one_iteration,
                 annmodel.s_Bool)
+            jd._is_small_function_ptr = self._make_hook_graph(jd,
+                annhelper, jd.jitdriver.is_small_function, annmodel.s_Bool)
             #
             items = []
             types = ()
@@ -937,12 +943,20 @@ class WarmRunnerDesc(object):
         state = jd.warmstate
         maybe_compile_and_run = jd._maybe_compile_and_run_fn
         EnterJitAssembler = jd._EnterJitAssembler
+        is_small_function = state.is_small_function
+        num_green_args = jd.num_green_args
 
         def ll_portal_runner(*args):
             try:
-                # maybe enter from the function's start.
-                maybe_compile_and_run(
-                    state.increment_function_threshold, *args)
+                # maybe enter from the function's start.  Functions that
+                # the interpreter finds small are cheap to trace, so they
+                # can use a lower threshold (if the JIT is not off)
+                increment = state.increment_function_threshold
+                if (state.increment_small_function_threshold > increment and
+                        increment != 0.0 and
+                        is_small_function(*args[:num_green_args])):
+                    increment = state.increment_small_function_threshold
+                maybe_compile_and_run(increment, *args)
                 #
                 # then run the normal portal function, i.e. the
                 # interpreter's main loop.  It might enter the jit
@@ -133,6 +133,7 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 JC_FORCE_FINISH    = 0x10
+JC_BRIDGES_MERGED  = 0x20
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -183,6 +184,9 @@ class BaseJitCell(object):
         JC_FORCE_FINISH: when from a cell with that flag set, if the trace
         becomes too long, "segment" it, ie finish it with a guard_always_fails.
         this prevents re-tracing and failing this again and again.
+
+        JC_BRIDGES_MERGED: the loop had too many bridges and was traced
+        again, see retrace_with_bridges().  This is done only once.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -223,6 +227,9 @@ class BaseJitCell(object):
             # don't remove, we need to remember that we should really finish a
             # trace for this
             return False
+        if self.flags & JC_BRIDGES_MERGED:
+            # don't remove while we wait to trace the loop again
+            return self.has_seen_a_procedure_token()
         return True   # Other JitCells can be removed.
 
 # ____________________________________________________________
@@ -256,6 +263,10 @@ class WarmEnterState(object):
     def set_param_function_threshold(self, threshold):
         self.increment_function_threshold = self._compute_threshold(threshold)
 
+    def set_param_small_function_threshold(self, threshold):
+        self.increment_small_function_threshold = (
+            self._compute_threshold(threshold))
+
     def set_param_trace_eagerness(self, value):
         self.increment_trace_eagerness = self._compute_threshold(value)
 
@@ -319,6 +330,19 @@ class WarmEnterState(object):
             if self.warmrunnerdesc.memory_manager:
                 self.warmrunnerdesc.memory_manager.max_unroll_recursion = value
 
+    def set_param_bridge_compaction(self, value):
+        if self.warmrunnerdesc:
+            if self.warmrunnerdesc.memory_manager:
+                self.warmrunnerdesc.memory_manager.bridge_compaction = value
+
+    def set_param_max_code_size(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.warmrunnerdesc:
+            memmgr = self.warmrunnerdesc.memory_manager
+            if memmgr:
+                memmgr.max_code_size = value * 1024 * 1024
+                memmgr.evict_above = 0
+
     def set_param_vec(self, ivalue):
         self.vec = bool(ivalue)
 
@@ -340,6 +364,7 @@ class WarmEnterState(object):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         old_token = cell.get_procedure_token()
         cell.set_procedure_token(procedure_token)
+        procedure_token.jitcell = cell
         if old_token is not None:
             self.cpu.redirect_call_assembler(old_token, procedure_token)
             # procedure_token is also kept alive by any loop that used
@@ -347,6 +372,25 @@ class WarmEnterState(object):
             # is a pointless optimization (it is tiny).
             old_token.record_jump_to(procedure_token)
 
+    def retrace_with_bridges(self, procedure_token):
+        """Called when 'bridge_compaction' bridges were attached to the
+        loop 'procedure_token'.  Forget it, so that the JitCell counts
+        again from the interpreter and traces a new loop, which follows
+        the paths that are hot now.  The old loop is still used by
+        the loops that jump or CALL_ASSEMBLER to it, and is otherwise
+        freed by the memory manager when it gets old."""
+        cell = procedure_token.jitcell
+        if cell is None or cell.flags & JC_BRIDGES_MERGED:
+            return
+        if cell.get_procedure_token() is not procedure_token:
+            return
+        debug_start("jit-bridge-compaction")
+        debug_print("retracing loop", procedure_token.number, "with",
+                    procedure_token.bridges_attached, "bridges")
+        debug_stop("jit-bridge-compaction")
+        cell.wref_procedure_token = None
+        cell.flags |= JC_TEMPORARY | JC_BRIDGES_MERGED
+
     # ----------
 
     def make_entry_point(self):
@@ -803,6 +847,18 @@ class WarmEnterState(object):
                                                       can_never_inline_ptr)
                 return fn(*greenargs)
         self.can_never_inline = can_never_inline
+        #
+        is_small_function_ptr = self.jitdriver_sd._is_small_function_ptr
+        if is_small_function_ptr is None:
+            def is_small_function(*greenargs):
+                return False
+        else:
+            #
+            def is_small_function(*greenargs):
+                fn = support.maybe_on_top_of_llinterp(rtyper,
+                                                      is_small_function_ptr)
+                return fn(*greenargs)
+        self.is_small_function = is_small_function
         get_unique_id_ptr = self.jitdriver_sd._get_unique_id_ptr
         def get_unique_id(greenkey):
             greenargs = unwrap_greenkey(greenkey)
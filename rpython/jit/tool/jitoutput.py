@@ -30,12 +30,16 @@ REGEXES = [
     (('nvirtuals',), '^nvirtuals:\s+(\d+)$'),
     (('nvholes',), '^nvholes:\s+(\d+)$'),
     (('nvreused',), '^nvreused:\s+(\d+)$'),
+    (('resume_bytes',), '^resume bytes:\s+(\d+)$'),
+    (('resume_bytes_shared',), '^resume bytes shared:\s+(\d+)$'),
     (('vecopt_tried',), '^vecopt tried:\s+(\d+)$'),
     (('vecopt_success',), '^vecopt success:\s+(\d+)$'),
     (('total_compiled_loops',),   '^Total # of loops:\s+(\d+)$'),
     (('total_compiled_bridges',), '^Total # of bridges:\s+(\d+)$'),
     (('total_freed_loops',),      '^Freed # of loops:\s+(\d+)$'),
     (('total_freed_bridges',),    '^Freed # of bridges:\s+(\d+)$'),
+    (('total_evicted_loops',),    '^Evicted # of loops:\s+(\d+)$'),
+    (('total_freed_code_bytes',), '^Freed code bytes:\s+(\d+)$'),
     ]
 
 class Ops(object):
@@ -63,6 +67,8 @@ class OutputInfo(object):
     nvirtuals = 0
     nvholes = 0
     nvreused = 0
+    resume_bytes = 0
+    resume_bytes_shared = 0
     vecopt_tried = 0
     vecopt_success = 0
 
@@ -65,12 +65,16 @@ virtualizables forced:  1123
 nvirtuals:              13
 nvholes:                14
 nvreused:               15
+resume bytes:           2000
+resume bytes shared:    300
 vecopt tried:           12
 vecopt success:         4
 Total # of loops:       100
 Total # of bridges:     300
 Freed # of loops:       99
 Freed # of bridges:     299
+Evicted # of loops:     7
+Freed code bytes:       123456
 '''
 
 def test_parse():
@@ -96,5 +100,9 @@ def test_parse():
     assert info.nvirtuals == 13
     assert info.nvholes == 14
     assert info.nvreused == 15
+    assert info.resume_bytes == 2000
+    assert info.resume_bytes_shared == 300
     assert info.vecopt_tried == 12
     assert info.vecopt_success == 4
+    assert info.total_evicted_loops == 7
+    assert info.total_freed_code_bytes == 123456
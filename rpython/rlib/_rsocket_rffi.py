@@ -172,7 +172,7 @@ IP_MULTICAST_LOOP IP_MULTICAST_TTL IP_OPTIONS IP_RECVDSTADDR IP_RECVOPTS
 IP_RECVRETOPTS IP_RETOPTS IP_TOS IP_TTL
 
 MSG_BTAG MSG_ETAG MSG_CTRUNC MSG_DONTROUTE MSG_DONTWAIT MSG_EOR MSG_OOB
-MSG_PEEK MSG_TRUNC MSG_WAITALL MSG_ERRQUEUE
+MSG_PEEK MSG_TRUNC MSG_WAITALL MSG_ERRQUEUE MSG_WAITFORONE
 
 NI_DGRAM NI_MAXHOST NI_MAXSERV NI_NAMEREQD NI_NOFQDN NI_NUMERICHOST
 NI_NUMERICSERV
@@ -982,6 +982,96 @@ if HAVE_SENDMSG:
                          "int free_ptr_to_charp(char** ptrtofree);\n"
                          ]
 
+# batched datagram calls: recvmmsg / sendmmsg
+HAVE_MMSG = HAVE_SENDMSG and sys.platform.startswith('linux')
+if HAVE_MMSG:
+    separate_module_sources += ['''
+        /*
+           Receive up to 'count' datagrams, number i going to the
+           'msgsize' bytes at buf + i * msgsize and its source address to
+           addrbuf + i * addrsize.  Fills 'lengths' and 'addrlens'.
+        */
+        RPY_EXTERN
+        int pypy_recvmmsg(int fd, char *buf, int count, int msgsize,
+                          int flags, char *addrbuf, int addrsize,
+                          int *lengths, int *addrlens)
+        {
+            struct mmsghdr *msgs;
+            struct iovec *iovs;
+            int i, res, saved_errno;
+
+            msgs = (struct mmsghdr *)calloc(count, sizeof(struct mmsghdr));
+            iovs = (struct iovec *)calloc(count, sizeof(struct iovec));
+            if (msgs == NULL || iovs == NULL) {
+                free(msgs);
+                free(iovs);
+                errno = ENOMEM;
+                return -1;
+            }
+            for (i = 0; i < count; i++) {
+                iovs[i].iov_base = buf + (size_t)i * msgsize;
+                iovs[i].iov_len = msgsize;
+                msgs[i].msg_hdr.msg_iov = &iovs[i];
+                msgs[i].msg_hdr.msg_iovlen = 1;
+                if (addrbuf != NULL) {
+                    msgs[i].msg_hdr.msg_name = addrbuf + (size_t)i * addrsize;
+                    msgs[i].msg_hdr.msg_namelen = addrsize;
+                }
+            }
+            res = recvmmsg(fd, msgs, count, flags, NULL);
+            saved_errno = errno;
+            for (i = 0; i < res; i++) {
+                lengths[i] = msgs[i].msg_len;
+                addrlens[i] = msgs[i].msg_hdr.msg_namelen;
+            }
+            free(msgs);
+            free(iovs);
+            errno = saved_errno;
+            return res;
+        }
+
+        /*
+           Send the 'count' datagrams bufs[i] of size lengths[i], all to
+           the same address (or to the connected peer if 'addr' is NULL).
+        */
+        RPY_EXTERN
+        int pypy_sendmmsg(int fd, char **bufs, int *lengths, int count,
+                          int flags, struct sockaddr *addr, socklen_t addrlen)
+        {
+            struct mmsghdr *msgs;
+            struct iovec *iovs;
+            int i, res, saved_errno;
+
+            msgs = (struct mmsghdr *)calloc(count, sizeof(struct mmsghdr));
+            iovs = (struct iovec *)calloc(count, sizeof(struct iovec));
+            if (msgs == NULL || iovs == NULL) {
+                free(msgs);
+                free(iovs);
+                errno = ENOMEM;
+                return -1;
+            }
+            for (i = 0; i < count; i++) {
+                iovs[i].iov_base = bufs[i];
+                iovs[i].iov_len = lengths[i];
+                msgs[i].msg_hdr.msg_iov = &iovs[i];
+                msgs[i].msg_hdr.msg_iovlen = 1;
+                msgs[i].msg_hdr.msg_name = addr;
+                msgs[i].msg_hdr.msg_namelen = addrlen;
+            }
+            res = sendmmsg(fd, msgs, count, flags);
+            saved_errno = errno;
+            free(msgs);
+            free(iovs);
+            errno = saved_errno;
+            return res;
+        }
+    ''',]
+    post_include_bits += ["RPY_EXTERN "
+                          "int pypy_recvmmsg(int fd, char *buf, int count, int msgsize, int flags, char *addrbuf, int addrsize, int *lengths, int *addrlens);\n"
+                          "RPY_EXTERN "
+                          "int pypy_sendmmsg(int fd, char **bufs, int *lengths, int count, int flags, struct sockaddr *addr, socklen_t addrlen);\n"
+                          ]
+
 if _WIN32:
     CConfig.WSAEVENT = platform.SimpleType('WSAEVENT', rffi.VOIDP)
     CConfig.WSANETWORKEVENTS = platform.Struct(
@@ -1353,6 +1443,15 @@ sendmsg = jit.dont_look_inside(rffi.llexternal("sendmsg_implementation",
                                 rffi.SIGNEDP, rffi.SIGNEDP, rffi.CCHARPP, rffi.SIGNEDP, rffi.INT, rffi.INT],
                                rffi.INT, save_err=SAVE_ERR,
                                compilation_info=compilation_info))
+if HAVE_MMSG:
+    recvmmsg = jit.dont_look_inside(rffi.llexternal("pypy_recvmmsg",
+        [rffi.INT, rffi.CCHARP, rffi.INT, rffi.INT, rffi.INT, rffi.CCHARP,
+         rffi.INT, rffi.INT_realP, rffi.INT_realP], rffi.INT,
+        save_err=SAVE_ERR, compilation_info=compilation_info))
+    sendmmsg = jit.dont_look_inside(rffi.llexternal("pypy_sendmmsg",
+        [rffi.INT, rffi.CCHARPP, rffi.INT_realP, rffi.INT, rffi.INT,
+         sockaddr_ptr, socklen_t], rffi.INT,
+        save_err=SAVE_ERR, compilation_info=compilation_info))
 CMSG_SPACE = jit.dont_look_inside(rffi.llexternal("CMSG_SPACE_wrapper",[size_t], size_t, save_err=SAVE_ERR,compilation_info=compilation_info))
 CMSG_LEN = jit.dont_look_inside(rffi.llexternal("CMSG_LEN_wrapper",[size_t], size_t, save_err=SAVE_ERR,compilation_info=compilation_info))
 
@@ -565,6 +565,10 @@ ENABLE_ALL_OPTS = (
 PARAMETER_DOCS = {
     'threshold': 'number of times a loop has to run for it to become hot',
     'function_threshold': 'number of times a function must run for it to become traced from start',
+    'small_function_threshold': 'number of times a function that the '
+                                'interpreter finds small must run for it to '
+                                'become traced from start, if lower than '
+                                'function_threshold (0 = off)',
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
@@ -578,15 +582,22 @@ PARAMETER_DOCS = {
     'enable_opts': 'INTERNAL USE ONLY (MAY NOT WORK OR LEAD TO CRASHES): '
                    'optimizations to enable, or all = %s' % ENABLE_ALL_OPTS,
     'max_unroll_recursion': 'how many levels deep to unroll a recursive function',
+    'bridge_compaction': 'trace a loop again when this many bridges were '
+                         'attached to it, following the paths that are hot '
+                         'now (0 = off)',
+    'max_code_size': 'free the least recently used loops when the machine '
+                     'code takes more than this many MB (0 = no limit)',
     'vec': 'turn on the vectorization optimization (vecopt). ' \
-           'Supports x86 (SSE 4.1), powerpc (SVX), s390x SIMD',
+           'Supports x86 (SSE 4.1, AVX), powerpc (SVX), s390x SIMD',
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
-    'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library, '
+               'e.g. loops over lists of floats or ints and array.array',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'function_threshold': 1619, # slightly more than one above, also prime
+              'small_function_threshold': 0,
               'trace_eagerness': 200,
               'decay': 40,
               'trace_limit': 6000,
@@ -599,6 +610,8 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'disable_unrolling': 200,
               'enable_opts': 'all',
               'max_unroll_recursion': 7,
+              'bridge_compaction': 0,
+              'max_code_size': 0,
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
@@ -626,7 +639,8 @@ class JitDriver(object):
                  get_printable_location=None, confirm_enter_jit=None,
                  can_never_inline=None, should_unroll_one_iteration=None,
                  name='jitdriver', check_untranslated=True, vectorize=False,
-                 get_unique_id=None, is_recursive=False, get_location=None):
+                 get_unique_id=None, is_recursive=False, get_location=None,
+                 is_small_function=None):
         """get_location:
               The return value is designed to provide enough information to express the
               state of an interpreter when invoking jit_merge_point.
@@ -645,6 +659,13 @@ class JitDriver(object):
                      an offset to byte code, or an index to the node in an AST
                 4 -> operation name. a name further describing the current program counter.
                      this can be either a byte code name or the name of an AST node
+
+           is_small_function:
+              Called with the green arguments when entering the portal, if
+              the 'small_function_threshold' parameter is lower than
+              'function_threshold'.  Returning True makes the JIT use the
+              former, i.e. trace this function sooner than the others,
+              because it is cheap to trace.
         """
         if greens is not None:
             self.greens = greens
@@ -688,6 +709,7 @@ class JitDriver(object):
         self.confirm_enter_jit = confirm_enter_jit
         self.can_never_inline = can_never_inline
         self.should_unroll_one_iteration = should_unroll_one_iteration
+        self.is_small_function = is_small_function
         self.check_untranslated = check_untranslated
         self.is_recursive = is_recursive
         self.vec = vectorize
@@ -1435,10 +1457,14 @@ class Counters(object):
     NVIRTUALS
     NVHOLES
     NVREUSED
+    RESUME_BYTES
+    RESUME_BYTES_SHARED
     TOTAL_COMPILED_LOOPS
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
     TOTAL_FREED_BRIDGES
+    TOTAL_EVICTED_LOOPS
+    TOTAL_FREED_CODE_BYTES
     """
 
     counter_names = []
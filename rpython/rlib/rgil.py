@@ -6,6 +6,7 @@ from rpython.translator.tool.cbuild import ExternalCompilationInfo
 from rpython.rtyper.lltypesystem import lltype, llmemory, rffi
 from rpython.rtyper.extregistry import ExtRegistryEntry
 from rpython.rlib.objectmodel import not_rpython, we_are_translated
+from rpython.rtyper.lltypesystem.lloperation import llop
 
 # these functions manipulate directly the GIL, whose definition does not
 # escape the C code itself
@@ -44,6 +45,53 @@ _gil_get_holder = llexternal('RPyGilGetHolder', [], lltype.Signed,
                              _nowrapper=True, sandboxsafe=True,
                              compilation_info=eci)
 
+_gil_set_sticky_threshold = llexternal('RPyGilSetStickyThreshold',
+                                       [lltype.Signed], lltype.Void,
+                                       _nowrapper=True, sandboxsafe=True,
+                                       compilation_info=eci)
+
+_gil_get_sticky_threshold = llexternal('RPyGilGetStickyThreshold',
+                                       [], lltype.Signed,
+                                       _nowrapper=True, sandboxsafe=True,
+                                       compilation_info=eci)
+
+_gil_set_switch_interval = llexternal('RPyGilSetSwitchInterval',
+                                      [lltype.Signed], lltype.Void,
+                                      _nowrapper=True, sandboxsafe=True,
+                                      compilation_info=eci)
+
+_gil_get_switch_interval = llexternal('RPyGilGetSwitchInterval',
+                                      [], lltype.Signed,
+                                      _nowrapper=True, sandboxsafe=True,
+                                      compilation_info=eci)
+
+_gil_set_switch_request = llexternal('RPyGilSetSwitchRequest',
+                                     [rffi.SIGNEDP], lltype.Void,
+                                     _nowrapper=True, sandboxsafe=True,
+                                     compilation_info=eci)
+
+_gil_switch_requested = llexternal('RPyGilSwitchRequested',
+                                   [], lltype.Signed,
+                                   _nowrapper=True, sandboxsafe=True,
+                                   compilation_info=eci)
+
+_gil_set_profiling = llexternal('RPyGilSetProfiling',
+                                [lltype.Signed], lltype.Void,
+                                _nowrapper=True, sandboxsafe=True,
+                                compilation_info=eci)
+
+_gil_get_site_stats = llexternal('RPyGilGetSiteStats',
+                                 [], rffi.SIGNEDP,
+                                 _nowrapper=True, sandboxsafe=True,
+                                 compilation_info=eci)
+
+# the kinds of release sites: the GIL was handed over to a waiting thread
+# after the previous holder released it around an external call, or after
+# it called yield_thread()
+SITE_EXTERNAL_CALL = 0
+SITE_YIELD = 1
+SITE_NAMES = ['external_call', 'yield']
+
 # ____________________________________________________________
 
 
@@ -120,6 +168,7 @@ class EmulatedGilHolder:
         self._tid = self._get_ident()
         self._lock = thread.allocate_lock()
         self._lock.acquire()
+        self._site = SITE_EXTERNAL_CALL
 
     def _get_ident(self):
         from rpython.rlib import rthread
@@ -127,14 +176,37 @@ class EmulatedGilHolder:
         assert tid != 0
         return tid
 
-    def release(self):
+    def _stats(self):
+        return _emulated_thread_stats.setdefault(self._get_ident(),
+                                                 [0, 0, 0, 0])
+
+    def release(self, site=SITE_EXTERNAL_CALL):
+        import time
         assert self._tid == self._get_ident()
+        stats = self._stats()
+        if stats[3]:
+            stats[2] += int((time.time() - stats[3]) * 1000000)
+            stats[3] = 0
+        self._site = site
         self._tid = 0
         self._lock.release()
 
     def acquire(self):
+        import time
         assert self._tid != self._get_ident()
-        self._lock.acquire()
+        if not self._lock.acquire(False):
+            start = time.time()
+            self._lock.acquire()
+            wait_us = int((time.time() - start) * 1000000)
+            stats = self._stats()
+            stats[0] += wait_us
+            stats[1] += 1
+            if _emulated_profiling:
+                site_stats = _emulated_site_stats[self._site]
+                site_stats[0] += 1
+                site_stats[1] += wait_us
+        if _emulated_profiling:
+            self._stats()[3] = time.time()
         assert self._tid == 0
         self._tid = self._get_ident()
 
@@ -208,7 +280,8 @@ def yield_thread():
             rthread.gc_thread_run()
             _after_thread_switch()
     else:
-        release()
+        allocate()
+        _emulated_gil_holder.release(SITE_YIELD)
         acquire()
 yield_thread._gctransformer_hint_close_stack_ = True
 yield_thread._dont_reach_me_in_del_ = True
@@ -225,6 +298,151 @@ def gil_get_holder():
         allocate()
         return _emulated_gil_holder.get_holder()
 
+_emulated_sticky_threshold = 1000
+
+def set_sticky_threshold(usec):
+    """Set for how many microseconds a thread waiting for the GIL lets
+    the holder take it back after a short external call, instead of
+    stealing it as soon as it is released.  0 disables this."""
+    global _emulated_sticky_threshold
+    if we_are_translated():
+        _gil_set_sticky_threshold(usec)
+    else:
+        _emulated_sticky_threshold = usec
+
+def get_sticky_threshold():
+    if we_are_translated():
+        return _gil_get_sticky_threshold()
+    else:
+        return _emulated_sticky_threshold
+
+_emulated_switch_interval = 5000
+_emulated_profiling = False
+_emulated_thread_stats = {}    # {ident: [wait_us, waits, hold_us, start]}
+_emulated_site_stats = [[0, 0], [0, 0]]
+
+def set_switch_interval(usec):
+    """Set after how many microseconds a thread waiting for the GIL asks
+    the holder to give it up, using the ticker registered with
+    set_switch_request_ticker().  A thread coming back from an external
+    call asks after a quarter of that time already."""
+    global _emulated_switch_interval
+    if we_are_translated():
+        _gil_set_switch_interval(usec)
+    else:
+        _emulated_switch_interval = usec
+
+def get_switch_interval():
+    if we_are_translated():
+        return _gil_get_switch_interval()
+    else:
+        return _emulated_switch_interval
+
+def set_switch_request_ticker(ticker):
+    """Register a word which the thread holding the GIL polls regularly,
+    and which is set to -1 to ask it to call yield_thread().  Pass NULL
+    to disable these requests."""
+    if we_are_translated():
+        _gil_set_switch_request(ticker)
+
+def switch_requested():
+    """Return True if yield_thread() should be called now: either another
+    thread asked for the GIL through the registered ticker, or there is
+    no such ticker and the caller is expected to yield periodically.
+    The request is cleared."""
+    if we_are_translated():
+        return _gil_switch_requested() != 0
+    else:
+        return True
+
+def get_wait_stats():
+    """Return (total microseconds, number of times) that the current thread
+    had to wait for the GIL."""
+    from rpython.rlib import rthread
+    if we_are_translated():
+        return (rthread.tlfield_gil_wait_us.getraw(),
+                rthread.tlfield_gil_waits.getraw())
+    else:
+        stats = _emulated_thread_stats.get(rthread.get_ident(), [0, 0])
+        return (stats[0], stats[1])
+
+def enum_thread_stats():
+    """Return a list of tuples (thread ident, microseconds waited, number
+    of waits, microseconds held) with the GIL statistics of all running
+    threads.  The hold time is only measured while set_profiling() is
+    enabled."""
+    from rpython.rlib import rthread
+    if not we_are_translated():
+        return [(ident, stats[0], stats[1], stats[2])
+                for ident, stats in _emulated_thread_stats.items()]
+    ofs_ident = rthread.tlfield_thread_ident.getoffset()
+    ofs_wait_us = rthread.tlfield_gil_wait_us.getoffset()
+    ofs_waits = rthread.tlfield_gil_waits.getoffset()
+    ofs_hold_us = rthread.tlfield_gil_hold_us.getoffset()
+    rthread.tlfield_gil_hold_start.getoffset()     # the C code needs it
+    # count the threads first: we must not allocate while holding the
+    # lock, because a GC collection would need it too
+    count = 0
+    p = llmemory.NULL
+    llop.threadlocalref_acquire(lltype.Void)
+    while True:
+        p = llop.threadlocalref_enum(llmemory.Address, p)
+        if not p:
+            break
+        count += 1
+    llop.threadlocalref_release(lltype.Void)
+    idents = [0] * count
+    wait_us = [0] * count
+    waits = [0] * count
+    hold_us = [0] * count
+    i = 0
+    p = llmemory.NULL
+    llop.threadlocalref_acquire(lltype.Void)
+    while i < count:
+        p = llop.threadlocalref_enum(llmemory.Address, p)
+        if not p:
+            break
+        idents[i] = (p + ofs_ident).signed[0]
+        wait_us[i] = (p + ofs_wait_us).signed[0]
+        waits[i] = (p + ofs_waits).signed[0]
+        hold_us[i] = (p + ofs_hold_us).signed[0]
+        i += 1
+    llop.threadlocalref_release(lltype.Void)
+    return [(idents[j], wait_us[j], waits[j], hold_us[j]) for j in range(i)]
+
+def set_profiling(enabled):
+    """Enable or disable the counters that cost something even when there
+    is no contention: the hold time of each thread, and the statistics per
+    release site returned by get_site_stats()."""
+    global _emulated_profiling
+    if we_are_translated():
+        _gil_set_profiling(int(enabled))
+    else:
+        _emulated_profiling = enabled
+
+def get_site_stats():
+    """Return a list of (number of handoffs, microseconds waited) for each
+    release site, indexed by SITE_EXTERNAL_CALL and SITE_YIELD.  Only
+    counted while set_profiling() is enabled."""
+    if not we_are_translated():
+        return [(stats[0], stats[1]) for stats in _emulated_site_stats]
+    p = _gil_get_site_stats()
+    return [(p[0], p[1]), (p[2], p[3])]
+
+def format_stats():
+    """Return a one-line text summary of the GIL statistics, as written
+    into the vmprof output."""
+    parts = []
+    for ident, wait_us, waits, hold_us in enum_thread_stats():
+        parts.append("thread %d wait_us=%d waits=%d hold_us=%d" % (
+            ident, wait_us, waits, hold_us))
+    site_stats = get_site_stats()
+    for i in range(len(SITE_NAMES)):
+        handoffs, wait_us = site_stats[i]
+        parts.append("site %s handoffs=%d wait_us=%d" % (
+            SITE_NAMES[i], handoffs, wait_us))
+    return "; ".join(parts)
+
 def am_I_holding_the_GIL():
     from rpython.rlib import rthread
     my_tid = rthread.get_or_make_ident()
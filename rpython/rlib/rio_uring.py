@@ -0,0 +1,299 @@
+"""
+Minimal interface to the Linux io_uring API, through the raw system calls
+(liburing is not needed).  Operations are first queued in the submission
+ring with prep(), then handed to the kernel in one go with submit(), which
+releases the GIL.  Completions are collected with reap(), without any
+system call.
+
+The buffers passed to prep() must stay alive and at the same address until
+the matching completion has been reaped: only use raw memory for them.
+"""
+
+import sys
+
+from rpython.rlib import rposix
+from rpython.rlib.rarithmetic import intmask
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.rtyper.tool import rffi_platform as platform
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+
+IS_SUPPORTED = False
+if sys.platform.startswith('linux'):
+    # IORING_OP_SEND and friends appeared in Linux 5.6
+    IS_SUPPORTED = platform.checkcompiles(
+        'IORING_OP_SEND', '#include <linux/io_uring.h>')
+
+
+eci = ExternalCompilationInfo(
+    includes = ['linux/io_uring.h'],
+    post_include_bits = ['''
+struct pypy_uring_s;
+RPY_EXTERN struct pypy_uring_s *pypy_uring_setup(unsigned int);
+RPY_EXTERN void pypy_uring_close(struct pypy_uring_s *);
+RPY_EXTERN int pypy_uring_fileno(struct pypy_uring_s *);
+RPY_EXTERN unsigned int pypy_uring_sq_space(struct pypy_uring_s *);
+RPY_EXTERN int pypy_uring_prep(struct pypy_uring_s *, int, int, char *,
+                               unsigned int, long long, int,
+                               unsigned long long);
+RPY_EXTERN int pypy_uring_submit(struct pypy_uring_s *, unsigned int);
+RPY_EXTERN int pypy_uring_reap(struct pypy_uring_s *, unsigned long long *,
+                               int *, int);
+'''],
+    separate_module_sources = ['''
+#include <linux/io_uring.h>
+#include <sys/syscall.h>
+#include <sys/mman.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <errno.h>
+
+struct pypy_uring_s {
+    int fd;
+    unsigned int sq_entries;
+    unsigned int *sq_head, *sq_tail, *sq_mask, *sq_array;
+    unsigned int *cq_head, *cq_tail, *cq_mask;
+    struct io_uring_sqe *sqes;
+    struct io_uring_cqe *cqes;
+    void *sq_ptr, *cq_ptr;
+    size_t sq_size, cq_size, sqes_size;
+    unsigned int local_tail;   /* sqes prepared but not yet published */
+    unsigned int to_submit;    /* sqes published but not yet consumed */
+};
+
+struct pypy_uring_s *pypy_uring_setup(unsigned int entries)
+{
+    struct io_uring_params p;
+    struct pypy_uring_s *r;
+    int saved;
+
+    r = (struct pypy_uring_s *)calloc(1, sizeof(struct pypy_uring_s));
+    if (r == NULL) {
+        errno = ENOMEM;
+        return NULL;
+    }
+    memset(&p, 0, sizeof(p));
+    r->fd = (int)syscall(__NR_io_uring_setup, entries, &p);
+    if (r->fd < 0)
+        goto error;
+
+    r->sq_size = p.sq_off.array + p.sq_entries * sizeof(unsigned int);
+    r->cq_size = p.cq_off.cqes + p.cq_entries * sizeof(struct io_uring_cqe);
+    r->sqes_size = p.sq_entries * sizeof(struct io_uring_sqe);
+    r->sq_ptr = mmap(NULL, r->sq_size, PROT_READ | PROT_WRITE,
+                     MAP_SHARED | MAP_POPULATE, r->fd, IORING_OFF_SQ_RING);
+    if (r->sq_ptr == MAP_FAILED)
+        goto error;
+    r->cq_ptr = mmap(NULL, r->cq_size, PROT_READ | PROT_WRITE,
+                     MAP_SHARED | MAP_POPULATE, r->fd, IORING_OFF_CQ_RING);
+    if (r->cq_ptr == MAP_FAILED)
+        goto error;
+    r->sqes = (struct io_uring_sqe *)mmap(NULL, r->sqes_size,
+                     PROT_READ | PROT_WRITE, MAP_SHARED | MAP_POPULATE,
+                     r->fd, IORING_OFF_SQES);
+    if (r->sqes == MAP_FAILED)
+        goto error;
+
+    r->sq_entries = p.sq_entries;
+    r->sq_head = (unsigned int *)((char *)r->sq_ptr + p.sq_off.head);
+    r->sq_tail = (unsigned int *)((char *)r->sq_ptr + p.sq_off.tail);
+    r->sq_mask = (unsigned int *)((char *)r->sq_ptr + p.sq_off.ring_mask);
+    r->sq_array = (unsigned int *)((char *)r->sq_ptr + p.sq_off.array);
+    r->cq_head = (unsigned int *)((char *)r->cq_ptr + p.cq_off.head);
+    r->cq_tail = (unsigned int *)((char *)r->cq_ptr + p.cq_off.tail);
+    r->cq_mask = (unsigned int *)((char *)r->cq_ptr + p.cq_off.ring_mask);
+    r->cqes = (struct io_uring_cqe *)((char *)r->cq_ptr + p.cq_off.cqes);
+    r->local_tail = *r->sq_tail;
+    return r;
+
+ error:
+    saved = errno;
+    if (r->sqes != NULL && r->sqes != MAP_FAILED)
+        munmap(r->sqes, r->sqes_size);
+    if (r->cq_ptr != NULL && r->cq_ptr != MAP_FAILED)
+        munmap(r->cq_ptr, r->cq_size);
+    if (r->sq_ptr != NULL && r->sq_ptr != MAP_FAILED)
+        munmap(r->sq_ptr, r->sq_size);
+    if (r->fd >= 0)
+        close(r->fd);
+    free(r);
+    errno = saved;
+    return NULL;
+}
+
+void pypy_uring_close(struct pypy_uring_s *r)
+{
+    munmap(r->sqes, r->sqes_size);
+    munmap(r->cq_ptr, r->cq_size);
+    munmap(r->sq_ptr, r->sq_size);
+    close(r->fd);
+    free(r);
+}
+
+int pypy_uring_fileno(struct pypy_uring_s *r)
+{
+    return r->fd;
+}
+
+unsigned int pypy_uring_sq_space(struct pypy_uring_s *r)
+{
+    unsigned int head = __atomic_load_n(r->sq_head, __ATOMIC_ACQUIRE);
+    return r->sq_entries - (r->local_tail - head);
+}
+
+int pypy_uring_prep(struct pypy_uring_s *r, int opcode, int fd, char *buf,
+                    unsigned int len, long long offset, int flags,
+                    unsigned long long user_data)
+{
+    struct io_uring_sqe *sqe;
+    unsigned int index;
+
+    if (pypy_uring_sq_space(r) == 0)
+        return -1;
+    index = r->local_tail & *r->sq_mask;
+    sqe = &r->sqes[index];
+    memset(sqe, 0, sizeof(*sqe));
+    sqe->opcode = (unsigned char)opcode;
+    sqe->fd = fd;
+    sqe->addr = (unsigned long long)(size_t)buf;
+    sqe->len = len;
+    sqe->off = (unsigned long long)offset;
+    sqe->rw_flags = flags;
+    sqe->user_data = user_data;
+    r->sq_array[index] = index;
+    r->local_tail++;
+    return 0;
+}
+
+int pypy_uring_submit(struct pypy_uring_s *r, unsigned int wait_nr)
+{
+    unsigned int enter_flags = 0;
+    int res;
+
+    if (r->local_tail != *r->sq_tail) {
+        r->to_submit += r->local_tail - *r->sq_tail;
+        __atomic_store_n(r->sq_tail, r->local_tail, __ATOMIC_RELEASE);
+    }
+    if (r->to_submit == 0 && wait_nr == 0)
+        return 0;
+    if (wait_nr > 0)
+        enter_flags |= IORING_ENTER_GETEVENTS;
+    res = (int)syscall(__NR_io_uring_enter, r->fd, r->to_submit, wait_nr,
+                       enter_flags, NULL, 0);
+    if (res >= 0)
+        r->to_submit -= res;
+    return res;
+}
+
+int pypy_uring_reap(struct pypy_uring_s *r, unsigned long long *user_data,
+                    int *results, int maxcount)
+{
+    unsigned int head = *r->cq_head;
+    unsigned int tail = __atomic_load_n(r->cq_tail, __ATOMIC_ACQUIRE);
+    int count = 0;
+
+    while (head != tail && count < maxcount) {
+        struct io_uring_cqe *cqe = &r->cqes[head & *r->cq_mask];
+        user_data[count] = cqe->user_data;
+        results[count] = cqe->res;
+        count++;
+        head++;
+    }
+    __atomic_store_n(r->cq_head, head, __ATOMIC_RELEASE);
+    return count;
+}
+'''],
+)
+
+
+class CConfig:
+    _compilation_info_ = eci
+
+if IS_SUPPORTED:
+    for _name in ['IORING_OP_NOP', 'IORING_OP_READ', 'IORING_OP_WRITE',
+                  'IORING_OP_RECV', 'IORING_OP_SEND', 'IORING_OP_ACCEPT']:
+        setattr(CConfig, _name, platform.ConstantInteger(_name))
+    globals().update(platform.configure(CConfig))
+
+
+URING = rffi.COpaquePtr('struct pypy_uring_s', compilation_info=eci)
+ULONGLONGP = rffi.CArrayPtr(rffi.ULONGLONG)
+
+c_setup = rffi.llexternal('pypy_uring_setup', [rffi.UINT], URING,
+                          compilation_info=eci, releasegil=False,
+                          save_err=rffi.RFFI_SAVE_ERRNO)
+c_close = rffi.llexternal('pypy_uring_close', [URING], lltype.Void,
+                          compilation_info=eci, releasegil=False)
+c_fileno = rffi.llexternal('pypy_uring_fileno', [URING], rffi.INT,
+                           compilation_info=eci, releasegil=False)
+c_sq_space = rffi.llexternal('pypy_uring_sq_space', [URING], rffi.UINT,
+                             compilation_info=eci, releasegil=False)
+c_prep = rffi.llexternal('pypy_uring_prep',
+                         [URING, rffi.INT, rffi.INT, rffi.CCHARP, rffi.UINT,
+                          rffi.LONGLONG, rffi.INT, rffi.ULONGLONG], rffi.INT,
+                         compilation_info=eci, releasegil=False)
+# the only call that can block: it releases the GIL once per batch
+c_submit = rffi.llexternal('pypy_uring_submit', [URING, rffi.UINT], rffi.INT,
+                           compilation_info=eci, releasegil=True,
+                           save_err=rffi.RFFI_SAVE_ERRNO)
+c_reap = rffi.llexternal('pypy_uring_reap',
+                         [URING, ULONGLONGP, rffi.INTP, rffi.INT], rffi.INT,
+                         compilation_info=eci, releasegil=False)
+
+
+class IOUring(object):
+    """An io_uring instance with its submission and completion rings."""
+
+    def __init__(self, entries):
+        ll_ring = c_setup(rffi.cast(rffi.UINT, entries))
+        if not ll_ring:
+            raise OSError(rposix.get_saved_errno(), "io_uring_setup failed")
+        self.ll_ring = ll_ring
+
+    def close(self):
+        if self.ll_ring:
+            c_close(self.ll_ring)
+            self.ll_ring = lltype.nullptr(URING.TO)
+
+    def fileno(self):
+        return intmask(c_fileno(self.ll_ring))
+
+    def sq_space(self):
+        """Number of operations that can still be prepared before the
+        submission ring is full."""
+        return intmask(c_sq_space(self.ll_ring))
+
+    def prep(self, opcode, fd, buf, length, offset, flags, user_data):
+        """Queue one operation.  'buf' is a raw char pointer, or NULL for
+        operations that don't need a buffer.  Returns False if the
+        submission ring is full; call submit() and try again."""
+        res = c_prep(self.ll_ring, rffi.cast(rffi.INT, opcode),
+                     rffi.cast(rffi.INT, fd), buf,
+                     rffi.cast(rffi.UINT, length),
+                     rffi.cast(rffi.LONGLONG, offset),
+                     rffi.cast(rffi.INT, flags),
+                     rffi.cast(rffi.ULONGLONG, user_data))
+        return intmask(res) == 0
+
+    def submit(self, wait_nr=0):
+        """Hand all the prepared operations to the kernel, and wait until
+        at least 'wait_nr' completions are available.  Returns the number
+        of operations consumed by the kernel."""
+        res = intmask(c_submit(self.ll_ring, rffi.cast(rffi.UINT, wait_nr)))
+        if res < 0:
+            raise OSError(rposix.get_saved_errno(), "io_uring_enter failed")
+        return res
+
+    def reap(self, maxcount):
+        """Return a list of (user_data, result) pairs for at most
+        'maxcount' finished operations.  A negative result is -errno."""
+        result = []
+        with lltype.scoped_alloc(ULONGLONGP.TO, maxcount) as user_data:
+            with lltype.scoped_alloc(rffi.INTP.TO, maxcount) as results:
+                count = intmask(c_reap(self.ll_ring, user_data, results,
+                                       rffi.cast(rffi.INT, maxcount)))
+                for i in range(count):
+                    result.append((intmask(user_data[i]),
+                                   intmask(results[i])))
+        return result
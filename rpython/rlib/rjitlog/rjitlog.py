@@ -6,7 +6,7 @@ import weakref
 import struct
 import os
 import platform
-from rpython.rlib import jit
+from rpython.rlib import jit, rgil
 from rpython.tool.udir import udir
 from rpython.tool.version import rpythonroot
 from rpython.rtyper.lltypesystem import lltype, rffi
@@ -217,7 +217,7 @@ def returns(*args):
         return method
     return decor
 
-JITLOG_VERSION = 4
+JITLOG_VERSION = 5
 JITLOG_VERSION_16BIT_LE = struct.pack("<H", JITLOG_VERSION)
 
 marks = [
@@ -251,6 +251,7 @@ marks = [
     ('SOURCE_CODE',),
     ('REDIRECT_ASSEMBLER',),
     ('TMP_CALLBACK',),
+    ('GIL_STATS',),
 ]
 
 start = 0x11
@@ -317,6 +318,31 @@ def _log_jit_counter(struct):
     content = ''.join(list)
     jitlog_write_marked(content, len(content))
 
+def log_gil_stats():
+    """Write the GIL statistics of rgil: the number of threads and, for
+    each one, its ident, the microseconds waited, the number of waits and
+    the microseconds held; then the number of release sites and, for
+    each one, its name, the number of handoffs and the microseconds
+    waited."""
+    if not jitlog_enabled():
+        return
+    thread_stats = rgil.enum_thread_stats()
+    list = [MARK_GIL_STATS, encode_le_32bit(len(thread_stats))]
+    for ident, wait_us, waits, hold_us in thread_stats:
+        list.append(encode_le_64bit(ident))
+        list.append(encode_le_64bit(wait_us))
+        list.append(encode_le_64bit(waits))
+        list.append(encode_le_64bit(hold_us))
+    site_stats = rgil.get_site_stats()
+    list.append(encode_le_32bit(len(site_stats)))
+    for i in range(len(site_stats)):
+        handoffs, wait_us = site_stats[i]
+        list.append(encode_str(rgil.SITE_NAMES[i]))
+        list.append(encode_le_64bit(handoffs))
+        list.append(encode_le_64bit(wait_us))
+    content = ''.join(list)
+    jitlog_write_marked(content, len(content))
+
 def redirect_assembler(oldtoken, newtoken, asm_adr):
     if not jitlog_enabled():
         return
@@ -7,6 +7,7 @@ from rpython.jit.metainterp.history import AbstractDescr
 from rpython.rlib.objectmodel import compute_unique_id
 from rpython.rlib.rfile import create_file
 from rpython.rlib.rposix import SuppressIPH
+from rpython.rlib import rgil
 
 class FakeCallAssemblerLoopToken(AbstractDescr):
     def __init__(self, target):
@@ -151,3 +152,31 @@ class TestLogger(object):
               jl.encode_le_addr(new_id_looptoken) + \
               jl.encode_le_addr(newlooptoken._ll_function_addr)
         assert binary.endswith(end)
+
+    def test_gil_stats(self, tmpdir):
+        file = tmpdir.join('binary_file')
+        file.ensure()
+        rfile = create_file(str(file), 'wb')
+        old = rgil._emulated_site_stats[:]
+        rgil._emulated_site_stats[:] = [[3, 400], [5, 6000]]
+        try:
+            with SuppressIPH():
+                jl.jitlog_init(rfile.fileno())
+                jl.log_gil_stats()
+                rfile.close()
+        finally:
+            rgil._emulated_site_stats[:] = old
+        binary = file.read()
+        threads = rgil.enum_thread_stats()
+        expected = [jl.MARK_GIL_STATS, jl.encode_le_32bit(len(threads))]
+        for ident, wait_us, waits, hold_us in threads:
+            expected += [jl.encode_le_64bit(ident),
+                         jl.encode_le_64bit(wait_us),
+                         jl.encode_le_64bit(waits),
+                         jl.encode_le_64bit(hold_us)]
+        expected += [jl.encode_le_32bit(2),
+                     jl.encode_str('external_call'),
+                     jl.encode_le_64bit(3), jl.encode_le_64bit(400),
+                     jl.encode_str('yield'),
+                     jl.encode_le_64bit(5), jl.encode_le_64bit(6000)]
+        assert binary.endswith(''.join(expected))
@@ -36,7 +36,7 @@ class RValueError(RMMapError):
 class RTypeError(RMMapError):
     pass
 
-includes = ["sys/types.h"]
+includes = ["sys/types.h", "string.h"]
 if _POSIX:
     includes += ['unistd.h', 'sys/mman.h']
 elif _MS_WINDOWS:
@@ -182,6 +182,7 @@ if _CYGWIN:
     _, c_free_safe = external('free', [PTR], lltype.Void, macro=True)
 
 c_memmove, _ = external('memmove', [PTR, PTR, size_t], lltype.Void)
+_, c_memchr_safe = external('memchr', [PTR, rffi.INT, size_t], PTR)
 
 if _POSIX:
     has_mremap = cConfig['has_mremap']
@@ -485,6 +486,18 @@ class MMap(object):
                 return -1   # failure
             p += step
 
+    def find_byte(self, c, start, end):
+        """Return the index of the first occurrence of the character 'c'
+        in data[start:end], or -1.  Both bounds must be within the map."""
+        if end <= start:
+            return -1
+        p = c_memchr_safe(self.getptr(start), rffi.cast(rffi.INT, ord(c)),
+                          rffi.cast(size_t, end - start))
+        if not p:
+            return -1
+        return start + (rffi.cast(lltype.Signed, p) -
+                        rffi.cast(lltype.Signed, self.getptr(start)))
+
     def seek(self, pos, whence=0):
         dist = pos
         how = whence
@@ -3293,3 +3293,71 @@ if sys.platform.startswith('linux'):
                 'memfd_create', c_memfd_create(name, flags))
 
 
+
+# ____________________________________________________________
+# Support for splice and copy_file_range functions
+
+if sys.platform.startswith('linux'):
+    class CConfig:
+        _compilation_info_ = ExternalCompilationInfo(
+            includes=['fcntl.h', 'unistd.h'],)
+        for name in """
+                SPLICE_F_MOVE
+                SPLICE_F_NONBLOCK
+                SPLICE_F_MORE
+                """.split():
+            locals()[name] = rffi_platform.DefinedConstantInteger(name)
+        HAVE_SPLICE = rffi_platform.Has('splice')
+        HAVE_COPY_FILE_RANGE = rffi_platform.Has('copy_file_range')
+
+    cConfig = rffi_platform.configure(CConfig)
+    for key, value in cConfig.items():
+        if value is not None and key.startswith("SPLICE_"):
+            globals()[key] = value
+
+    _LOFF_PTR_T = rffi.CArrayPtr(rffi.LONGLONG)
+
+    @specialize.arg(0, 1)
+    def _call_with_offsets(c_func, name, src, offset_src, dst, offset_dst,
+                           count, flags):
+        # a negative offset means "use and update the file position",
+        # which is expressed by passing NULL
+        with lltype.scoped_alloc(_LOFF_PTR_T.TO, 2) as p_offsets:
+            p_src = lltype.nullptr(_LOFF_PTR_T.TO)
+            p_dst = lltype.nullptr(_LOFF_PTR_T.TO)
+            if offset_src >= 0:
+                p_offsets[0] = rffi.cast(rffi.LONGLONG, offset_src)
+                p_src = p_offsets
+            if offset_dst >= 0:
+                p_offsets[1] = rffi.cast(rffi.LONGLONG, offset_dst)
+                p_dst = rffi.ptradd(p_offsets, 1)
+            res = c_func(src, p_src, dst, p_dst, count, flags)
+        return handle_posix_error(name, res)
+
+    if cConfig['HAVE_SPLICE']:
+        c_splice = external('splice',
+            [rffi.INT, _LOFF_PTR_T, rffi.INT, _LOFF_PTR_T, rffi.SIZE_T,
+             rffi.UINT], rffi.SSIZE_T,
+            save_err=rffi.RFFI_SAVE_ERRNO,
+            compilation_info=CConfig._compilation_info_)
+
+        def splice(src, offset_src, dst, offset_dst, count, flags=0):
+            """Move up to 'count' bytes between two file descriptors, one
+            of which must be a pipe, without copying them through user
+            space.  Offsets of -1 use the file positions instead."""
+            return _call_with_offsets(c_splice, 'splice', src, offset_src,
+                                      dst, offset_dst, count, flags)
+
+    if cConfig['HAVE_COPY_FILE_RANGE']:
+        c_copy_file_range = external('copy_file_range',
+            [rffi.INT, _LOFF_PTR_T, rffi.INT, _LOFF_PTR_T, rffi.SIZE_T,
+             rffi.UINT], rffi.SSIZE_T,
+            save_err=rffi.RFFI_SAVE_ERRNO,
+            compilation_info=CConfig._compilation_info_)
+
+        def copy_file_range(src, offset_src, dst, offset_dst, count, flags=0):
+            """Copy up to 'count' bytes between two regular files inside
+            the kernel.  Offsets of -1 use the file positions instead."""
+            return _call_with_offsets(c_copy_file_range, 'copy_file_range',
+                                      src, offset_src, dst, offset_dst,
+                                      count, flags)
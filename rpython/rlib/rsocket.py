@@ -1226,6 +1226,88 @@ class RSocket(object):
 
         return bytes_sent
 
+    if _c.HAVE_MMSG:
+        @jit.dont_look_inside
+        def recvmmsg_into(self, rwbuffer, msgsize, count, flags=0):
+            """Receive up to 'count' datagrams with a single recvmmsg()
+            call, datagram number i going to offset i * msgsize of
+            'rwbuffer'.  Blocks (or times out) only until the first datagram
+            is there.  Returns a list of (nbytes, address) tuples, where
+            address is None if the sender is unknown."""
+            if msgsize <= 0 or msgsize > 0x7fffffff or count <= 0:
+                raise RSocketError("invalid message size or count")
+            if count > rwbuffer.getlength() // msgsize:
+                raise RSocketError("buffer too small")
+            # the kernel never returns more than UIO_MAXIOV datagrams
+            count = min(count, 1024)
+            self.wait_for_data(False)
+            addrsize = instantiate_family(self.family).maxlen
+            addrbuf = lltype.malloc(rffi.CCHARP.TO, addrsize * count,
+                                    flavor='raw', zero=True)
+            lengths = lltype.malloc(rffi.INT_realP.TO, count, flavor='raw')
+            addrlens = lltype.malloc(rffi.INT_realP.TO, count, flavor='raw')
+            try:
+                raw = rwbuffer.get_raw_address()
+                res = _c.recvmmsg(self.fd, raw, count, msgsize,
+                                  flags | _c.MSG_WAITFORONE, addrbuf,
+                                  addrsize, lengths, addrlens)
+                keepalive_until_here(rwbuffer)
+                res = rffi.cast(lltype.Signed, res)
+                if res < 0:
+                    raise self.error_handler()
+                result = []
+                for i in range(res):
+                    nbytes = rffi.cast(lltype.Signed, lengths[i])
+                    addrlen = rffi.cast(lltype.Signed, addrlens[i])
+                    if addrlen:
+                        addrptr = rffi.cast(_c.sockaddr_ptr,
+                                            rffi.ptradd(addrbuf, i * addrsize))
+                        address = make_address(addrptr, addrlen)
+                    else:
+                        address = None
+                    result.append((nbytes, address))
+                return result
+            finally:
+                lltype.free(addrlens, flavor='raw')
+                lltype.free(lengths, flavor='raw')
+                lltype.free(addrbuf, flavor='raw')
+
+        @jit.dont_look_inside
+        def sendmmsg(self, messages, flags=0, address=None):
+            """Send each string in 'messages' as its own datagram with a
+            single sendmmsg() call, to 'address' if given.  Returns the
+            number of datagrams sent, which may be less than len(messages).
+            """
+            count = len(messages)
+            if count == 0:
+                return 0
+            self.wait_for_data(True)
+            bufs = lltype.malloc(rffi.CCHARPP.TO, count, flavor='raw')
+            lengths = lltype.malloc(rffi.INT_realP.TO, count, flavor='raw')
+            for i in range(count):
+                bufs[i] = rffi.str2charp(messages[i])
+                lengths[i] = rffi.cast(rffi.INT_real, len(messages[i]))
+            if address is None:
+                addr = lltype.nullptr(_c.sockaddr)
+                addrlen = 0
+            else:
+                addr = address.lock()
+                addrlen = address.addrlen
+            try:
+                res = _c.sendmmsg(self.fd, bufs, lengths, count, flags,
+                                  addr, addrlen)
+                res = rffi.cast(lltype.Signed, res)
+            finally:
+                if address is not None:
+                    address.unlock()
+                for i in range(count):
+                    lltype.free(bufs[i], flavor='raw')
+                lltype.free(lengths, flavor='raw')
+                lltype.free(bufs, flavor='raw')
+            if res < 0:
+                raise self.error_handler()
+            return res
+
     def setblocking(self, block):
         if block:
             timeout = -1.0
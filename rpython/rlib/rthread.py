@@ -461,6 +461,11 @@ tlfield_p_errno = ThreadLocalField(rffi.CArrayPtr(rffi.INT_real), "p_errno",
                                    loop_invariant=True)
 tlfield_rpy_errno = ThreadLocalField(rffi.INT, "rpy_errno")
 tlfield_alt_errno = ThreadLocalField(rffi.INT, "alt_errno")
+# written directly by the C code of the GIL, if used at all (see rgil.py)
+tlfield_gil_wait_us = ThreadLocalField(lltype.Signed, "gil_wait_us")
+tlfield_gil_waits = ThreadLocalField(lltype.Signed, "gil_waits")
+tlfield_gil_hold_us = ThreadLocalField(lltype.Signed, "gil_hold_us")
+tlfield_gil_hold_start = ThreadLocalField(lltype.Signed, "gil_hold_start")
 _win32 = (sys.platform == "win32")
 if _win32:
     from rpython.rlib import rwin32
@@ -38,6 +38,9 @@ def enable(fileno, interval, memory=0, native=0, real_time=0):
 def disable():
     _get_vmprof().disable()
 
+def write_meta(key, value):
+    _get_vmprof().write_meta(key, value)
+
 def is_enabled():
     vmp = _get_vmprof()
     return vmp.is_enabled
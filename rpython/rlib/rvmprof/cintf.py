@@ -152,6 +152,9 @@ def setup():
     vmprof_start_sampling = rffi.llexternal("vmprof_start_sampling", [],
                                             lltype.Void, compilation_info=eci,
                                             _nowrapper=True)
+    vmprof_write_meta = rffi.llexternal("vmprof_write_meta",
+                                        [rffi.CCHARP, rffi.CCHARP], rffi.INT,
+                                        compilation_info=eci)
 
     return CInterface(locals())
 
@@ -20,6 +20,9 @@ class DummyVMProf(object):
     def disable(self):
         pass
 
+    def write_meta(self, key, value):
+        pass
+
     def start_sampling(self):
         pass
 
@@ -166,6 +166,16 @@ class VMProf(object):
             raise VMProfError(os.strerror(rposix.get_saved_errno()))
 
 
+    @jit.dont_look_inside
+    def write_meta(self, key, value):
+        """Write a key/value pair of metadata into the profile.
+        Raises VMProfError if vmprof is not enabled.
+        """
+        if not self.is_enabled:
+            raise VMProfError("vmprof is not enabled")
+        if self.cintf.vmprof_write_meta(key, value) < 0:
+            raise VMProfError("cannot write the vmprof metadata")
+
     def _write_code_registration(self, uid, name):
         assert name.count(':') == 3 and len(name) <= MAX_FUNC_NAME, (
             "the name must be 'class:func_name:func_line:filename' "
@@ -12,6 +12,7 @@
 #endif
 
 
+#include <string.h>
 #include "vmprof_common.h"
 
 #include "shared/vmprof_get_custom_offset.h"
@@ -46,3 +47,32 @@ void vmprof_start_sampling(void)
 {
     vmprof_ignore_signals(0);
 }
+
+int vmprof_write_meta(const char *key, const char *value)
+{
+    /* Like vmp_write_meta(), but with a single write(), so that the
+       record cannot be interleaved with the samples that other threads
+       may be writing at the same time. */
+    long keylen = (long)strlen(key);
+    long valuelen = (long)strlen(value);
+    size_t size = 1 + 2 * sizeof(long) + keylen + valuelen;
+    char *buf, *p;
+    int res;
+
+    if (vmp_profile_fileno() == -1)
+        return -1;
+    buf = p = (char *)malloc(size);
+    if (buf == NULL)
+        return -1;
+    *p++ = MARKER_META;
+    memcpy(p, &keylen, sizeof(long));
+    p += sizeof(long);
+    memcpy(p, key, keylen);
+    p += keylen;
+    memcpy(p, &valuelen, sizeof(long));
+    p += sizeof(long);
+    memcpy(p, value, valuelen);
+    res = vmp_write_all(buf, size);
+    free(buf);
+    return res;
+}
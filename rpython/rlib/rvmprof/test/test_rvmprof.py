@@ -207,3 +207,40 @@ class TestNative(RVMProfSamplingTest):
                     del not_found[i]
                     break
         assert not_found == []
+
+
+class TestWriteMeta(RVMProfTest):
+
+    @pytest.fixture
+    def init(self, tmpdir):
+        self.tmpfilename = str(tmpdir.join('profile.vmprof'))
+        super(TestWriteMeta, self).init()
+
+    @rvmprof.vmprof_execute_code("xcode1", lambda self, code, num: code)
+    def main(self, code, num):
+        return num
+
+    def entry_point(self):
+        code = self.MyCode()
+        rvmprof.register_code(code, self.MyCode.get_name)
+        fd = os.open(self.tmpfilename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                     0666)
+        rvmprof.enable(fd, 0.004)
+        self.main(code, 5)
+        rvmprof.write_meta("gil", "thread 1 wait_us=5")
+        rvmprof.disable()
+        os.close(fd)
+        try:
+            rvmprof.write_meta("gil", "too late")
+        except rvmprof.VMProfError:
+            return 0
+        return 1
+
+    def test(self):
+        import struct
+        assert self.rpy_entry_point() == 0
+        with open(self.tmpfilename, 'rb') as f:
+            data = f.read()
+        value = "thread 1 wait_us=5"
+        assert ('\x07' + struct.pack('l', 3) + 'gil' +
+                struct.pack('l', len(value)) + value) in data
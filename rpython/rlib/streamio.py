@@ -5,7 +5,8 @@ Based on sio.py from Guido van Rossum.
 - This module contains various stream classes which provide a subset of the
   classic Python I/O API: read(n), write(s), tell(), seek(offset, whence=0),
   readall(), readline(), truncate(size), flush(), close(), peek(),
-  flushable(), try_to_find_file_descriptor().
+  flushable(), try_to_find_file_descriptor(),
+  read_buffered_into_raw(address, n).
 
 - This is not for general usage:
   * read(n) may return less than n bytes, just like os.read().
@@ -34,11 +35,12 @@ an outout-buffering stream.
 # where r_longlong values end up: as argument to seek() and truncate() and
 # return value of tell(), but not as argument to read().
 
-import os, sys, errno
+import os, sys, errno, stat
 from rpython.rlib.objectmodel import specialize, we_are_translated, not_rpython
 from rpython.rlib.rarithmetic import r_longlong, intmask
-from rpython.rlib import rposix, nonconst, _rsocket_rffi as _c
+from rpython.rlib import rposix, rmmap, nonconst, _rsocket_rffi as _c
 from rpython.rlib.rstring import StringBuilder
+from rpython.rtyper.lltypesystem import rffi
 
 from os import O_RDONLY, O_WRONLY, O_RDWR, O_CREAT, O_TRUNC, O_APPEND
 O_BINARY = getattr(os, "O_BINARY", 0)
@@ -77,10 +79,11 @@ def replace_char_with_str(string, c, s):
 
 @specialize.argtype(0)
 def open_file_as_stream(path, mode="r", buffering=-1, signal_checker=None):
-    os_flags, universal, reading, writing, basemode, binary = decode_mode(mode)
+    (os_flags, universal, reading, writing, basemode, binary,
+     mapping) = decode_mode(mode)
     stream = open_path_helper(path, os_flags, basemode == "a", signal_checker)
     return construct_stream_tower(stream, buffering, universal, reading,
-                                  writing, binary)
+                                  writing, binary, mapping)
 
 def _setfd_binary(fd):
     pass
@@ -103,12 +106,13 @@ else:
         pass
 
 def fdopen_as_stream(fd, mode, buffering=-1, signal_checker=None):
-    os_flags, universal, reading, writing, basemode, binary = decode_mode(mode)
+    (os_flags, universal, reading, writing, basemode, binary,
+     mapping) = decode_mode(mode)
     _check_fd_mode(fd, reading, writing)
     _setfd_binary(fd)
     stream = DiskFile(fd, signal_checker)
     return construct_stream_tower(stream, buffering, universal, reading,
-                                  writing, binary)
+                                  writing, binary, mapping)
 
 @specialize.argtype(0)
 def open_path_helper(path, os_flags, append, signal_checker=None):
@@ -130,6 +134,7 @@ def decode_mode(mode):
     plus      = False
     universal = False
     binary    = False
+    mapping   = False    # 'm', like in glibc's fopen(): read through mmap()
 
     for c in mode[1:]:
         if c == '+':
@@ -138,6 +143,8 @@ def decode_mode(mode):
             universal = True
         elif c == 'b':
             binary = True
+        elif c == 'm':
+            mapping = True
         else:
             break
 
@@ -147,11 +154,11 @@ def decode_mode(mode):
     reading = basemode == 'r' or plus
     writing = basemode != 'r' or plus
 
-    return flag, universal, reading, writing, basemode, binary
+    return flag, universal, reading, writing, basemode, binary, mapping
 
 
 def construct_stream_tower(stream, buffering, universal, reading, writing,
-                           binary):
+                           binary, mapping=False):
     if buffering == 0:   # no buffering
         pass
     elif buffering == 1:   # line-buffering
@@ -166,7 +173,11 @@ def construct_stream_tower(stream, buffering, universal, reading, writing,
         if writing:
             stream = BufferingOutputStream(stream, buffering)
         if reading:
-            stream = BufferingInputStream(stream, buffering)
+            if (mapping and not writing and _MMAP_READAHEAD and
+                    isinstance(stream, DiskFile)):
+                stream = MappingInputStream(stream, buffering)
+            else:
+                stream = BufferingInputStream(stream, buffering)
 
     if universal:     # Wants universal newlines
         if writing and os.linesep != '\n':
@@ -299,6 +310,13 @@ class Stream(object):
         pos, buf = self.peek()
         return len(buf) - pos
 
+    def read_buffered_into_raw(self, address, n):
+        """Copy at most n bytes that can be read without doing any I/O
+        into the raw memory at 'address', and skip them.  Returns the
+        number of bytes copied, which is 0 if the stream cannot do it
+        without making a string first."""
+        return 0
+
     def try_to_find_file_descriptor(self):
         return -1
 
@@ -767,6 +785,205 @@ class BufferingInputStream(Stream):
                                               flush_buffers=False)
 
 
+_MMAP_READAHEAD = rmmap._POSIX
+_HAVE_FADV_SEQUENTIAL = (rposix.HAVE_FADVISE and
+                         rposix.POSIX_FADV_SEQUENTIAL is not None)
+_HAVE_MADV_SEQUENTIAL = (rmmap._POSIX and rmmap.has_madvise and
+                         rmmap.constants.get('MADV_SEQUENTIAL') is not None)
+
+
+class MappingInputStream(BufferingInputStream):
+    """Buffering input stream for files opened read-only with the 'm'
+    mode flag.
+
+    It starts like a BufferingInputStream, but once the file turns out to
+    be a large regular file that is read sequentially, it maps the file
+    and returns slices of the mapping directly, without read() system
+    calls and without copying every chunk through self.buf first.  When
+    the end of the mapping is reached it goes back to buffered reads from
+    that position, so that data appended in the meantime is still seen.
+
+    Like with glibc's fopen(path, "rm"), if another process truncates the
+    file while it is mapped, reading the part that is gone kills the
+    process with SIGBUS instead of returning EOF.  This is why it is only
+    used when asked for.
+    """
+
+    mmap_after = 2**20      # bytes read sequentially before trying to map
+    mmap_min_size = 2**24   # smallest amount of data left worth mapping
+
+    def __init__(self, base, bufsize=-1):
+        BufferingInputStream.__init__(self, base, bufsize)
+        self.mm = None
+        self.mmpos = 0
+        self.mmsize = 0
+        self.mmchunk = ""      # cached result of peek()
+        self.mmchunkpos = 0
+        self.sequential = 0
+
+    def _count_sequential(self, n):
+        self.sequential += n
+        if self.sequential >= self.mmap_after:
+            self.sequential = 0
+            self._start_mmap()
+
+    def _start_mmap(self):
+        fd = self.base.try_to_find_file_descriptor()
+        if fd < 0:
+            return
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st[stat.ST_MODE]):
+                return
+            size = st[stat.ST_SIZE]
+            pos = self.tell()
+            if size - pos < self.mmap_min_size or size > sys.maxint:
+                return
+            mm = rmmap.mmap(fd, intmask(size), access=rmmap.ACCESS_READ)
+        except (OSError, rmmap.RMMapError):
+            return
+        if _HAVE_FADV_SEQUENTIAL:
+            try:
+                rposix.posix_fadvise(fd, pos, 0, rposix.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        if _HAVE_MADV_SEQUENTIAL:
+            try:
+                mm.madvise(rmmap.MADV_SEQUENTIAL, 0, mm.size)
+            except OSError:
+                pass
+        self.mm = mm
+        self.mmpos = intmask(pos)
+        self.mmsize = mm.size
+        self.mmchunk = ""
+        self.buf = ""
+        self.pos = 0
+
+    def _stop_mmap(self):
+        mm = self.mm
+        assert mm is not None
+        self.mm = None
+        self.mmchunk = ""
+        self.sequential = 0
+        mm.close()
+        self.do_seek(r_longlong(self.mmpos), 0)
+
+    def _mmap_take_rest(self):
+        mm = self.mm
+        assert mm is not None
+        start = self.mmpos
+        self.mmpos = self.mmsize
+        data = mm.getslice(start, self.mmsize - start)
+        self._stop_mmap()
+        return data
+
+    def flush_buffers(self):
+        if self.mm is not None:
+            self._stop_mmap()
+        else:
+            BufferingInputStream.flush_buffers(self)
+
+    def tell(self):
+        if self.mm is not None:
+            return r_longlong(self.mmpos)
+        return BufferingInputStream.tell(self)
+
+    def seek(self, offset, whence):
+        self.sequential = 0
+        if self.mm is not None:
+            if whence == 0 or whence == 1:
+                if whence == 1:
+                    offset += self.mmpos
+                if 0 <= offset <= self.mmsize:
+                    self.mmpos = intmask(offset)
+                    return
+                self._stop_mmap()
+                whence = 0
+            else:
+                self._stop_mmap()
+        BufferingInputStream.seek(self, offset, whence)
+
+    def readall(self):
+        if self.mm is None:
+            return BufferingInputStream.readall(self)
+        data = self._mmap_take_rest()
+        more = BufferingInputStream.readall(self)
+        if more:
+            data += more
+        return data
+
+    def read(self, n=-1):
+        assert isinstance(n, int)
+        if n < 0:
+            return self.readall()
+        mm = self.mm
+        if mm is None:
+            data = BufferingInputStream.read(self, n)
+            self._count_sequential(len(data))
+            return data
+        start = self.mmpos
+        if n <= self.mmsize - start:
+            self.mmpos = start + n
+            return mm.getslice(start, n)
+        data = self._mmap_take_rest()
+        return data + BufferingInputStream.read(self, n - len(data))
+
+    def readline(self):
+        mm = self.mm
+        if mm is None:
+            data = BufferingInputStream.readline(self)
+            self._count_sequential(len(data))
+            return data
+        start = self.mmpos
+        end = mm.find_byte('\n', start, self.mmsize)
+        if end >= 0:
+            end += 1
+            self.mmpos = end
+            return mm.getslice(start, end - start)
+        data = self._mmap_take_rest()
+        return data + BufferingInputStream.readline(self)
+
+    def peek(self):
+        mm = self.mm
+        if mm is None:
+            return BufferingInputStream.peek(self)
+        # readline() of TextInputFilter calls peek() before every read(),
+        # so the same chunk is returned until the position leaves it
+        pos = self.mmpos
+        start = self.mmchunkpos
+        if not (start <= pos < start + len(self.mmchunk)):
+            n = min(self.bufsize, self.mmsize - pos)
+            self.mmchunk = mm.getslice(pos, n)
+            self.mmchunkpos = start = pos
+        return (pos - start, self.mmchunk)
+
+    def read_buffered_into_raw(self, address, n):
+        mm = self.mm
+        if mm is None:
+            return 0
+        start = self.mmpos
+        n = min(n, self.mmsize - start)
+        if n <= 0:
+            return 0
+        rffi.c_memcpy(rffi.cast(rffi.VOIDP, address),
+                      rffi.cast(rffi.CONST_VOIDP, mm.getptr(start)),
+                      rffi.cast(rffi.SIZE_T, n))
+        self.mmpos = start + n
+        return n
+
+    def count_buffered_bytes(self):
+        if self.mm is not None:
+            return self.mmsize - self.mmpos
+        return BufferingInputStream.count_buffered_bytes(self)
+
+    def close1(self, closefileno):
+        mm = self.mm
+        if mm is not None:
+            self.mm = None
+            mm.close()
+        self.base.close1(closefileno)
+
+
 class BufferingOutputStream(Stream):
     """Standard buffering output stream.
 
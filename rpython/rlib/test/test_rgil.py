@@ -160,6 +160,238 @@ class BaseTestGIL(StandaloneTests):
         data = cbuilder.cmdexec('')
         assert data == "OK\n"
 
+    def test_sticky_threshold(self):
+        from rpython.rlib import rthread
+
+        class Glob:
+            def __init__(self):
+                self.my_locks = []
+                self.counters = [0, 0]
+                self.n_threads = 0
+        glob = Glob()
+
+        def release_often():
+            # mostly short releases, with an explicit yield from time to
+            # time like the periodic action of PyPy does
+            index = glob.n_threads
+            glob.n_threads += 1
+            while glob.counters[0] < 1000 or glob.counters[1] < 1000:
+                rgil.release()
+                rgil.acquire()
+                glob.counters[index] += 1
+                if glob.counters[index] % 100 == 0:
+                    rgil.yield_thread()
+                if glob.counters[index] > 10000000:
+                    debug_print('starved')
+                    assert False
+            glob.my_locks[index].release()
+
+        def main(argv):
+            print rgil.get_sticky_threshold()
+            rgil.set_sticky_threshold(int(argv[1]))
+            print rgil.get_sticky_threshold()
+            for j in range(2):
+                lock = rthread.allocate_lock()
+                lock.acquire(True)
+                glob.my_locks.append(lock)
+            for j in range(2):
+                rthread.start_new_thread(release_often, ())
+            for j in range(2):
+                glob.my_locks[j].acquire(True)
+            print "OK"
+            return 0
+
+        self.config = get_combined_translation_config(
+            overrides={"translation.thread": True})
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('500')
+        assert data == "1000\n500\nOK\n"
+        data = cbuilder.cmdexec('0')
+        assert data == "1000\n0\nOK\n"
+
+    def test_switch_interval(self):
+        from rpython.rlib import rthread
+        from rpython.rtyper.lltypesystem import lltype, rffi
+
+        class Glob:
+            def __init__(self):
+                self.my_locks = []
+                self.done = False
+                self.requests = 0
+                self.ticker_values = 0
+                self.waiter_ident = 0
+        glob = Glob()
+
+        def holder():
+            # never releases the GIL, unless another thread asks for it
+            ticker = glob.ticker
+            while not glob.done:
+                if rgil.switch_requested():
+                    glob.requests += 1
+                    glob.ticker_values += ticker[0]
+                    ticker[0] = 0
+                    rgil.yield_thread()
+            glob.my_locks[0].release()
+
+        def waiter():
+            glob.waiter_ident = rthread.get_ident()
+            start_us, start_waits = rgil.get_wait_stats()
+            n = 0
+            while n < 10:
+                rgil.yield_thread()
+                if rgil.get_wait_stats()[1] > start_waits + n:
+                    n += 1      # the holder did get the GIL meanwhile
+            glob.done = True
+            wait_us, waits = rgil.get_wait_stats()
+            print waits >= 10
+            print wait_us - start_us >= 10 * 1000
+            for ident, us, n, hold_us in rgil.enum_thread_stats():
+                if ident == glob.waiter_ident:
+                    print us == wait_us and n == waits
+            glob.my_locks[1].release()
+
+        def main(argv):
+            print rgil.get_switch_interval()
+            rgil.set_switch_interval(2000)
+            print rgil.get_switch_interval()
+            glob.ticker = lltype.malloc(rffi.SIGNEDP.TO, 1, flavor='raw')
+            glob.ticker[0] = 0
+            rgil.set_switch_request_ticker(glob.ticker)
+            for j in range(2):
+                lock = rthread.allocate_lock()
+                lock.acquire(True)
+                glob.my_locks.append(lock)
+            rthread.start_new_thread(holder, ())
+            rthread.start_new_thread(waiter, ())
+            for j in range(2):
+                glob.my_locks[j].acquire(True)
+            print glob.requests >= 10
+            print glob.ticker_values < 0
+            rgil.set_switch_request_ticker(lltype.nullptr(rffi.SIGNEDP.TO))
+            lltype.free(glob.ticker, flavor='raw')
+            print rgil.switch_requested()
+            return 0
+
+        self.config = get_combined_translation_config(
+            overrides={"translation.thread": True})
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == "5000\n2000\n" + "1\n" * 6
+
+    def test_switch_request_cleared(self):
+        import time
+        from rpython.rlib import rthread
+        from rpython.rtyper.lltypesystem import lltype, rffi
+
+        class Glob:
+            def __init__(self):
+                self.my_locks = []
+                self.busy_started = False
+                self.total = 0
+                self.requested = True
+        glob = Glob()
+
+        def busy():
+            # holds the GIL without polling the ticker, long enough
+            # for the other thread to ask for a switch, then releases
+            # it only around an external call
+            glob.busy_started = True
+            for i in range(50000000):
+                glob.total += i & 7
+            time.sleep(0.05)
+            glob.my_locks[0].release()
+
+        def waiter():
+            while not glob.busy_started:
+                rgil.yield_thread()
+            # we got the GIL during the time.sleep(): our request was
+            # served, and must not make us yield again
+            glob.requested = rgil.switch_requested()
+            glob.my_locks[1].release()
+
+        def main(argv):
+            rgil.set_switch_interval(200)
+            glob.ticker = lltype.malloc(rffi.SIGNEDP.TO, 1, flavor='raw')
+            glob.ticker[0] = 0
+            rgil.set_switch_request_ticker(glob.ticker)
+            for j in range(2):
+                lock = rthread.allocate_lock()
+                lock.acquire(True)
+                glob.my_locks.append(lock)
+            rthread.start_new_thread(busy, ())
+            rthread.start_new_thread(waiter, ())
+            for j in range(2):
+                glob.my_locks[j].acquire(True)
+            print glob.ticker[0] == -1
+            print glob.requested
+            rgil.set_switch_request_ticker(lltype.nullptr(rffi.SIGNEDP.TO))
+            lltype.free(glob.ticker, flavor='raw')
+            return 0
+
+        self.config = get_combined_translation_config(
+            overrides={"translation.thread": True})
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == "1\n0\n"
+
+    def test_profiling(self):
+        import time
+        from rpython.rlib import rthread
+
+        class Glob:
+            def __init__(self):
+                self.my_locks = []
+                self.sleeper_done = False
+                self.yielder_hold_us = 0
+        glob = Glob()
+
+        def sleeper():
+            # releases the GIL around short external calls
+            for i in range(50):
+                time.sleep(0.0002)
+            glob.sleeper_done = True
+            glob.my_locks[0].release()
+
+        def yielder():
+            while not glob.sleeper_done:
+                rgil.yield_thread()
+            for ident, wait_us, waits, hold_us in rgil.enum_thread_stats():
+                if ident == rthread.get_ident():
+                    glob.yielder_hold_us = hold_us
+            glob.my_locks[1].release()
+
+        def main(argv):
+            print rgil.get_site_stats() == [(0, 0), (0, 0)]
+            rgil.set_profiling(True)
+            for j in range(2):
+                lock = rthread.allocate_lock()
+                lock.acquire(True)
+                glob.my_locks.append(lock)
+            rthread.start_new_thread(sleeper, ())
+            rthread.start_new_thread(yielder, ())
+            for j in range(2):
+                glob.my_locks[j].acquire(True)
+            rgil.set_profiling(False)
+            site_stats = rgil.get_site_stats()
+            print site_stats[rgil.SITE_EXTERNAL_CALL][0] > 0
+            print site_stats[rgil.SITE_YIELD][0] > 0
+            print glob.yielder_hold_us > 0
+            print "site yield handoffs=" in rgil.format_stats()
+            return 0
+
+        self.config = get_combined_translation_config(
+            overrides={"translation.thread": True})
+        t, cbuilder = self.compile(main)
+        data = cbuilder.cmdexec('')
+        assert data == "1\n" * 5
+
+    def test_wait_stats_emulated(self):
+        assert rgil.get_switch_interval() == 5000
+        assert rgil.switch_requested()
+        wait_us, waits = rgil.get_wait_stats()
+        assert wait_us >= 0 and waits >= 0
+        assert len(rgil.get_site_stats()) == len(rgil.SITE_NAMES)
+
 
 class TestGILShadowStack(BaseTestGIL):
     gc = 'minimark'
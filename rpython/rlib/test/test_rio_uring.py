@@ -0,0 +1,77 @@
+import os
+import py
+
+from rpython.rlib import rio_uring
+from rpython.rtyper.lltypesystem import lltype, rffi
+
+if not rio_uring.IS_SUPPORTED:
+    py.test.skip("io_uring not supported on this platform")
+
+
+def make_ring(entries=8):
+    try:
+        return rio_uring.IOUring(entries)
+    except OSError as e:
+        py.test.skip("io_uring_setup: %s" % (os.strerror(e.errno),))
+
+
+def test_nop():
+    ring = make_ring()
+    try:
+        assert ring.fileno() >= 0
+        space = ring.sq_space()
+        assert space >= 8
+        for i in range(3):
+            assert ring.prep(rio_uring.IORING_OP_NOP, -1,
+                             lltype.nullptr(rffi.CCHARP.TO), 0, 0, 0, 100 + i)
+        assert ring.sq_space() == space - 3
+        assert ring.submit(3) == 3
+        assert ring.sq_space() == space
+        res = ring.reap(10)
+        assert sorted(res) == [(100, 0), (101, 0), (102, 0)]
+        assert ring.reap(10) == []
+    finally:
+        ring.close()
+
+def test_full_ring():
+    ring = make_ring(4)
+    try:
+        null = lltype.nullptr(rffi.CCHARP.TO)
+        for i in range(ring.sq_space()):
+            assert ring.prep(rio_uring.IORING_OP_NOP, -1, null, 0, 0, 0, i)
+        assert not ring.prep(rio_uring.IORING_OP_NOP, -1, null, 0, 0, 0, 99)
+        ring.submit()
+        assert ring.prep(rio_uring.IORING_OP_NOP, -1, null, 0, 0, 0, 99)
+        ring.submit(1)
+    finally:
+        ring.close()
+
+def test_read_write_pipe():
+    ring = make_ring()
+    r, w = os.pipe()
+    buf = lltype.malloc(rffi.CCHARP.TO, 16, flavor='raw')
+    try:
+        for i, c in enumerate("hello"):
+            buf[i] = c
+        assert ring.prep(rio_uring.IORING_OP_WRITE, w, buf, 5, -1, 0, 1)
+        ring.submit(1)
+        assert ring.reap(10) == [(1, 5)]
+        assert ring.prep(rio_uring.IORING_OP_READ, r, rffi.ptradd(buf, 8),
+                         8, -1, 0, 2)
+        ring.submit(1)
+        assert ring.reap(10) == [(2, 5)]
+        assert rffi.charpsize2str(rffi.ptradd(buf, 8), 5) == "hello"
+        # errors are reported as -errno in the result
+        assert ring.prep(rio_uring.IORING_OP_READ, w, buf, 8, -1, 0, 3)
+        ring.submit(1)
+        [(user_data, result)] = ring.reap(10)
+        assert user_data == 3
+        assert result < 0
+    finally:
+        lltype.free(buf, flavor='raw')
+        os.close(r)
+        os.close(w)
+        ring.close()
+
+def test_setup_error():
+    py.test.raises(OSError, rio_uring.IOUring, 0)
@@ -730,6 +730,54 @@ if sys.platform.startswith('linux'):
         s2.close()
         s1.close()
 
+@rposix_requires('splice')
+def test_splice():
+    filename = str(udir.join('test_splice'))
+    fd = os.open(filename, os.O_RDWR|os.O_CREAT|os.O_TRUNC, 0777)
+    r, w = os.pipe()
+    try:
+        os.write(fd, 'abcdefghij')
+        res = rposix.splice(fd, 2, w, -1, 5, rposix.SPLICE_F_MOVE)
+        assert res == 5
+        assert os.read(r, 10) == 'cdefg'
+        # the file position was not used, and is unchanged
+        assert os.lseek(fd, 0, 1) == 10
+        os.write(w, 'xyz')
+        os.lseek(fd, 0, 0)
+        assert rposix.splice(r, -1, fd, -1, 3) == 3
+        os.lseek(fd, 0, 0)
+        assert os.read(fd, 10) == 'xyzdefghij'
+        with py.test.raises(OSError) as excinfo:
+            rposix.splice(fd, -1, fd, -1, 3)    # no pipe involved
+        assert excinfo.value.errno == errno.EINVAL
+    finally:
+        os.close(fd)
+        os.close(r)
+        os.close(w)
+
+@rposix_requires('copy_file_range')
+def test_copy_file_range():
+    src = os.open(str(udir.join('test_copy_file_range_1')),
+                  os.O_RDWR|os.O_CREAT|os.O_TRUNC, 0777)
+    dst = os.open(str(udir.join('test_copy_file_range_2')),
+                  os.O_RDWR|os.O_CREAT|os.O_TRUNC, 0777)
+    try:
+        os.write(src, 'abcdefghij')
+        try:
+            res = rposix.copy_file_range(src, 3, dst, -1, 100)
+        except OSError as e:
+            if e.errno in (errno.ENOSYS, errno.EXDEV, errno.EOPNOTSUPP):
+                py.test.skip("copy_file_range() not supported here")
+            raise
+        assert res == 7
+        assert os.lseek(dst, 0, 1) == 7
+        assert rposix.copy_file_range(src, 0, dst, 7, 3) == 3
+        os.lseek(dst, 0, 0)
+        assert os.read(dst, 20) == 'defghijabc'
+    finally:
+        os.close(src)
+        os.close(dst)
+
 if sys.platform == "darwin":
    def test_sendfile_partial(tmpdir):
         # issue 3964
@@ -786,6 +786,35 @@ def test_msg_trunc_weirdness_linux():
     result = b.recv(2, socket.MSG_TRUNC)
     assert result == b'ab'
 
+@pytest.mark.skipif(not rsocket._c.HAVE_MMSG,
+        reason='recvmmsg() and sendmmsg() are linux specific')
+def test_sendmmsg_recvmmsg():
+    s1 = RSocket(AF_INET, SOCK_DGRAM)
+    s1.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    s2 = RSocket(AF_INET, SOCK_DGRAM)
+    s2.settimeout(10.0)
+    s2.bind(INETAddress('127.0.0.1', INADDR_ANY))
+    addr1 = s1.getsockname()
+    assert s2.sendmmsg(['a', 'bc', 'def' * 10], 0, addr1) == 3
+    assert s2.sendmmsg([]) == 0
+    buf = RawByteBuffer(4 * 16)
+    result = s1.recvmmsg_into(buf, 16, 4)
+    assert [nbytes for nbytes, address in result] == [1, 2, 16]
+    data = buf.as_str()
+    assert data[0] == 'a'
+    assert data[16:18] == 'bc'
+    assert data[32:48] == ('def' * 10)[:16]
+    for nbytes, address in result:
+        assert address.get_port() == s2.getsockname().get_port()
+    py.test.raises(RSocketError, s1.recvmmsg_into, buf, 32, 4)
+    py.test.raises(RSocketError, s1.recvmmsg_into, buf, 16, sys.maxint // 8)
+    py.test.raises(RSocketError, s1.recvmmsg_into, buf, 2**31, 1)
+    s1.setblocking(False)
+    err = py.test.raises(CSocketError, s1.recvmmsg_into, buf, 16, 4)
+    assert err.value.errno in (errno.EAGAIN, errno.EWOULDBLOCK)
+    s1.close()
+    s2.close()
+
 def test_if_nameindex():
     nameindex = rsocket.if_nameindex()
     assert len(nameindex) > 0
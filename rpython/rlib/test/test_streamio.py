@@ -730,6 +730,167 @@ class TestMMapFile(BaseTestBufferingInputStreamTests):
         assert file.tell() == len("BooHoo\nBarf\na\nb\nc\n")
 
 
+class TestMappingInputStream(BaseTestBufferingInputStreamTests):
+    # map the file as soon as possible, to run the generic tests on the
+    # mmap code paths
+    Counter = 0
+
+    def interpret(self, func, args, **kwargs):
+        return func(*args)
+
+    def makeStream(self, tell=None, seek=None, bufsize=-1):
+        tfn = str(udir.join('mappingstream%03d' % TestMappingInputStream.Counter))
+        TestMappingInputStream.Counter += 1
+        with open(tfn, "wb") as f:
+            f.writelines(self.packets)
+        fd = os.open(tfn, os.O_RDONLY)
+        stream = streamio.MappingInputStream(streamio.DiskFile(fd), bufsize)
+        stream.mmap_after = 1
+        stream.mmap_min_size = 0
+        return stream
+
+    def make_big_file(self, name, nlines):
+        tfn = str(udir.join(name))
+        with open(tfn, "wb") as f:
+            for i in range(nlines):
+                f.write("line %d\n" % i)
+        return tfn
+
+    def test_selected_for_reading_only(self):
+        tfn = self.make_big_file('mappingstream-select', 1)
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        assert isinstance(stream, streamio.MappingInputStream)
+        stream.close()
+        stream = streamio.open_file_as_stream(tfn, 'rbm')
+        assert isinstance(stream, streamio.MappingInputStream)
+        stream.close()
+        stream = streamio.open_file_as_stream(tfn, 'rUm')
+        assert isinstance(stream.base, streamio.MappingInputStream)
+        stream.close()
+        stream = streamio.open_file_as_stream(tfn, 'r')
+        assert not isinstance(stream, streamio.MappingInputStream)
+        stream.close()
+        stream = streamio.open_file_as_stream(tfn, 'r+m')
+        assert not isinstance(stream, streamio.MappingInputStream)
+        stream.close()
+
+    def test_switch_to_mmap(self):
+        tfn = self.make_big_file('mappingstream-switch', 5000)
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        stream.mmap_after = 1000
+        stream.mmap_min_size = 10000
+        lines = []
+        while stream.mm is None:
+            lines.append(stream.readline())
+        assert 0 < len(lines) < 200
+        assert stream.tell() == sum(map(len, lines))
+        assert stream.count_buffered_bytes() == (
+            os.path.getsize(tfn) - stream.tell())
+        while True:
+            line = stream.readline()
+            if not line:
+                break
+            lines.append(line)
+        assert lines == ["line %d\n" % i for i in range(5000)]
+        assert stream.mm is None
+        stream.close()
+
+    def test_small_or_random_access_not_mapped(self):
+        tfn = self.make_big_file('mappingstream-small', 5000)
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        stream.mmap_after = 1000
+        stream.mmap_min_size = os.path.getsize(tfn) + 1
+        assert stream.read(1500).startswith("line 0\n")
+        assert stream.mm is None
+        stream.mmap_min_size = 0
+        for i in range(10):
+            stream.seek(i * 100, 0)
+            assert len(stream.read(999)) == 999
+        assert stream.mm is None
+        stream.close()
+
+    def test_sees_appended_data(self):
+        tfn = self.make_big_file('mappingstream-append', 1000)
+        size = os.path.getsize(tfn)
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        stream.mmap_after = 100
+        stream.mmap_min_size = 0
+        assert stream.read(200) == open(tfn).read(200)
+        assert stream.mm is not None
+        with open(tfn, "ab") as f:
+            f.write("appended\nlast")
+        stream.seek(-5, 2)
+        assert stream.mm is None
+        assert stream.read(5) == "\nlast"
+        stream.seek(size - 3, 0)
+        assert stream.read(2) == "99"
+        stream.seek(0, 0)
+        stream.read(200)
+        assert stream.mm is not None
+        stream.seek(size - 2, 0)
+        assert stream.readline() == "9\n"
+        assert stream.readline() == "appended\n"
+        assert stream.readall() == "last"
+        assert stream.mm is None
+        stream.close()
+
+    def test_flush_keeps_position(self):
+        tfn = self.make_big_file('mappingstream-flush', 1000)
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        stream.mmap_after = 100
+        stream.mmap_min_size = 0
+        data = stream.read(150)
+        assert stream.mm is not None
+        fd = stream.try_to_find_file_descriptor()
+        stream.flush()
+        assert stream.mm is None
+        assert os.lseek(fd, 0, 1) == 150
+        assert stream.read(50) == open(tfn).read()[150:200]
+        stream.close()
+
+    def test_peek_reuses_chunk(self):
+        tfn = self.make_big_file('mappingstream-peek', 1000)
+        stream = streamio.open_file_as_stream(tfn, 'rm', 64)
+        stream.mmap_after = 100
+        stream.mmap_min_size = 0
+        stream.read(150)
+        assert stream.mm is not None
+        pos, chunk = stream.peek()
+        assert (pos, len(chunk)) == (0, 64)
+        assert chunk == open(tfn).read()[150:214]
+        stream.read(10)
+        assert stream.peek() == (10, chunk)
+        assert stream.peek()[1] is chunk
+        stream.read(54)
+        pos, chunk2 = stream.peek()
+        assert pos == 0 and chunk2 == open(tfn).read()[214:278]
+        stream.close()
+
+    def test_read_buffered_into_raw(self):
+        from rpython.rtyper.lltypesystem import lltype, rffi
+        tfn = self.make_big_file('mappingstream-raw', 1000)
+        expected = open(tfn).read()
+        stream = streamio.open_file_as_stream(tfn, 'rm')
+        stream.mmap_after = 100
+        stream.mmap_min_size = 0
+        raw = lltype.malloc(rffi.CCHARP.TO, 100, flavor='raw')
+        try:
+            assert stream.read_buffered_into_raw(raw, 100) == 0
+            stream.read(150)
+            assert stream.mm is not None
+            assert stream.read_buffered_into_raw(raw, 100) == 100
+            assert rffi.charpsize2str(raw, 100) == expected[150:250]
+            assert stream.tell() == 250
+            stream.seek(len(expected) - 30, 0)
+            assert stream.read_buffered_into_raw(raw, 100) == 30
+            assert rffi.charpsize2str(raw, 30) == expected[-30:]
+            assert stream.read_buffered_into_raw(raw, 100) == 0
+            assert stream.read(10) == ""
+        finally:
+            lltype.free(raw, flavor='raw')
+        stream.close()
+
+
 class BaseTestBufferingInputOutputStreamTests(BaseRtypingTest):
 
     def test_write(self):
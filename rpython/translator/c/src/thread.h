@@ -35,6 +35,16 @@ typedef enum RPyLockStatus {
 RPY_EXTERN void RPyGilAllocate(void);
 RPY_EXTERN Signed RPyGilYieldThread(void);
 RPY_EXTERN void RPyGilAcquireSlowPath(void);
+RPY_EXTERN void RPyGilSetStickyThreshold(Signed usec);
+RPY_EXTERN Signed RPyGilGetStickyThreshold(void);
+RPY_EXTERN void RPyGilSetSwitchInterval(Signed usec);
+RPY_EXTERN Signed RPyGilGetSwitchInterval(void);
+RPY_EXTERN void RPyGilSetSwitchRequest(Signed *ticker);
+RPY_EXTERN Signed RPyGilSwitchRequested(void);
+RPY_EXTERN void RPyGilSetProfiling(Signed enabled);
+RPY_EXTERN Signed *RPyGilGetSiteStats(void);
+RPY_EXTERN void RPyGilProfileAcquired(void);
+RPY_EXTERN void RPyGilProfileReleasing(void);
 RPY_EXTERN unsigned long RPyThread_get_thread_native_id(void);
 #define RPyGilAcquire _RPyGilAcquire
 #define RPyGilRelease _RPyGilRelease
@@ -43,5 +53,6 @@ RPY_EXTERN unsigned long RPyThread_get_thread_native_id(void);
 #define RPY_FASTGIL_LOCKED(x)   (x != 0)
 
 RPY_EXTERN Signed rpy_fastgil;
+RPY_EXTERN Signed rpy_gil_profiling;
 
 #endif
@@ -49,11 +49,17 @@ The slow path works as follows:
   8. Once you are the stealer, you try to acquire the GIL by running the
      following loop:
 
-      A. We try again to lock the GIL using the fast-path.
+      A. We try again to lock the GIL using the fast-path (but see the
+         "sticky GIL" comment in the loop).
 
       B. Try to acquire 'mutex_gil' with a timeout. If you succeed, you set
          rpy_fastgil and you are done.  If not, go to A.
 
+      C. If we have been waiting for longer than the switch interval, ask
+         the thread holding the GIL to give it up (see "switch requests"
+         in the loop).  Threads coming back from an external call ask
+         sooner than threads that yielded the GIL explicitly.
+
 
 
 To sum up, there are various possible patterns of interaction:
@@ -86,6 +92,12 @@ To sum up, there are various possible patterns of interaction:
 Signed rpy_fastgil = 0;
 static Signed rpy_waiting_threads = -42;    /* GIL not initialized */
 static volatile int rpy_early_poll_n = 0;
+static Signed rpy_gil_sticky_threshold = 1000;    /* microseconds */
+static Signed rpy_gil_switch_interval = 5000;     /* microseconds */
+static Signed *volatile rpy_gil_switch_request = NULL;
+static volatile Signed rpy_gil_switch_pending = 0;
+Signed rpy_gil_profiling = 0;
+static Signed rpy_gil_site_stats[4];    /* see RPyGilGetSiteStats() */
 static mutex1_t mutex_gil_stealer;
 static mutex2_t mutex_gil;
 
@@ -110,16 +122,127 @@ void RPyGilAllocate(void)
 
 #define RPY_GIL_POKE_MIN   40
 #define RPY_GIL_POKE_MAX  400
+#define RPY_GIL_POLL_US   100      /* the stealer's timeout, see (8.B) */
+#define RPY_GIL_REQUEST_US 1000     /* how often to repeat (8.C) */
 
-void RPyGilAcquireSlowPath(void)
+void RPyGilSetStickyThreshold(Signed usec)
+{
+    rpy_gil_sticky_threshold = usec;
+}
+
+Signed RPyGilGetStickyThreshold(void)
+{
+    return rpy_gil_sticky_threshold;
+}
+
+void RPyGilSetSwitchInterval(Signed usec)
+{
+    rpy_gil_switch_interval = usec;
+}
+
+Signed RPyGilGetSwitchInterval(void)
+{
+    return rpy_gil_switch_interval;
+}
+
+void RPyGilSetSwitchRequest(Signed *ticker)
+{
+    /* 'ticker' is a word that the thread holding the GIL polls
+       regularly, like PyPy's action flag; a stealer that has been
+       waiting for too long sets it to -1 to ask for a thread switch.
+       NULL disables switch requests. */
+    rpy_gil_switch_request = ticker;
+}
+
+Signed RPyGilSwitchRequested(void)
+{
+    /* Called by the GIL holder when it polls its ticker.  Without a
+       registered ticker, it is expected to yield every time. */
+    if (rpy_gil_switch_request == NULL)
+        return 1;
+    if (!rpy_gil_switch_pending)
+        return 0;
+    rpy_gil_switch_pending = 0;
+    return 1;
+}
+
+static long long rpy_gil_now_us(void)
+{
+#ifdef _WIN32
+    static LONGLONG frequency = 0;
+    LARGE_INTEGER now;
+    if (frequency == 0) {
+        LARGE_INTEGER freq;
+        if (!QueryPerformanceFrequency(&freq) || freq.QuadPart < 1)
+            return 0;
+        frequency = freq.QuadPart;
+    }
+    QueryPerformanceCounter(&now);
+    return (long long)(now.QuadPart / frequency) * 1000000 +
+           (long long)(now.QuadPart % frequency) * 1000000 / frequency;
+#elif defined(CLOCK_MONOTONIC)
+    struct timespec t;
+    clock_gettime(CLOCK_MONOTONIC, &t);
+    return (long long)t.tv_sec * 1000000 + t.tv_nsec / 1000;
+#else
+    struct timeval tv;
+    RPY_GETTIMEOFDAY(&tv);
+    return (long long)tv.tv_sec * 1000000 + tv.tv_usec;
+#endif
+}
+
+void RPyGilSetProfiling(Signed enabled)
+{
+    /* Turns on the counters that are too costly to maintain all the
+       time: the hold time of each thread, which needs the time at every
+       acquire and release, and the statistics per release site.  Note
+       that the JIT emits its own fast path around external calls, which
+       is not seen here: the hold time of JIT-compiled code is only
+       approximate. */
+    rpy_gil_profiling = enabled;
+}
+
+Signed *RPyGilGetSiteStats(void)
+{
+    /* Returns an array of 4 counters: the number of times the GIL was
+       handed over to a waiting thread and the total time these threads
+       waited, first after an external call in the other thread (point
+       (8.A)), then after an explicit yield (point (8.B)). */
+    return rpy_gil_site_stats;
+}
+
+void RPyGilProfileAcquired(void)
+{
+#ifdef RPY_TLOFS_gil_hold_start
+    struct pypy_threadlocal_s *p =
+        (struct pypy_threadlocal_s *)_RPy_ThreadLocals_Get();
+    p->gil_hold_start = (Signed)rpy_gil_now_us();
+#endif
+}
+
+void RPyGilProfileReleasing(void)
+{
+#ifdef RPY_TLOFS_gil_hold_start
+    struct pypy_threadlocal_s *p =
+        (struct pypy_threadlocal_s *)_RPy_ThreadLocals_Get();
+    if (p->gil_hold_start != 0) {
+        p->gil_hold_us += (Signed)rpy_gil_now_us() - p->gil_hold_start;
+        p->gil_hold_start = 0;
+    }
+#endif
+}
+
+static void rpy_gil_acquire_slow(int yielding)
 {
     /* Acquires the GIL.  This is the slow path after which we failed
        the compare-and-swap (after point (5)).  Another thread is busy
-       with the GIL.
+       with the GIL.  'yielding' is true if we come from
+       RPyGilYieldThread(), i.e. we just gave up the GIL ourselves.
      */
     if (1) {      /* preserve commit history */
-        int n;
-        Signed old_waiting_threads;
+        int n, seen_released, site;
+        Signed old_waiting_threads, waited_us, request_us, next_request_us;
+        long long start_us = rpy_gil_now_us();
 
         if (rpy_waiting_threads < 0) {
             /* <arigo> I tried to have RPyGilAllocate() called from
@@ -200,38 +323,105 @@ void RPyGilAcquireSlowPath(void)
         mutex2_loop_start(&mutex_gil);
 
         /* We are now the stealer thread.  Steals! */
+        seen_released = 0;
+        /* Switch requests: a thread that yielded the GIL asks for it
+           back after the full switch interval, but a thread coming
+           back from an external call (typically I/O) asks after a
+           quarter of it, so that it can quickly process what it just
+           received.  The request is repeated every interval of time
+           in case the holder overwrote the ticker concurrently. */
+        request_us = rpy_gil_switch_interval;
+        if (!yielding)
+            request_us /= 4;
+        next_request_us = request_us;
         while (1) {
             /* Busy-looping here.  Try to look again if 'rpy_fastgil' is
                released.
             */
             if (!RPY_FASTGIL_LOCKED(rpy_fastgil)) {
-                /* point (8.A) */
-                if (_rpygil_acquire_fast_path()) {
+                /* point (8.A).  The "sticky GIL": most of the time the
+                   fast-path release is only around a short external
+                   call, and the holder will take the GIL back in a few
+                   microseconds; stealing it at that point costs two
+                   thread switches for nothing.  So we only steal if
+                   we have already been waiting for longer than
+                   'rpy_gil_sticky_threshold', or if the GIL was
+                   already seen released one interval of time ago,
+                   which suggests that the external call is blocking.
+                   Explicit yields from RPyGilYieldThread() go through
+                   'mutex_gil' below and are not delayed.
+                */
+                if ((seen_released ||
+                     rpy_gil_now_us() - start_us >=
+                         rpy_gil_sticky_threshold) &&
+                        _rpygil_acquire_fast_path()) {
                     /* we just acquired the GIL */
+                    site = 0;
                     break;
                 }
+                seen_released = 1;
             }
+            else
+                seen_released = 0;
             /* Sleep for one interval of time.  We may be woken up earlier
                if 'mutex_gil' is released.  Point (8.B)
             */
-            if (mutex2_lock_timeout(&mutex_gil, 0.0001)) {   /* 0.1 ms... */
+            if (mutex2_lock_timeout(&mutex_gil, RPY_GIL_POLL_US * 1e-6)) {
                 /* We arrive here if 'mutex_gil' was recently released
                    and we just relocked it.
                  */
                 assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
                 /* restore the invariant point (3) */
                 rpy_fastgil = _rpygil_get_my_ident();
+                site = 1;
                 break;
             }
+            waited_us = (Signed)(rpy_gil_now_us() - start_us);
+            if (waited_us >= next_request_us) {
+                /* point (8.C) */
+                Signed *ticker = rpy_gil_switch_request;
+                if (ticker != NULL) {
+                    rpy_gil_switch_pending = 1;
+                    *(volatile Signed *)ticker = -1;
+                }
+                next_request_us = waited_us + RPY_GIL_REQUEST_US;
+            }
             /* Loop back. */
         }
+        /* We hold the GIL now.  If we asked for a switch in (8.C) but
+           got the GIL in (8.A) instead, the request is served: clear it,
+           or the next time we poll the ticker we would yield for no
+           reason. */
+        rpy_gil_switch_pending = 0;
         atomic_decrement(&rpy_waiting_threads);
         mutex2_loop_stop(&mutex_gil);
         mutex1_unlock(&mutex_gil_stealer);
+
+        waited_us = (Signed)(rpy_gil_now_us() - start_us);
+        if (rpy_gil_profiling) {
+            /* we are holding the GIL again, so no other thread is
+               changing these counters now */
+            rpy_gil_site_stats[2 * site] += 1;
+            rpy_gil_site_stats[2 * site + 1] += waited_us;
+        }
+#ifdef RPY_TLOFS_gil_wait_us
+        /* per-thread statistics, see rpython.rlib.rgil */
+        {
+            struct pypy_threadlocal_s *p =
+                (struct pypy_threadlocal_s *)_RPy_ThreadLocals_Get();
+            p->gil_wait_us += waited_us;
+            p->gil_waits += 1;
+        }
+#endif
     }
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
 }
 
+void RPyGilAcquireSlowPath(void)
+{
+    rpy_gil_acquire_slow(0);
+}
+
 Signed RPyGilYieldThread(void)
 {
     /* can be called even before RPyGilAllocate(), but in this case,
@@ -240,18 +430,25 @@ Signed RPyGilYieldThread(void)
     if (rpy_waiting_threads <= 0)
         return 0;
 
+    if (rpy_gil_profiling)
+        RPyGilProfileReleasing();
+
     /* Explicitly release the 'mutex_gil'.
      */
     mutex2_unlock(&mutex_gil);
 
     /* Now nobody has got the GIL, because 'mutex_gil' is released (but
-       rpy_fastgil is still locked).  Call RPyGilAcquire().  It will
-       enqueue ourselves at the end of the 'mutex_gil_stealer' queue.
-       If there is no other waiting thread, it will fall through both
-       its mutex_lock() and mutex_lock_timeout() now.  But that's
-       unlikely, because we tested above that 'rpy_waiting_threads > 0'.
+       rpy_fastgil is still locked).  Acquire it again like
+       RPyGilAcquire() does.  It will enqueue ourselves at the end of the
+       'mutex_gil_stealer' queue.  If there is no other waiting thread,
+       it will fall through both its mutex_lock() and
+       mutex_lock_timeout() now.  But that's unlikely, because we tested
+       above that 'rpy_waiting_threads > 0'.
      */
-    RPyGilAcquire();
+    if (!_rpygil_acquire_fast_path())
+        rpy_gil_acquire_slow(1);
+    if (rpy_gil_profiling)
+        RPyGilProfileAcquired();
     return 1;
 }
 
@@ -159,9 +159,13 @@ static INLINE void _RPyGilAcquire(void) {
     /* see thread_gil.c point (5) */
     if (!_rpygil_acquire_fast_path())
         RPyGilAcquireSlowPath();
+    if (rpy_gil_profiling)
+        RPyGilProfileAcquired();
 }
 static INLINE void _RPyGilRelease(void) {
     assert(RPY_FASTGIL_LOCKED(rpy_fastgil));
+    if (rpy_gil_profiling)
+        RPyGilProfileReleasing();
     pypy_lock_release(&rpy_fastgil);
 }
 static INLINE Signed *_RPyFetchFastGil(void) {